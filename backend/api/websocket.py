@@ -0,0 +1,35 @@
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authtoken.models import Token
+
+
+@database_sync_to_async
+def get_token_user(key: str):
+    try:
+        return Token.objects.select_related("user").get(key=key).user
+    except Token.DoesNotExist:
+        return AnonymousUser()
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """Authenticates a websocket by the `token` query parameter, when it has no session.
+
+    Browsers cannot set headers on websockets, so API clients pass their token in the URL.
+    The user is resolved once, when the connection is opened.
+    """
+
+    async def __call__(self, scope, receive, send):
+        user = scope.get("user")
+        if user is None or not user.is_authenticated:
+            query = parse_qs(scope.get("query_string", b"").decode())
+            if "token" in query:
+                scope = dict(scope, user=await get_token_user(query["token"][0]))
+        return await super().__call__(scope, receive, send)
+
+
+def WebsocketAuthMiddlewareStack(inner):
+    return AuthMiddlewareStack(TokenAuthMiddleware(inner))
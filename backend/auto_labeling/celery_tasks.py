@@ -0,0 +1,87 @@
+from typing import List, Optional
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from django.shortcuts import get_object_or_404
+
+from .models import AutoLabelingConfig, AutoLabelingResult
+from .pipeline.execution import execute_concurrently
+from .pipeline.labels import LabelTypes, save_labels
+from examples.models import Example
+from projects.models import Project
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(bind=True, autoretry_for=(DatabaseError,), retry_backoff=True, retry_jitter=True)
+def auto_label_project(self, project_id: int, user_id: int, config_ids: Optional[List[int]] = None):
+    """Label every example of a project with its auto-labeling configs.
+
+    The examples are taken in batches. The model endpoints of a batch are called concurrently,
+    at most `AUTO_LABELING_CONCURRENCY` at a time, and its labels are saved with one insert per
+    label model, together with a result for each (example, config) pair. Pairs with a result are
+    skipped, so running the task again, or retrying it, resumes where it stopped without labeling
+    an example twice. Pairs whose request failed get no result and are tried again by the next run.
+
+    The progress is reported in the state of the task, as the numbers of pairs done and failed.
+    """
+    project = get_object_or_404(Project, pk=project_id)
+    user = get_object_or_404(get_user_model(), pk=user_id)
+    configs = AutoLabelingConfig.objects.filter(project=project)
+    if config_ids is not None:
+        configs = configs.filter(id__in=config_ids)
+    configs = list(configs.order_by("id"))
+    examples = Example.objects.filter(project=project).order_by("id")
+    total = examples.count() * len(configs)
+    done = AutoLabelingResult.objects.filter(config__in=configs).count()
+    errors = []
+    types = LabelTypes(project)
+
+    last_id = 0
+    while configs:
+        batch = list(examples.filter(id__gt=last_id)[: settings.AUTO_LABELING_BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        pairs = [(example, config) for example in batch for config in configs]
+        pairs = exclude_done(pairs)
+        for example in batch:
+            example.project = project  # the data of the examples is read without a query per example.
+        results = execute_concurrently(
+            [(example.data, config) for example, config in pairs], settings.AUTO_LABELING_CONCURRENCY
+        )
+
+        labeled = []
+        for (example, config), result in zip(pairs, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to label example {example.id} with config {config.id}: {result}")
+                errors.append({"example": example.id, "config": config.id, "message": str(result)})
+            else:
+                labeled.append(((example, config), result))
+        with transaction.atomic():
+            # lock the batch, so that a concurrent run waits for this one and then skips the same pairs.
+            list(Example.objects.select_for_update().filter(id__in=[example.id for example in batch]).values("id"))
+            done_pairs = set(exclude_done([pair for pair, _ in labeled]))
+            labeled = [(pair, labels) for pair, labels in labeled if pair in done_pairs]
+            save_labels(project, user, [(example, labels) for (example, _), labels in labeled], types)
+            AutoLabelingResult.objects.bulk_create(
+                [AutoLabelingResult(example=example, config=config) for (example, config), _ in labeled]
+            )
+        done += len(labeled)
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta={"total": total, "done": done, "errors": len(errors)})
+    return {"total": total, "done": done, "errors": errors[: settings.AUTO_LABELING_MAX_ERRORS]}
+
+
+def exclude_done(pairs):
+    """Drop the (example, config) pairs that already have a result."""
+    if not pairs:
+        return pairs
+    results = AutoLabelingResult.objects.filter(
+        example__in={example.id for example, _ in pairs}, config__in={config.id for _, config in pairs}
+    )
+    done = set(results.values_list("example_id", "config_id"))
+    return [(example, config) for example, config in pairs if (example.id, config.id) not in done]
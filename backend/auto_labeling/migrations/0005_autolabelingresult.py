@@ -0,0 +1,42 @@
+# Generated by Django 4.1.7 on 2026-10-18 16:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0012_example_content_hash"),
+        ("auto_labeling", "0004_alter_autolabelingconfig_project"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AutoLabelingResult",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "config",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="auto_labeling.autolabelingconfig",
+                    ),
+                ),
+                (
+                    "example",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auto_labeling_results",
+                        to="examples.example",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="autolabelingresult",
+            constraint=models.UniqueConstraint(fields=("example", "config"), name="unique_auto_labeling_result"),
+        ),
+    ]
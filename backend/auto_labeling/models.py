@@ -2,6 +2,7 @@ from auto_labeling_pipeline.models import RequestModelFactory
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from examples.models import Example
 from projects.models import Project
 
 
@@ -30,3 +31,14 @@ class AutoLabelingConfig(models.Model):
         except Exception:
             message = "The attributes does not match the model."
             raise ValidationError(message)
+
+
+class AutoLabelingResult(models.Model):
+    """Marks an example as labeled by a config, so that a project-wide run labels it only once."""
+
+    example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="auto_labeling_results")
+    config = models.ForeignKey(to=AutoLabelingConfig, on_delete=models.CASCADE, related_name="results")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["example", "config"], name="unique_auto_labeling_result")]
@@ -0,0 +1,118 @@
+"""Response cache of the auto-labeling models.
+
+The responses of a model are cached by config, by a hash of what the request depends on
+(the model and its attributes) and by a hash of the input, so that duplicate texts are sent
+once and any change of the model invalidates its responses, while the template and the label
+mapping can change without a new request.
+
+Identical requests in flight are only coalesced within a process, the other callers waiting
+for the response of the first one: the workers of other processes may send the same request
+until its response is cached. The database cache culls a share of its entries by key order
+once it is full, not the least recently used ones, so its size bound is approximate; Redis
+evicts by the memory policy of the server.
+"""
+import functools
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple, Type
+
+from auto_labeling_pipeline.labels import Labels
+from auto_labeling_pipeline.mappings import MappingTemplate
+from auto_labeling_pipeline.models import RequestModel, RequestModelFactory
+from auto_labeling_pipeline.postprocessing import PostProcessor
+from django.conf import settings
+from django.core.cache import caches
+from jinja2 import Template
+
+from auto_labeling.models import AutoLabelingConfig
+
+_missing = object()
+_in_flight: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+class CompiledMappingTemplate(MappingTemplate):
+    """A mapping template compiled once, rather than on every render."""
+
+    def __init__(self, label_collection: Type[Labels] = Labels, template: str = ""):
+        super().__init__(label_collection=label_collection, template=template)
+        self.compiled = Template(self.template)
+
+    def render(self, response: Dict) -> Labels:
+        labels = json.loads(self.compiled.render(input=response))
+        return self.label_collection(labels)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def model_version(config: AutoLabelingConfig) -> str:
+    return _digest([config.model_name, config.model_attrs])
+
+
+def response_key(config: AutoLabelingConfig, data: str) -> str:
+    return f"response_{config.id}_{model_version(config)}_{_digest(data)}"
+
+
+@functools.lru_cache(maxsize=None)
+def find_model(model_name: str) -> Type[RequestModel]:
+    return RequestModelFactory.find(model_name)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(
+    label_collection: Type[Labels], template: str, label_mapping: str
+) -> Tuple[MappingTemplate, PostProcessor]:
+    return CompiledMappingTemplate(label_collection, template), PostProcessor(json.loads(label_mapping))
+
+
+def get_processors(config: AutoLabelingConfig, label_collection: type) -> Tuple[MappingTemplate, PostProcessor]:
+    """The template and post-processor of a config, built once for each template and label mapping.
+
+    Args:
+        config: The config of the model.
+        label_collection: The subclass of `Labels` of the task.
+    """
+    return _compile(label_collection, config.template, json.dumps(config.label_mapping, sort_keys=True))
+
+
+def get_response(config: AutoLabelingConfig, data: str, send: Callable[[], Any]) -> Any:
+    """Return the cached response of the model of a config for the data, or send the request once.
+
+    Args:
+        config: The config of the model.
+        data: The input of the model.
+        send: A function sending the request and returning the response.
+
+    Returns:
+        The response of the model.
+    """
+    cache = caches["auto_labeling"]
+    enabled = settings.AUTO_LABELING_CACHE_TIMEOUT != 0
+    key = response_key(config, data)
+    response = cache.get(key, _missing) if enabled else _missing
+    if response is not _missing:
+        return response
+
+    future: Future = Future()
+    with _lock:
+        sending = _in_flight.setdefault(key, future)
+    if sending is not future:
+        return sending.result()
+    try:
+        response = send()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        # failures are not cached, the next call tries again.
+        if enabled:
+            cache.set(key, response)
+        future.set_result(response)
+        return response
+    finally:
+        with _lock:
+            del _in_flight[key]
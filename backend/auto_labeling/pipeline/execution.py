@@ -1,4 +1,7 @@
-from typing import Type
+import copy
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Type, Union
 
 from auto_labeling_pipeline.labels import (
     ClassificationLabels,
@@ -6,12 +9,10 @@ from auto_labeling_pipeline.labels import (
     Seq2seqLabels,
     SequenceLabels,
 )
-from auto_labeling_pipeline.mappings import MappingTemplate
-from auto_labeling_pipeline.models import RequestModelFactory
-from auto_labeling_pipeline.pipeline import pipeline
-from auto_labeling_pipeline.postprocessing import PostProcessor
+from django.db import connection
 
-from .labels import create_labels
+from .cache import find_model, get_processors, get_response
+from .labels import LabelCollection, create_labels
 from auto_labeling.models import AutoLabelingConfig
 
 
@@ -20,10 +21,51 @@ def get_label_collection(task_type: str) -> Type[Labels]:
 
 
 def execute_pipeline(data: str, config: AutoLabelingConfig):
-    label_collection = get_label_collection(config.task_type)
-    model = RequestModelFactory.create(model_name=config.model_name, attributes=config.model_attrs)
-    template = MappingTemplate(label_collection=label_collection, template=config.template)
-    post_processor = PostProcessor(config.label_mapping)
-    labels = pipeline(text=data, request_model=model, mapping_template=template, post_processing=post_processor)
+    template, post_processor = get_processors(config, get_label_collection(config.task_type))
+
+    def send():
+        # the model fills the text into its attributes in place, so it is built for each request.
+        model = find_model(config.model_name)(**copy.deepcopy(config.model_attrs))
+        return model.send(data)
+
+    response = get_response(config, data, send)
+    labels = template.render(response)
+    labels = post_processor.transform(labels)
     labels = create_labels(config.task_type, labels)
     return labels
+
+
+def execute_concurrently(
+    jobs: List[Tuple[str, AutoLabelingConfig]], max_workers: int
+) -> List[Union[LabelCollection, Exception]]:
+    """Run the pipeline of many (data, config) pairs, with at most `max_workers` requests at once.
+
+    Each worker takes the pairs one after the other, and closes the database connection it opened
+    to read the response cache once there are none left.
+
+    Returns:
+        The labels of each pair, in order, or the exception its pipeline raised.
+    """
+    pending: "queue.Queue[Tuple[int, Tuple[str, AutoLabelingConfig]]]" = queue.Queue()
+    for index, job in enumerate(jobs):
+        pending.put((index, job))
+    results: Dict[int, Union[LabelCollection, Exception]] = {}
+
+    def work():
+        try:
+            while True:
+                try:
+                    index, job = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results[index] = execute_pipeline(*job)
+                except Exception as e:
+                    results[index] = e
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in [executor.submit(work) for _ in range(min(max_workers, len(jobs)))]:
+            future.result()
+    return [results[index] for index in range(len(jobs))]
@@ -1,15 +1,30 @@
 import abc
-from typing import List, Type
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Type
 
 from auto_labeling_pipeline.labels import Labels
 from django.contrib.auth.models import User
 
 from examples.models import Example
 from label_types.models import CategoryType, LabelType, SpanType
+from labels.batch import announce_changes
 from labels.models import Category, Label, Span, TextLabel
 from projects.models import Project
 
 
+class LabelTypes:
+    """The label types of a project by text, loaded once for each label type model."""
+
+    def __init__(self, project: Project):
+        self.project = project
+        self.mappings: Dict[Type[LabelType], Dict[str, LabelType]] = {}
+
+    def get(self, label_type: Type[LabelType]) -> Dict[str, LabelType]:
+        if label_type not in self.mappings:
+            self.mappings[label_type] = {c.text: c for c in label_type.objects.filter(project=self.project)}
+        return self.mappings[label_type]
+
+
 class LabelCollection(abc.ABC):
     label_type: Type[LabelType]
     model: Type[Label]
@@ -17,8 +32,10 @@ class LabelCollection(abc.ABC):
     def __init__(self, labels):
         self.labels = labels
 
-    def transform(self, project: Project, example: Example, user: User) -> List[Label]:
-        mapping = {c.text: c for c in self.label_type.objects.filter(project=project)}
+    def transform(
+        self, project: Project, example: Example, user: User, types: Optional[LabelTypes] = None
+    ) -> List[Label]:
+        mapping = (types or LabelTypes(project)).get(self.label_type)
         annotations = []
         for label in self.labels:
             if label["label"] not in mapping:
@@ -30,9 +47,7 @@ class LabelCollection(abc.ABC):
         return annotations
 
     def save(self, project: Project, example: Example, user: User):
-        labels = self.transform(project, example, user)
-        labels = self.model.objects.filter_annotatable_labels(labels, project)
-        self.model.objects.bulk_create(labels)
+        save_labels(project, user, [(example, self)])
 
 
 class Categories(LabelCollection):
@@ -48,7 +63,9 @@ class Spans(LabelCollection):
 class Texts(LabelCollection):
     model = TextLabel
 
-    def transform(self, project: Project, example: Example, user: User) -> List[Label]:
+    def transform(
+        self, project: Project, example: Example, user: User, types: Optional[LabelTypes] = None
+    ) -> List[Label]:
         annotations = []
         for label in self.labels:
             label["example"] = example
@@ -57,5 +74,38 @@ class Texts(LabelCollection):
         return annotations
 
 
+def save_labels(
+    project: Project,
+    user: User,
+    collections: Iterable[Tuple[Example, LabelCollection]],
+    types: Optional[LabelTypes] = None,
+) -> List[Label]:
+    """Save the label collections of many examples at once, with a single insert per label model.
+
+    The labels are checked against the stored ones with a single query per label model, and
+    kept as if each collection was saved in turn.
+
+    Args:
+        project: The project of the examples.
+        user: The user the labels are created for.
+        collections: The examples with the labels to save on them.
+        types: The label types of the project, to reuse between calls.
+
+    Returns:
+        The created labels.
+    """
+    types = types or LabelTypes(project)
+    by_model: Dict[Type[Label], List[Label]] = defaultdict(list)
+    for example, collection in collections:
+        by_model[collection.model].extend(collection.transform(project, example, user, types))
+    created: List[Label] = []
+    for model, labels in by_model.items():
+        labels = model.objects.filter_annotatable_labels(labels, project)
+        created.extend(model.objects.bulk_create(labels))
+    # the bulk insert sends no signals.
+    announce_changes(project, created, created=True)
+    return created
+
+
 def create_labels(task_type: str, labels: Labels) -> LabelCollection:
     return {"Category": Categories, "Span": Spans, "Text": Texts}[task_type](labels.dict())
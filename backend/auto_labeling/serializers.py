@@ -35,3 +35,8 @@ class AutoLabelingConfigSerializer(serializers.ModelSerializer):
                 "You need to correctly specify the required fields: {}".format(required_fields)
             )
         return data
+
+
+class AutoLabelingJobSerializer(serializers.Serializer):
+    # the configs to run, all the configs of the project when omitted.
+    configs = serializers.ListField(child=serializers.IntegerField(), required=False, allow_null=True)
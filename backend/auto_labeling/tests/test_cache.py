@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from auto_labeling_pipeline.models import find_and_replace_value
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from model_mommy import mommy
+
+from auto_labeling.pipeline.cache import get_processors, get_response
+from auto_labeling.pipeline.execution import execute_pipeline, get_label_collection
+from label_types.models import CategoryType
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        caches["auto_labeling"].clear()
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        mommy.make(CategoryType, project=self.project.item, text="POS")
+        self.config = mommy.make(
+            "AutoLabelingConfig",
+            project=self.project.item,
+            task_type="Category",
+            model_name="Custom REST Request",
+            model_attrs={
+                "url": "http://localhost/",
+                "method": "POST",
+                "params": {},
+                "headers": {},
+                "body": {"data": {"text": "{{ text }}"}},
+            },
+            template='[{"label": "{{ input.label }}"}]',
+            label_mapping={},
+        )
+        patcher = patch(
+            "auto_labeling_pipeline.models.CustomRESTRequestModel.send", autospec=True, return_value={"label": "POS"}
+        )
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sends_same_text_once(self):
+        for _ in range(2):
+            labels = execute_pipeline("text", self.config)
+        self.assertEqual(labels.labels, [{"label": "POS"}])
+        self.assertEqual(self.send.call_count, 1)
+        execute_pipeline("other text", self.config)
+        self.assertEqual(self.send.call_count, 2)
+
+    def test_sends_each_text_in_its_request(self):
+        bodies = []
+
+        def send(model, text):
+            find_and_replace_value(model.body, text)
+            bodies.append(model.body)
+            return {"label": "POS"}
+
+        self.send.side_effect = send
+        execute_pipeline("foo", self.config)
+        execute_pipeline("bar", self.config)
+        self.assertEqual(bodies, [{"data": {"text": "foo"}}, {"data": {"text": "bar"}}])
+
+    def test_sends_again_when_model_changes(self):
+        execute_pipeline("text", self.config)
+        self.config.model_attrs["headers"] = {"Authorization": "token"}
+        execute_pipeline("text", self.config)
+        self.assertEqual(self.send.call_count, 2)
+
+    def test_reuses_response_when_template_changes(self):
+        execute_pipeline("text", self.config)
+        self.config.template = '[{"label": "NEG"}]'
+        self.config.label_mapping = {"NEG": "POS"}
+        labels = execute_pipeline("text", self.config)
+        self.assertEqual(self.send.call_count, 1)
+        self.assertEqual(labels.labels, [{"label": "POS"}])
+
+    def test_does_not_cache_failures(self):
+        self.send.side_effect = [ValueError("error"), {"label": "POS"}]
+        with self.assertRaises(ValueError):
+            execute_pipeline("text", self.config)
+        execute_pipeline("text", self.config)
+        self.assertEqual(self.send.call_count, 2)
+
+    @override_settings(AUTO_LABELING_CACHE_TIMEOUT=0)
+    def test_can_disable_cache(self):
+        execute_pipeline("text", self.config)
+        execute_pipeline("text", self.config)
+        self.assertEqual(self.send.call_count, 2)
+
+    @override_settings(AUTO_LABELING_CACHE_TIMEOUT=0)
+    def test_coalesces_requests_in_flight(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def send():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"label": "POS"}
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            first = executor.submit(get_response, self.config, "text", send)
+            started.wait(5)
+            others = [executor.submit(get_response, self.config, "text", send) for _ in range(2)]
+            time.sleep(0.1)
+            release.set()
+            responses = [future.result() for future in [first, *others]]
+        self.assertEqual(responses, [{"label": "POS"}] * 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_memoizes_processors(self):
+        label_collection = get_label_collection("Category")
+        processors = get_processors(self.config, label_collection)
+        self.assertIs(get_processors(self.config, label_collection), processors)
+        self.config.label_mapping = {"NEG": "POS"}
+        self.assertIsNot(get_processors(self.config, label_collection), processors)
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from auto_labeling.celery_tasks import auto_label_project
+from auto_labeling.models import AutoLabelingResult
+from labels.models import Category
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class StubModel(BaseHTTPRequestHandler):
+    """A model endpoint labeling every text POS, except the ones containing "fail"."""
+
+    def do_POST(self):
+        server = self.server
+        text = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["text"]
+        with server.lock:
+            server.texts.append(text)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(0.01)
+        with server.lock:
+            server.in_flight -= 1
+        if "fail" in text and server.failing:
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({"label": "POS"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# the requests are sent from other threads, which cannot write to the database held by the test.
+@override_settings(
+    AUTO_LABELING_CONCURRENCY=2,
+    AUTO_LABELING_BATCH_SIZE=3,
+    CACHES={**settings.CACHES, "auto_labeling": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class TestAutoLabelProject(TestCase):
+    def setUp(self):
+        caches["auto_labeling"].clear()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubModel)
+        self.server.lock = threading.Lock()
+        self.server.texts = []
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.failing = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.user = self.project.admin
+        self.category = mommy.make("CategoryType", project=self.project.item, text="POS")
+        self.config = mommy.make(
+            "AutoLabelingConfig",
+            project=self.project.item,
+            task_type="Category",
+            model_name="Custom REST Request",
+            model_attrs={
+                "url": f"http://127.0.0.1:{self.server.server_address[1]}/",
+                "method": "POST",
+                "params": {},
+                "headers": {},
+                "body": {"text": "{{ text }}"},
+            },
+            template='[{"label": "{{ input.label }}"}]',
+            label_mapping={},
+        )
+        self.examples = [mommy.make("Example", project=self.project.item, text=f"text {i}") for i in range(7)]
+
+    def run_task(self, task_id=None):
+        auto_label_project.push_request(id=task_id, called_directly=False, is_eager=False)
+        try:
+            return auto_label_project.run(self.project.item.id, self.user.id)
+        finally:
+            auto_label_project.pop_request()
+
+    def test_labels_all_examples(self):
+        response = self.run_task()
+        self.assertEqual(response, {"total": 7, "done": 7, "errors": []})
+        self.assertEqual(Category.objects.filter(label=self.category, user=self.user).count(), 7)
+        self.assertEqual(AutoLabelingResult.objects.filter(config=self.config).count(), 7)
+        self.assertCountEqual(self.server.texts, [example.text for example in self.examples])
+
+    def test_sends_requests_concurrently_within_the_limit(self):
+        self.run_task()
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_rerun_does_not_label_twice(self):
+        self.run_task()
+        self.server.texts.clear()
+        response = self.run_task()
+        self.assertEqual(response["done"], 7)
+        self.assertEqual(Category.objects.count(), 7)
+        self.assertEqual(self.server.texts, [])
+
+    def test_retries_failed_examples_on_the_next_run(self):
+        failed = mommy.make("Example", project=self.project.item, text="fail")
+        response = self.run_task()
+        self.assertEqual(response["done"], 7)
+        self.assertEqual(len(response["errors"]), 1)
+        self.assertEqual(response["errors"][0]["example"], failed.id)
+        self.assertFalse(Category.objects.filter(example=failed).exists())
+
+        self.server.failing = False
+        self.server.texts.clear()
+        response = self.run_task()
+        self.assertEqual(response, {"total": 8, "done": 8, "errors": []})
+        self.assertEqual(self.server.texts, ["fail"])
+        self.assertTrue(Category.objects.filter(example=failed).exists())
+
+    def test_reports_progress(self):
+        task_id = str(uuid.uuid4())
+        mommy.make("Example", project=self.project.item, text="fail")
+        self.run_task(task_id)
+        progress = AsyncResult(task_id).info
+        self.assertEqual(progress, {"total": 8, "done": 7, "errors": 1})
+
+
+class TestAutoLabelingJob(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.url = reverse(viewname="auto_labeling_job", args=[self.project.item.id])
+        self.data = {"configs": [1]}
+
+    @patch("auto_labeling.views.auto_label_project")
+    def test_allows_admin_to_start_job(self, mock):
+        mock.delay.return_value.task_id = "task"
+        response = self.assert_create(self.project.admin, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"task_id": "task"})
+        mock.delay.assert_called_once_with(
+            project_id=self.project.item.id, user_id=self.project.admin.id, config_ids=[1]
+        )
+
+    @patch("auto_labeling.views.auto_label_project")
+    def test_rejects_invalid_configs(self, mock):
+        self.data = {"configs": ["all"]}
+        self.assert_create(self.project.admin, status.HTTP_400_BAD_REQUEST)
+        mock.delay.assert_not_called()
+
+    @patch("auto_labeling.views.auto_label_project")
+    def test_denies_project_staff_to_start_job(self, mock):
+        for member in self.project.staffs:
+            self.assert_create(member, status.HTTP_403_FORBIDDEN)
+        mock.delay.assert_not_called()
+
+    def test_denies_non_member_to_start_job(self):
+        self.assert_create(expected=status.HTTP_403_FORBIDDEN)
@@ -8,6 +8,7 @@ from rest_framework import status
 from rest_framework.reverse import reverse
 
 from api.tests.utils import CRUDMixin
+from auto_labeling.models import AutoLabelingResult
 from auto_labeling.pipeline.labels import Categories, Spans, Texts
 from examples.tests.utils import make_doc
 from labels.models import Category, Span, TextLabel
@@ -164,6 +165,15 @@ class TestAutomatedLabeling(CRUDMixin):
         self.assertEqual(Category.objects.count(), 1)
         self.assertEqual(Category.objects.first().label, self.category_pos)
 
+    @patch("auto_labeling.views.execute_pipeline", return_value=Categories([{"label": "POS"}]))
+    def test_marks_example_as_labeled_by_configs(self, mock):
+        config = mommy.make("AutoLabelingConfig", task_type="Category", project=self.project.item)
+        self.assert_create(self.project.admin, status.HTTP_201_CREATED)
+        self.assert_create(self.project.admin, status.HTTP_201_CREATED)
+        self.assertQuerysetEqual(
+            AutoLabelingResult.objects.values_list("example", "config"), [(self.example.id, config.id)]
+        )
+
     @patch("auto_labeling.views.execute_pipeline", return_value=Categories([{"label": "NEUTRAL"}]))
     def test_nonexistent_category(self, mock):
         mommy.make("AutoLabelingConfig", task_type="Category", project=self.project.item)
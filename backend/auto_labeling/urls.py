@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+    AutoLabelingJob,
     AutomatedLabeling,
     ConfigDetail,
     ConfigList,
@@ -33,5 +34,6 @@ urlpatterns = [
     path(
         route="auto-labeling/label-mapper-testing", view=LabelMapperTesting.as_view(), name="auto_labeling_mapping_test"
     ),
+    path(route="auto-labeling/jobs", view=AutoLabelingJob.as_view(), name="auto_labeling_job"),
     path(route="auto-labeling", view=AutomatedLabeling.as_view(), name="auto_labeling"),
 ]
@@ -6,6 +6,7 @@ from auto_labeling_pipeline.mappings import MappingTemplate
 from auto_labeling_pipeline.menu import Options
 from auto_labeling_pipeline.models import RequestModelFactory
 from auto_labeling_pipeline.postprocessing import PostProcessor
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_drf_filepond.models import TemporaryUpload
 from rest_framework import generics, status
@@ -15,6 +16,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .celery_tasks import auto_label_project
 from .exceptions import (
     AWSTokenError,
     ResponseJSONDecodeError,
@@ -22,9 +24,10 @@ from .exceptions import (
     TemplateMappingError,
     URLConnectionError,
 )
-from .models import AutoLabelingConfig
+from .models import AutoLabelingConfig, AutoLabelingResult
 from .pipeline.execution import execute_pipeline, get_label_collection
-from .serializers import AutoLabelingConfigSerializer
+from .pipeline.labels import save_labels
+from .serializers import AutoLabelingConfigSerializer, AutoLabelingJobSerializer
 from projects.models import Project
 from projects.permissions import IsProjectAdmin, IsProjectMember
 
@@ -156,7 +159,25 @@ class AutomatedLabeling(generics.CreateAPIView):
         example = project.examples.get(pk=self.request.query_params["example"])
         configs = AutoLabelingConfig.objects.filter(project=project)
         # Todo: make async calls or celery tasks to reduce waiting time.
-        for config in configs:
-            labels = execute_pipeline(example.data, config=config)
-            labels.save(project, example, self.request.user)
+        collections = [(example, execute_pipeline(example.data, config=config)) for config in configs]
+        with transaction.atomic():
+            save_labels(project, self.request.user, collections)
+            # a project-wide run skips the example for these configs.
+            AutoLabelingResult.objects.bulk_create(
+                [AutoLabelingResult(example=example, config=config) for config in configs], ignore_conflicts=True
+            )
         return Response({"ok": True}, status=status.HTTP_201_CREATED)
+
+
+class AutoLabelingJob(APIView):
+    permission_classes = [IsAuthenticated & IsProjectAdmin]
+
+    def post(self, request, *args, **kwargs):
+        serializer = AutoLabelingJobSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        celery_task = auto_label_project.delay(
+            project_id=self.kwargs["project_id"],
+            user_id=request.user.id,
+            config_ids=serializer.validated_data.get("configs"),
+        )
+        return Response({"task_id": celery_task.task_id}, status=status.HTTP_202_ACCEPTED)
@@ -49,11 +49,12 @@ def run_on_nix(args):
                 self.cfg.set(key.lower(), value)
 
         def load(self):
-            return gunicorn.util.import_app("config.wsgi")
+            return gunicorn.util.import_app("config.asgi")
 
     options = {
         "bind": "%s:%s" % ("0.0.0.0", args.port),
         "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
         "chdir": base,
         "capture_output": True,
         "loglevel": "info",
@@ -62,17 +63,16 @@ def run_on_nix(args):
 
 
 def run_on_windows(args):
-    from waitress import serve
+    import uvicorn
 
-    from config.wsgi import application
-
-    serve(application, port=args.port, threads=args.workers)
+    uvicorn.run("config.asgi:application", host="0.0.0.0", port=args.port, workers=args.workers)
 
 
 def command_db_init(args):
     print("Setup Database.")
     management.call_command("wait_for_db")
     management.call_command("migrate")
+    management.call_command("createcachetable")
     management.call_command("create_roles")
 
 
@@ -86,10 +86,14 @@ def command_user_create(args):
 def command_migrate(args):
     print("Start migration.")
     management.call_command("migrate")
+    management.call_command("createcachetable")
 
 
 def command_run_webserver(args):
     print(f"Starting server with port {args.port}.")
+    if not env("CHANNEL_LAYER_REDIS_URL", None):
+        # the in-memory channel layer cannot reach the other workers, nor the task queue.
+        print("CHANNEL_LAYER_REDIS_URL is not set, the websockets only receive the changes made by their own worker.")
     if is_windows():
         run_on_windows(args)
     else:
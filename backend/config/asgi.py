@@ -0,0 +1,32 @@
+"""
+ASGI config for app project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are handled by Django, and websockets by the consumers of Channels,
+which share their groups through the channel layer configured in ``CHANNEL_LAYERS``.
+
+For more information on this file, see
+https://channels.readthedocs.io/en/stable/deploying.html
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# Django must be set up before the consumers and their models are imported.
+django_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from api.websocket import WebsocketAuthMiddlewareStack  # noqa: E402
+from projects.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter(
+    {
+        "http": django_application,
+        "websocket": AllowedHostsOriginValidator(WebsocketAuthMiddlewareStack(URLRouter(websocket_urlpatterns))),
+    }
+)
@@ -33,6 +33,7 @@ DEBUG = env.bool("DEBUG", True)
 
 # Application definition
 INSTALLED_APPS = [
+    "daphne",
     "whitenoise.runserver_nostatic",
     "django.contrib.admin",
     "django.contrib.auth",
@@ -90,6 +91,7 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 # Django templates
 TEMPLATES = [
@@ -247,6 +249,91 @@ if DEBUG:
 # Batch size for importing data
 IMPORT_BATCH_SIZE = env.int("IMPORT_BATCH_SIZE", 1000)
 
+# Load the imported rows with COPY through a staging table on PostgreSQL, instead of the ORM
+IMPORT_COPY_LOADER = env.bool("IMPORT_COPY_LOADER", True)
+
+# Number of examples held in memory at once while exporting data
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", 1000)
+
+# Compression of the exported archives: stored, deflated, bzip2 or lzma, with the zipfile compression level
+EXPORT_ZIP_COMPRESSION = env("EXPORT_ZIP_COMPRESSION", "deflated")
+EXPORT_ZIP_COMPRESSLEVEL = env.int("EXPORT_ZIP_COMPRESSLEVEL", None)
+
+# Size up to which the file of each member is kept in memory while exporting, in bytes. A larger file
+# is buffered in a temporary file on disk before it is copied into the archive.
+EXPORT_SPOOL_MAX_SIZE = env.int("EXPORT_SPOOL_MAX_SIZE", 16 * 1024 * 1024)
+
+# Cache, shared between processes when a Redis URL is given
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+if env("CACHE_REDIS_URL", None):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env("CACHE_REDIS_URL"),
+        }
+    }
+
+# Report snapshots and annotation versions, shared between the web and task processes: a table of the
+# database, created by `python manage.py createcachetable`, or Redis when a URL is given. A cache local
+# to each process would serve outdated reports from the processes which did not see a write.
+CACHES["reports"] = {
+    "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+    "LOCATION": "report_cache",
+    "OPTIONS": {"MAX_ENTRIES": env.int("REPORT_CACHE_MAX_ENTRIES", 10000)},
+}
+if env("CACHE_REDIS_URL", None):
+    CACHES["reports"] = {**CACHES["default"], "KEY_PREFIX": "reports"}
+
+# Responses of the auto-labeling models, by config and input: how long they are kept (seconds, 0 disables
+# the cache) and how many are kept in the database before a share of them is culled. The responses are
+# shared by the web and task processes like the reports, in a table of their own or in Redis, where the
+# eviction follows the memory policy of the server.
+AUTO_LABELING_CACHE_TIMEOUT = env.int("AUTO_LABELING_CACHE_TIMEOUT", 60 * 60 * 24 * 7)
+CACHES["auto_labeling"] = {
+    "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+    "LOCATION": "auto_labeling_cache",
+    "OPTIONS": {"MAX_ENTRIES": env.int("AUTO_LABELING_CACHE_MAX_ENTRIES", 10000)},
+}
+if env("CACHE_REDIS_URL", None):
+    CACHES["auto_labeling"] = {**CACHES["default"], "KEY_PREFIX": "auto_labeling"}
+CACHES["auto_labeling"]["TIMEOUT"] = AUTO_LABELING_CACHE_TIMEOUT
+
+# Channel layer of the websocket groups: in memory for a single process, or shared between the
+# processes through Redis when a URL is given. Any channel layer backend can be set instead.
+# The in-memory layer only reaches the websockets of its own process, so CHANNEL_LAYER_REDIS_URL
+# is required as soon as the web server runs more than one worker, or Celery runs apart from it.
+CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+if env("CHANNEL_LAYER_REDIS_URL", None):
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": env("CHANNEL_LAYER_BACKEND", "channels_redis.pubsub.RedisPubSubChannelLayer"),
+            "CONFIG": {"hosts": [env("CHANNEL_LAYER_REDIS_URL")]},
+        }
+    }
+
+# Window over which the comment changes of a discussion are collected, then written and broadcast
+# at once (seconds), and the number of changes flushing the window early
+DISCUSSION_BUFFER_INTERVAL = env.float("DISCUSSION_BUFFER_INTERVAL", 0.2)
+DISCUSSION_BUFFER_MAX_SIZE = env.int("DISCUSSION_BUFFER_MAX_SIZE", 100)
+
+# Number of changes of a transaction above which the project event stream asks clients to reload
+PROJECT_EVENTS_MAX_BATCH = env.int("PROJECT_EVENTS_MAX_BATCH", 500)
+
+# Project-wide auto-labeling: model requests sent at once, examples labeled per batch,
+# and the number of failed requests listed in the result of a run
+AUTO_LABELING_CONCURRENCY = env.int("AUTO_LABELING_CONCURRENCY", 8)
+AUTO_LABELING_BATCH_SIZE = env.int("AUTO_LABELING_BATCH_SIZE", 100)
+AUTO_LABELING_MAX_ERRORS = env.int("AUTO_LABELING_MAX_ERRORS", 100)
+
+# Number of label operations accepted in one batch
+LABEL_BATCH_MAX_SIZE = env.int("LABEL_BATCH_MAX_SIZE", 500)
+
+# Report snapshots: lifetime, how old a snapshot of an outdated version may be served,
+# and how long writes must settle before the common reports are precomputed (seconds)
+REPORT_CACHE_TIMEOUT = env.int("REPORT_CACHE_TIMEOUT", 60 * 60 * 24)
+REPORT_CACHE_MAX_STALENESS = env.int("REPORT_CACHE_MAX_STALENESS", 0)
+REPORT_CACHE_REFRESH_DELAY = env.int("REPORT_CACHE_REFRESH_DELAY", 10)
+
 # Necessary for email verification of new accounts
 from dotenv import load_dotenv
 
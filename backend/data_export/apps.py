@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DataExportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "data_export"
+
+    def ready(self):
+        # Import signals to register them
+        from . import signals  # noqa
@@ -1,71 +1,173 @@
+import json
 import os
 import shutil
+import tempfile
 import uuid
+import zipfile
+from datetime import datetime
+from typing import Callable, Dict, Optional
 
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from .pipeline.dataset import Dataset
-from .pipeline.factories import (
-    create_comment,
-    create_formatter,
-    create_labels,
-    create_writer,
-)
-from .pipeline.services import ExportApplicationService
-from data_export.models import ExportedExample
+from .pipeline.comments import Comments
+from .pipeline.dataset import ChunkedDataset, MemberChunkedDataset
+from .pipeline.factories import create_formatter, create_writer, select_label_collection
+from .pipeline.services import ExportApplicationService, MemberExportApplicationService
+from data_export.models import ExampleTombstone, ExportCheckpoint, ExportedExample
 from projects.models import Member, Project
 
 logger = get_task_logger(__name__)
 
+ZIP_COMPRESSION = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
 
-def create_collaborative_dataset(project: Project, dirpath: str, confirmed_only: bool, formatters, writer):
+
+def create_collaborative_dataset(
+    project: Project,
+    archive: zipfile.ZipFile,
+    confirmed_only: bool,
+    formatters,
+    writer,
+    since: Optional[datetime] = None,
+):
     is_text_project = project.is_text_project
     if confirmed_only:
         examples = ExportedExample.objects.confirmed(project)
     else:
         examples = ExportedExample.objects.filter(project=project)
-    labels = create_labels(project, examples)
-    comments = create_comment(examples)
-    dataset = Dataset(examples, labels, comments, is_text_project)
+    if since:
+        examples = examples.filter(updated_at__gte=since)
+    dataset = ChunkedDataset(
+        examples,
+        select_label_collection(project),
+        [Comments],
+        is_text_project=is_text_project,
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
 
     service = ExportApplicationService(dataset, formatters, writer)
 
-    filepath = os.path.join(dirpath, f"all.{writer.extension}")
-    service.export(filepath)
+    with archive.open(f"all.{writer.extension}", mode="w", force_zip64=True) as entry:
+        service.export(entry)
+
 
+def create_individual_dataset(
+    project: Project,
+    archive: zipfile.ZipFile,
+    confirmed_only: bool,
+    formatters,
+    writer,
+    on_progress: Optional[Callable] = None,
+    since: Optional[datetime] = None,
+):
+    """Export the dataset of every member, sharing one pass over the examples between the members.
 
-def create_individual_dataset(project: Project, dirpath: str, confirmed_only: bool, formatters, writer):
+    A zip archive can only be written one entry at a time, so the files of the members are
+    buffered in spooled temporary files and copied to the archive at the end. A file stays in
+    memory up to `EXPORT_SPOOL_MAX_SIZE`; a larger one is moved to a temporary file on disk, so
+    it is written to the disk twice, once while exporting and once in the archive. That costs
+    less than a pass over the examples for each member, which the archive would need otherwise.
+    """
     is_text_project = project.is_text_project
-    members = Member.objects.filter(project=project)
-    for member in members:
-        if confirmed_only:
-            examples = ExportedExample.objects.confirmed(project, user=member.user)
-        else:
-            examples = ExportedExample.objects.filter(project=project)
-        labels = create_labels(project, examples, member.user)
-        comments = create_comment(examples, member.user)
-        dataset = Dataset(examples, labels, comments, is_text_project)
+    members = list(Member.objects.filter(project=project).select_related("user"))
+    examples = ExportedExample.objects.filter(project=project)
+    if confirmed_only:
+        examples = examples.exclude(states=None)
+    if since:
+        examples = examples.filter(updated_at__gte=since)
+    dataset = MemberChunkedDataset(
+        examples,
+        select_label_collection(project),
+        [Comments],
+        users=[member.user for member in members],
+        confirmed_only=confirmed_only,
+        is_text_project=is_text_project,
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+
+    service = MemberExportApplicationService(dataset, formatters, writer)
+
+    files = {member.user.id: tempfile.SpooledTemporaryFile(settings.EXPORT_SPOOL_MAX_SIZE) for member in members}
+    total = examples.count()
+    usernames = {member.user.id: member.username for member in members}
+
+    def report(done: int, rows: Dict[int, int]):
+        if on_progress:
+            members_progress = {usernames[user_id]: count for user_id, count in rows.items()}
+            on_progress({"examples": {"done": done, "total": total}, "members": members_progress})
 
-        service = ExportApplicationService(dataset, formatters, writer)
+    try:
+        service.export(files, on_progress=report)
+        for member in members:
+            file = files[member.user.id]
+            file.seek(0)
+            with archive.open(f"{member.username}.{writer.extension}", mode="w", force_zip64=True) as entry:
+                shutil.copyfileobj(file, entry)
+    finally:
+        for file in files.values():
+            file.close()
 
-        filepath = os.path.join(dirpath, f"{member.username}.{writer.extension}")
-        service.export(filepath)
 
+def write_tombstones(project: Project, archive: zipfile.ZipFile, since: Optional[datetime] = None):
+    """Write the examples deleted since the checkpoint to `deleted.json`."""
+    tombstones = ExampleTombstone.objects.filter(project=project).order_by("deleted_at", "id")
+    if since:
+        tombstones = tombstones.filter(deleted_at__gte=since)
+    else:
+        # a first delta export has every example, so nothing needs to be deleted.
+        tombstones = tombstones.none()
+    with archive.open("deleted.json", mode="w") as entry:
+        entry.write(b"[")
+        for i, tombstone in enumerate(tombstones.iterator()):
+            entry.write((b"," if i else b"") + json.dumps(tombstone.to_dict()).encode("utf-8"))
+        entry.write(b"]")
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
+def export_dataset(self, project_id, file_format: str, confirmed_only=False, delta=False):
+    """Export the dataset of a project to a zip archive.
 
-@shared_task(autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
-def export_dataset(project_id, file_format: str, confirmed_only=False):
+    With `delta`, only the examples changed since the last delta export are exported,
+    along with the list of the examples deleted since then, and a new checkpoint is recorded.
+    """
     project = get_object_or_404(Project, pk=project_id)
-    dirpath = os.path.join(settings.MEDIA_ROOT, str(uuid.uuid4()))
-    os.makedirs(dirpath, exist_ok=True)
+    started_at = timezone.now()
+    since = ExportCheckpoint.objects.last_exported_at(project) if delta else None
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    zip_file = os.path.join(settings.MEDIA_ROOT, f"{uuid.uuid4()}.zip")
     formatters = create_formatter(project, file_format)
     writer = create_writer(file_format)
-    if project.collaborative_annotation:
-        create_collaborative_dataset(project, dirpath, confirmed_only, formatters, writer)
-    else:
-        create_individual_dataset(project, dirpath, confirmed_only, formatters, writer)
-    zip_file = shutil.make_archive(dirpath, "zip", dirpath)
-    shutil.rmtree(dirpath)
+
+    def on_progress(progress):
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=progress)
+
+    compression = ZIP_COMPRESSION[settings.EXPORT_ZIP_COMPRESSION]
+    try:
+        with zipfile.ZipFile(zip_file, "w", compression, compresslevel=settings.EXPORT_ZIP_COMPRESSLEVEL) as archive:
+            if project.collaborative_annotation:
+                create_collaborative_dataset(project, archive, confirmed_only, formatters, writer, since=since)
+            else:
+                create_individual_dataset(
+                    project, archive, confirmed_only, formatters, writer, on_progress, since=since
+                )
+            if delta:
+                write_tombstones(project, archive, since)
+    except Exception:
+        if os.path.exists(zip_file):
+            os.remove(zip_file)
+        raise
+    if delta:
+        ExportCheckpoint.objects.create(project=project, exported_at=started_at)
+        if since:
+            # the older tombstones were in the previous delta exports already.
+            ExampleTombstone.objects.filter(project=project, deleted_at__lt=since).delete()
     return zip_file
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_project_allow_member_to_create_label_type_and_more"),
+        ("data_export", "0004_exportedcomment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportCheckpoint",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("exported_at", models.DateTimeField(db_index=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_checkpoints",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ExampleTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("example_id", models.IntegerField()),
+                ("uuid", models.UUIDField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="example_tombstones",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="exampletombstone",
+            index=models.Index(fields=["project", "deleted_at"], name="data_export_project_40ea6b_idx"),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from typing import Any, Dict, Protocol, Tuple
+from datetime import datetime
+from typing import Any, Dict, Optional, Protocol, Tuple
 
 from django.db import models
 
@@ -18,6 +19,36 @@ class ExportedExampleManager(models.Manager):
             return self.filter(project=project, states__confirmed_by=user)
 
 
+class ExportCheckpointManager(models.Manager):
+    def last_exported_at(self, project: Project) -> Optional[datetime]:
+        checkpoint = self.filter(project=project).order_by("-exported_at").first()
+        return checkpoint.exported_at if checkpoint else None
+
+
+class ExportCheckpoint(models.Model):
+    """The start time of a delta export, so that the next one only has the examples changed since then."""
+
+    objects = ExportCheckpointManager()
+
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="export_checkpoints")
+    exported_at = models.DateTimeField(db_index=True)
+
+
+class ExampleTombstone(models.Model):
+    """A deleted example, reported by the delta exports."""
+
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="example_tombstones")
+    example_id = models.IntegerField()
+    uuid = models.UUIDField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.example_id, "uuid": str(self.uuid)}
+
+    class Meta:
+        indexes = [models.Index(fields=["project", "deleted_at"])]
+
+
 class ExportedExample(Example):
     objects = ExportedExampleManager()
 
@@ -30,6 +61,7 @@ class ExportedExample(Example):
 
 class ExportedLabel(Protocol):
     objects: models.Manager
+    example_id: int
 
     def to_dict(self) -> Dict[str, Any]:
         raise NotImplementedError("Please implement this method in the subclass.")
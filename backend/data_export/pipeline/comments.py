@@ -1,6 +1,6 @@
 import abc
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from django.db.models import QuerySet
 
@@ -13,12 +13,35 @@ class Comments(abc.ABC):
     fields: Tuple[str, ...] = ("example", "user")  # To boost performance
 
     def __init__(self, examples: QuerySet[ExportedExample], user=None):
-        self.comment_groups = defaultdict(list)
         comments = self.comment_class.objects.filter(example__in=examples)
         if user:
             comments = comments.filter(user=user)
-        for comment in comments.select_related(*self.fields):
-            self.comment_groups[comment.example.id].append(comment)
+        self.comment_groups = self.group_by_example(comments.select_related(*self.fields))
+
+    @staticmethod
+    def group_by_example(comments: Iterable[ExportedComment]) -> Dict[int, List[ExportedComment]]:
+        comment_groups = defaultdict(list)
+        for comment in comments:
+            comment_groups[comment.example.id].append(comment)
+        return comment_groups
+
+    @classmethod
+    def split_by_user(cls, examples: Iterable[ExportedExample], users) -> Dict[int, "Comments"]:
+        """Load the comments of several users with a single query.
+
+        Returns:
+            The comment collection of each user, by user id.
+        """
+        comments_by_user = defaultdict(list)
+        comments = cls.comment_class.objects.filter(example__in=examples, user__in=users)
+        for comment in comments.select_related(*cls.fields):
+            comments_by_user[comment.user_id].append(comment)
+        collections = {}
+        for user in users:
+            collection = cls.__new__(cls)
+            collection.comment_groups = cls.group_by_example(comments_by_user[user.id])
+            collections[user.id] = collection
+        return collections
 
     def find_by(self, example_id: int) -> Dict[str, List[ExportedComment]]:
         return {self.column: self.comment_groups[example_id]}
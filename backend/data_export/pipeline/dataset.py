@@ -1,11 +1,13 @@
-from typing import Any, Dict, Iterator, List
+from typing import Any, Dict, Iterator, List, Type
 
 import pandas as pd
+from django.db.models import Q
 from django.db.models.query import QuerySet
 
 from .comments import Comments
 from .labels import Labels
-from data_export.models import ExportedExample
+from data_export.models import DATA, ExportedExample
+from examples.models import ExampleState
 
 
 class Dataset:
@@ -28,3 +30,130 @@ class Dataset:
 
     def to_dataframe(self) -> pd.DataFrame:
         return pd.DataFrame(self)
+
+
+class ChunkedDataset:
+    """Builds the dataset chunk by chunk, so that only `chunk_size` examples and their labels are in memory.
+
+    The examples are read in (created_at, id) order, by seeking after the last example of the previous chunk.
+    Every chunk has the columns the whole dataset would have, so that the chunks can be written one after another.
+    """
+
+    def __init__(
+        self,
+        examples: QuerySet[ExportedExample],
+        label_collections: List[Type[Labels]],
+        comment_collections: List[Type[Comments]],
+        user=None,
+        is_text_project=True,
+        chunk_size=1000,
+    ):
+        self.examples = examples
+        self.label_collections = label_collections
+        self.comment_collections = comment_collections
+        self.user = user
+        self.is_text_project = is_text_project
+        self.chunk_size = chunk_size
+        self.examples_read = 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        columns = self.columns()
+        for examples in self.iter_examples():
+            labels = [collection(examples=examples, user=self.user) for collection in self.label_collections]
+            comments = [collection(examples=examples, user=self.user) for collection in self.comment_collections]
+            dataset = Dataset(examples, labels, comments, self.is_text_project).to_dataframe()  # type: ignore
+            yield dataset.reindex(columns=columns)
+
+    def iter_examples(self) -> Iterator[List[ExportedExample]]:
+        ordered = self.examples.order_by("created_at", "id")
+        examples = ordered
+        self.examples_read = 0
+        while True:
+            chunk = list(examples[: self.chunk_size])
+            if not chunk:
+                return
+            self.examples_read += len(chunk)
+            yield chunk
+            if len(chunk) < self.chunk_size:
+                return
+            last = chunk[-1]
+            examples = ordered.filter(Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id))
+
+    def columns(self) -> List[str]:
+        """Return the columns in the order `pd.DataFrame` gives them for the whole dataset.
+
+        Only the metadata is read, so the cost is a single pass over one column.
+        """
+        columns: Dict[str, None] = {}
+        for meta in self.examples.order_by("created_at", "id").values_list("meta", flat=True).iterator():
+            self.add_columns(columns, meta)
+        return list(columns)
+
+    def add_columns(self, columns: Dict[str, None], meta: Dict[str, Any]):
+        tail = [collection.column for collection in self.label_collections]
+        tail += [collection.column for collection in self.comment_collections]
+        for column in ["id", DATA, *meta, *tail]:
+            columns.setdefault(column)
+
+
+class MemberChunkedDataset(ChunkedDataset):
+    """Builds the datasets of several members in a single pass over the examples.
+
+    Each chunk of examples is read once, and the labels and comments of all the members are loaded
+    with one query per collection, then split by member. With `confirmed_only`, the dataset of
+    a member only has the examples the member confirmed.
+    """
+
+    def __init__(
+        self,
+        examples: QuerySet[ExportedExample],
+        label_collections: List[Type[Labels]],
+        comment_collections: List[Type[Comments]],
+        users,
+        confirmed_only=False,
+        is_text_project=True,
+        chunk_size=1000,
+    ):
+        super().__init__(
+            examples, label_collections, comment_collections, is_text_project=is_text_project, chunk_size=chunk_size
+        )
+        self.users = list(users)
+        self.confirmed_only = confirmed_only
+
+    def __iter__(self) -> Iterator[Dict[int, pd.DataFrame]]:  # type: ignore
+        columns = self.columns_by_user()
+        for examples in self.iter_examples():
+            labels = [collection.split_by_user(examples, self.users) for collection in self.label_collections]
+            comments = [collection.split_by_user(examples, self.users) for collection in self.comment_collections]
+            confirmed = self.find_confirmed(examples)
+            chunks = {}
+            for user in self.users:
+                user_examples = [example for example in examples if (example.id, user.id) in confirmed]
+                dataset = Dataset(
+                    user_examples if self.confirmed_only else examples,  # type: ignore
+                    [collection[user.id] for collection in labels],
+                    [collection[user.id] for collection in comments],
+                    self.is_text_project,
+                )
+                chunks[user.id] = dataset.to_dataframe().reindex(columns=columns[user.id])
+            yield chunks
+
+    def find_confirmed(self, examples: List[ExportedExample]):
+        if not self.confirmed_only:
+            return set()
+        states = ExampleState.objects.filter(example__in=examples, confirmed_by__in=self.users)
+        return set(states.values_list("example_id", "confirmed_by_id"))
+
+    def columns_by_user(self) -> Dict[int, List[str]]:
+        if not self.confirmed_only:
+            columns = self.columns()
+            return {user.id: columns for user in self.users}
+        columns_by_user: Dict[int, Dict[str, None]] = {user.id: {} for user in self.users}
+        states = (
+            ExampleState.objects.filter(example__in=self.examples, confirmed_by__in=self.users)
+            .order_by("example__created_at", "example_id")
+            .values_list("confirmed_by_id", "example__meta")
+        )
+        for user_id, meta in states.iterator():
+            self.add_columns(columns_by_user[user_id], meta)
+        return {user_id: list(columns) for user_id, columns in columns_by_user.items()}
@@ -3,7 +3,7 @@ Represents label collection.
 """
 import abc
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from django.db.models import QuerySet
 
@@ -25,12 +25,35 @@ class Labels(abc.ABC):
     fields: Tuple[str, ...] = ("example", "label")  # To boost performance
 
     def __init__(self, examples: QuerySet[ExportedExample], user=None):
-        self.label_groups = defaultdict(list)
         labels = self.label_class.objects.filter(example__in=examples)
         if user:
             labels = labels.filter(user=user)
-        for label in labels.select_related(*self.fields):
-            self.label_groups[label.example.id].append(label)
+        self.label_groups = self.group_by_example(labels.select_related(*self.fields))
+
+    @staticmethod
+    def group_by_example(labels: Iterable[ExportedLabel]) -> Dict[int, List[ExportedLabel]]:
+        label_groups = defaultdict(list)
+        for label in labels:
+            label_groups[label.example_id].append(label)
+        return label_groups
+
+    @classmethod
+    def split_by_user(cls, examples: Iterable[ExportedExample], users) -> Dict[int, "Labels"]:
+        """Load the labels of several users with a single query.
+
+        Returns:
+            The label collection of each user, by user id.
+        """
+        labels_by_user = defaultdict(list)
+        labels = cls.label_class.objects.filter(example__in=examples, user__in=users)
+        for label in labels.select_related(*cls.fields):
+            labels_by_user[label.user_id].append(label)
+        collections = {}
+        for user in users:
+            collection = cls.__new__(cls)
+            collection.label_groups = cls.group_by_example(labels_by_user[user.id])
+            collections[user.id] = collection
+        return collections
 
     def find_by(self, example_id: int) -> Dict[str, List[ExportedLabel]]:
         return {self.column: self.label_groups[example_id]}
@@ -1,19 +1,58 @@
-from typing import List
+from typing import IO, Callable, Dict, List, Mapping, Optional, Union
 
-from .dataset import Dataset
+import pandas as pd
+
+from .dataset import ChunkedDataset, Dataset, MemberChunkedDataset
 from .formatters import Formatter
 from .writers import Writer
 
 
 class ExportApplicationService:
-    def __init__(self, dataset: Dataset, formatters: List[Formatter], writer: Writer):
+    def __init__(self, dataset: Union[Dataset, ChunkedDataset], formatters: List[Formatter], writer: Writer):
         self.dataset = dataset
         self.formatters = formatters
         self.writer = writer
 
-    def export(self, file):
-        dataset = self.dataset.to_dataframe()
+    def format(self, dataset: pd.DataFrame) -> pd.DataFrame:
         for formatter in self.formatters:
             dataset = formatter.format(dataset)
-        self.writer.write(file, dataset)
+        return dataset
+
+    def export(self, file):
+        if isinstance(self.dataset, ChunkedDataset):
+            chunks = (self.format(chunk) for chunk in self.dataset)
+            self.writer.write_chunks(file, chunks)
+        else:
+            self.writer.write(file, self.format(self.dataset.to_dataframe()))
         return file
+
+
+class MemberExportApplicationService(ExportApplicationService):
+    dataset: MemberChunkedDataset
+
+    def export(
+        self,
+        files: Mapping[int, Union[str, IO[bytes]]],
+        on_progress: Optional[Callable[[int, Dict[int, int]], None]] = None,
+    ):
+        """Write the dataset of each member to its file, in a single pass over the examples.
+
+        Args:
+            files: The file of each member, a path or a binary file object, by user id.
+            on_progress: Called after each chunk with the number of examples read
+                and the number of rows written for each member.
+        """
+        streams = {user_id: self.writer.open(file) for user_id, file in files.items()}
+        try:
+            for chunks in self.dataset:
+                for user_id, chunk in chunks.items():
+                    if len(chunk):
+                        streams[user_id].append(self.format(chunk))
+                if on_progress:
+                    on_progress(
+                        self.dataset.examples_read, {user_id: stream.rows for user_id, stream in streams.items()}
+                    )
+        finally:
+            for stream in streams.values():
+                stream.close()
+        return files
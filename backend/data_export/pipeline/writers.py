@@ -1,4 +1,7 @@
 import abc
+import io
+import os
+from typing import IO, Iterable
 
 import pandas as pd
 
@@ -11,6 +14,66 @@ class Writer(abc.ABC):
     def write(file, dataset: pd.DataFrame):
         raise NotImplementedError("Please implement this method in the subclass.")
 
+    @staticmethod
+    def write_header(f: IO[str]):
+        pass
+
+    @staticmethod
+    @abc.abstractmethod
+    def write_chunk(f: IO[str], chunk: pd.DataFrame, is_first: bool):
+        raise NotImplementedError("Please implement this method in the subclass.")
+
+    @staticmethod
+    def write_footer(f: IO[str]):
+        pass
+
+    def open(self, file) -> "ChunkStream":
+        return ChunkStream(self, file)
+
+    def write_chunks(self, file, chunks: Iterable[pd.DataFrame]):
+        """Write the chunks one after another, without holding the whole dataset in memory."""
+        with self.open(file) as stream:
+            for chunk in chunks:
+                stream.append(chunk)
+
+
+class ChunkStream:
+    """A file the chunks of a dataset are appended to, as they are built.
+
+    The file is either a path or a binary file object, such as an entry of a zip archive.
+    A file object is left open when the stream is closed.
+    """
+
+    def __init__(self, writer: Writer, file):
+        self.writer = writer
+        self.owns_file = isinstance(file, (str, os.PathLike))
+        if self.owns_file:
+            self.file = open(file, mode="w", encoding="utf-8", newline="")
+        else:
+            self.file = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        self.rows = 0
+        self.writer.write_header(self.file)
+
+    def append(self, chunk: pd.DataFrame):
+        if len(chunk) == 0:
+            return
+        self.writer.write_chunk(self.file, chunk, is_first=self.rows == 0)
+        self.rows += len(chunk)
+
+    def close(self):
+        self.writer.write_footer(self.file)
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+            self.file.detach()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 
 class CsvWriter(Writer):
     extension = "csv"
@@ -19,6 +82,10 @@ class CsvWriter(Writer):
     def write(file, dataset: pd.DataFrame):
         dataset.to_csv(file, index=False, encoding="utf-8")
 
+    @staticmethod
+    def write_chunk(f: IO[str], chunk: pd.DataFrame, is_first: bool):
+        chunk.to_csv(f, index=False, header=is_first)
+
 
 class JsonWriter(Writer):
     extension = "json"
@@ -27,6 +94,19 @@ class JsonWriter(Writer):
     def write(file, dataset: pd.DataFrame):
         dataset.to_json(file, orient="records", force_ascii=False)
 
+    @staticmethod
+    def write_header(f: IO[str]):
+        f.write("[")
+
+    @staticmethod
+    def write_chunk(f: IO[str], chunk: pd.DataFrame, is_first: bool):
+        records = chunk.to_json(orient="records", force_ascii=False)[1:-1]
+        f.write(records if is_first else "," + records)
+
+    @staticmethod
+    def write_footer(f: IO[str]):
+        f.write("]")
+
 
 class JsonlWriter(Writer):
     extension = "jsonl"
@@ -35,6 +115,10 @@ class JsonlWriter(Writer):
     def write(file, dataset: pd.DataFrame):
         dataset.to_json(file, orient="records", force_ascii=False, lines=True)
 
+    @staticmethod
+    def write_chunk(f: IO[str], chunk: pd.DataFrame, is_first: bool):
+        f.write(chunk.to_json(orient="records", force_ascii=False, lines=True).rstrip("\n") + "\n")
+
 
 class FastTextWriter(Writer):
     extension = "txt"
@@ -42,3 +126,7 @@ class FastTextWriter(Writer):
     @staticmethod
     def write(file, dataset: pd.DataFrame):
         dataset.to_csv(file, index=False, encoding="utf-8", header=False)
+
+    @staticmethod
+    def write_chunk(f: IO[str], chunk: pd.DataFrame, is_first: bool):
+        chunk.to_csv(f, index=False, header=False)
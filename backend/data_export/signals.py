@@ -0,0 +1,74 @@
+import threading
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import ExampleTombstone
+from examples.models import Example
+from projects.models import Project
+from projects.transactions import on_commit_batch
+
+# The models whose changes make an example part of the next delta export.
+ANNOTATION_SOURCES = [
+    "examples.ExampleState",
+    "examples.Comment",
+    "labels.Category",
+    "labels.Span",
+    "labels.Relation",
+    "labels.TextLabel",
+    "labels.BoundingBox",
+    "labels.Segmentation",
+]
+
+
+def is_deleted_with(origin, models) -> bool:
+    """Whether a delete cascades from an instance or a queryset of the given models."""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, models)
+    return isinstance(origin, models)
+
+
+def touch_examples(example_ids):
+    Example.objects.touch(set(example_ids))
+
+
+def touch_example(sender, instance, **kwargs):
+    # skipped when the example itself is deleted, and done once per transaction for all the changed examples.
+    if not is_deleted_with(kwargs.get("origin"), (Example, Project)):
+        on_commit_batch("touched_examples", instance.example_id, touch_examples)
+
+
+for source in ANNOTATION_SOURCES:
+    post_save.connect(touch_example, sender=source)
+    post_delete.connect(touch_example, sender=source)
+
+
+class PendingTombstones(threading.local):
+    """The tombstones of the examples being deleted, by the instance or queryset the delete started from."""
+
+    def __init__(self):
+        self.origin = None
+        self.tombstones = []
+
+
+pending = PendingTombstones()
+
+
+@receiver(pre_delete, sender=Example)
+def collect_tombstone(sender, instance, origin=None, **kwargs):
+    if is_deleted_with(origin, Project):
+        return
+    if pending.origin is not origin:
+        pending.origin, pending.tombstones = origin, []
+    pending.tombstones.append(
+        ExampleTombstone(project_id=instance.project_id, example_id=instance.id, uuid=instance.uuid)
+    )
+
+
+@receiver(post_delete, sender=Example)
+def record_tombstones(sender, instance, origin=None, **kwargs):
+    # pre_delete is sent for every example before any is deleted, so the first post_delete writes them all.
+    if pending.origin is origin and pending.tombstones:
+        ExampleTombstone.objects.bulk_create(pending.tombstones)
+        pending.origin, pending.tombstones = None, []
@@ -2,9 +2,16 @@ import unittest
 from unittest.mock import MagicMock
 
 import pandas as pd
+from django.test import TestCase
+from model_mommy import mommy
 from pandas.testing import assert_frame_equal
 
-from data_export.pipeline.dataset import Dataset
+from data_export.models import ExportedExample
+from data_export.pipeline.comments import Comments
+from data_export.pipeline.dataset import ChunkedDataset, Dataset
+from data_export.pipeline.labels import Categories
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
 
 
 class TestDataset(unittest.TestCase):
@@ -27,3 +34,28 @@ class TestDataset(unittest.TestCase):
         df = dataset.to_dataframe()
         expected = pd.DataFrame([{"data": "example", "labels": ["label"], "comments": ["comment"]}])
         assert_frame_equal(df, expected)
+
+
+class TestChunkedDataset(TestCase):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example1 = mommy.make("ExportedExample", project=self.project.item, text="example1", meta={})
+        self.example2 = mommy.make("ExportedExample", project=self.project.item, text="example2", meta={"a": 1})
+        self.example3 = mommy.make("ExportedExample", project=self.project.item, text="example3", meta={})
+        mommy.make("ExportedCategory", example=self.example2, user=self.project.admin)
+        self.examples = ExportedExample.objects.filter(project=self.project.item)
+
+    def test_chunks_match_whole_dataset(self):
+        dataset = ChunkedDataset(self.examples, [Categories], [Comments], chunk_size=2)
+        chunks = list(dataset)
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        expected = Dataset(self.examples, [Categories(self.examples)], [Comments(self.examples)]).to_dataframe()
+        for chunk in chunks:
+            self.assertEqual(list(chunk.columns), list(expected.columns))
+        self.assertEqual(pd.concat(chunks)["id"].tolist(), expected["id"].tolist())
+        self.assertEqual(pd.concat(chunks)["categories"].apply(len).tolist(), [0, 1, 0])
+
+    def test_labels_are_fetched_per_chunk(self):
+        dataset = ChunkedDataset(self.examples, [Categories], [Comments], chunk_size=1)
+        with self.assertNumQueries(1 + 3 * 3 + 1):
+            self.assertEqual(len(list(dataset)), 3)
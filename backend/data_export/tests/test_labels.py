@@ -26,3 +26,16 @@ class TestLabels(TestCase):
         categories = Categories(self.examples, user=self.project.annotator)
         result = categories.find_by(self.example1.id)
         self.assertEqual(len(result[Categories.column]), 0)
+
+    def test_split_by_user(self):
+        mommy.make("ExportedCategory", example=self.example2, user=self.project.annotator)
+        users = [self.project.admin, self.project.annotator, self.project.approver]
+        with self.assertNumQueries(1):
+            collections = Categories.split_by_user(self.examples, users)
+        admin = collections[self.project.admin.id]
+        annotator = collections[self.project.annotator.id]
+        approver = collections[self.project.approver.id]
+        self.assertEqual(len(admin.find_by(self.example1.id)[Categories.column]), 1)
+        self.assertEqual(len(admin.find_by(self.example2.id)[Categories.column]), 0)
+        self.assertEqual(len(annotator.find_by(self.example2.id)[Categories.column]), 1)
+        self.assertEqual(len(approver.find_by(self.example1.id)[Categories.column]), 0)
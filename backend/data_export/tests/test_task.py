@@ -1,12 +1,18 @@
+import io
+import json
 import os
 import zipfile
 
 import pandas as pd
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from model_mommy import mommy
 
-from ..celery_tasks import export_dataset
-from data_export.models import DATA
+from ..celery_tasks import create_individual_dataset, export_dataset
+from ..pipeline.factories import create_formatter, create_writer
+from data_export.models import DATA, ExampleTombstone, ExportCheckpoint
+from examples.models import Example
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
 
@@ -824,3 +830,127 @@ class TestExportRelation(TestExport):
             }
         ]
         self.assertEqual(dataset, expected_dataset)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=1)
+class TestExportCategoryInChunks(TestExportCategory):
+    """Runs the category export tests with one example per chunk."""
+
+
+class TestExportIndividualDataset(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example1 = mommy.make("ExportedExample", project=self.project.item, text="example1")
+        self.example2 = mommy.make("ExportedExample", project=self.project.item, text="example2")
+        mommy.make("ExportedCategory", example=self.example1, user=self.project.admin)
+        mommy.make("ExampleState", example=self.example1, confirmed_by=self.project.admin)
+        self.formatters = create_formatter(self.project.item, "JSONL")
+        self.writer = create_writer("JSONL")
+
+    def export(self, confirmed_only=False):
+        progress = []
+        with zipfile.ZipFile(io.BytesIO(), "w") as archive:
+            create_individual_dataset(
+                self.project.item, archive, confirmed_only, self.formatters, self.writer, progress.append
+            )
+        return progress
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_reports_progress_per_member(self):
+        progress = self.export(confirmed_only=True)
+        self.assertEqual(len(progress), 1)
+        self.assertEqual(progress[-1]["examples"], {"done": 1, "total": 1})
+        self.assertEqual(
+            progress[-1]["members"],
+            {self.project.admin.username: 1, self.project.approver.username: 0, self.project.annotator.username: 0},
+        )
+
+    def test_reads_examples_once_for_all_members(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.export()
+        for _ in range(3):
+            mommy.make("Member", project=self.project.item)
+        with CaptureQueriesContext(connection) as more_members_queries:
+            self.export()
+        self.assertEqual(len(queries), len(more_members_queries))
+
+
+class TestExportArchive(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, collaborative_annotation=True)
+        mommy.make("ExportedExample", project=self.project.item, text="example1")
+
+    def export_dataset(self):
+        file = export_dataset(self.project.id, "JSONL")
+        with zipfile.ZipFile(file) as archive:
+            infos = archive.infolist()
+        os.remove(file)
+        return infos
+
+    def test_compresses_entries(self):
+        infos = self.export_dataset()
+        self.assertEqual([info.filename for info in infos], ["all.jsonl"])
+        self.assertEqual(infos[0].compress_type, zipfile.ZIP_DEFLATED)
+
+    @override_settings(EXPORT_ZIP_COMPRESSION="stored")
+    def test_stores_entries(self):
+        infos = self.export_dataset()
+        self.assertEqual(infos[0].compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(infos[0].compress_size, infos[0].file_size)
+
+
+class TestDeltaExport(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, collaborative_annotation=True)
+        self.example1 = mommy.make("Example", project=self.project.item, text="example1")
+        self.example2 = mommy.make("Example", project=self.project.item, text="example2")
+        self.example3 = mommy.make("Example", project=self.project.item, text="example3")
+
+    def export_dataset(self):
+        file = export_dataset(self.project.id, "JSONL", delta=True)
+        with zipfile.ZipFile(file) as archive:
+            with archive.open("all.jsonl") as f:
+                ids = [json.loads(line)["id"] for line in f]
+            with archive.open("deleted.json") as f:
+                deleted = json.load(f)
+        os.remove(file)
+        return ids, deleted
+
+    def test_first_delta_has_every_example(self):
+        ids, deleted = self.export_dataset()
+        self.assertEqual(ids, [self.example1.id, self.example2.id, self.example3.id])
+        self.assertEqual(deleted, [])
+        self.assertEqual(ExportCheckpoint.objects.filter(project=self.project.item).count(), 1)
+
+    def test_delta_has_changed_and_deleted_examples(self):
+        self.export_dataset()
+        with self.captureOnCommitCallbacks(execute=True):
+            mommy.make("Category", example=self.example1, user=self.project.admin)
+            mommy.make("Comment", example=self.example3, user=self.project.admin)
+        example2_id, example2_uuid = self.example2.id, str(self.example2.uuid)
+        self.example2.delete()
+        ids, deleted = self.export_dataset()
+        self.assertEqual(ids, [self.example1.id, self.example3.id])
+        self.assertEqual(deleted, [{"id": example2_id, "uuid": example2_uuid}])
+
+    def test_delta_has_examples_with_deleted_labels(self):
+        category = mommy.make("Category", example=self.example2, user=self.project.admin)
+        self.export_dataset()
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+        ids, _ = self.export_dataset()
+        self.assertEqual(ids, [self.example2.id])
+
+    def test_project_deletion_records_no_tombstones(self):
+        self.project.item.delete()
+        self.assertFalse(ExampleTombstone.objects.exists())
+
+    def test_records_tombstones_of_deleted_examples_at_once(self):
+        examples = [self.example1, self.example2, self.example3]
+        with CaptureQueriesContext(connection) as context:
+            Example.objects.filter(project=self.project.item).delete()
+        inserts = [query for query in context if query["sql"].startswith('INSERT INTO "data_export_exampletombstone"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertCountEqual(
+            ExampleTombstone.objects.values_list("example_id", "uuid"), [(e.id, e.uuid) for e in examples]
+        )
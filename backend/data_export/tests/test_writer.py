@@ -29,6 +29,12 @@ class TestCSVWriter(TestWriter):
         loaded_dataset = pd.read_csv(self.file)
         assert_frame_equal(self.dataset, loaded_dataset)
 
+    def test_write_chunks(self):
+        writer = CsvWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:]])
+        loaded_dataset = pd.read_csv(self.file)
+        assert_frame_equal(self.dataset, loaded_dataset)
+
 
 class TestJsonWriter(TestWriter):
     def test_write(self):
@@ -37,6 +43,18 @@ class TestJsonWriter(TestWriter):
         loaded_dataset = pd.read_json(self.file)
         assert_frame_equal(self.dataset, loaded_dataset)
 
+    def test_write_chunks(self):
+        writer = JsonWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:2], self.dataset[2:]])
+        loaded_dataset = pd.read_json(self.file)
+        assert_frame_equal(self.dataset, loaded_dataset)
+
+    def test_write_no_chunks(self):
+        writer = JsonWriter()
+        writer.write_chunks(self.file, [])
+        with open(self.file, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "[]")
+
 
 class TestJsonlWriter(TestWriter):
     def test_write(self):
@@ -45,6 +63,12 @@ class TestJsonlWriter(TestWriter):
         loaded_dataset = pd.read_json(self.file, lines=True)
         assert_frame_equal(self.dataset, loaded_dataset)
 
+    def test_write_chunks(self):
+        writer = JsonlWriter()
+        writer.write_chunks(self.file, [self.dataset[:2], self.dataset[2:]])
+        loaded_dataset = pd.read_json(self.file, lines=True)
+        assert_frame_equal(self.dataset, loaded_dataset)
+
 
 class TestFastText(unittest.TestCase):
     def setUp(self):
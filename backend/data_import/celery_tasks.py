@@ -1,14 +1,16 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 import filetype
-from celery import shared_task
+from celery import chord, shared_task
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_drf_filepond.api import store_upload
 from django_drf_filepond.models import TemporaryUpload
 
-from .datasets import load_dataset
+from .datasets import Dataset, load_dataset
+from .models import ImportCheckpoint
 from .pipeline.catalog import Format, create_file_format
 from .pipeline.exceptions import (
     FileImportException,
@@ -17,6 +19,7 @@ from .pipeline.exceptions import (
 )
 from .pipeline.readers import FileName
 from projects.models import Project
+from projects.report_cache import notify_annotation_change
 
 
 def check_file_type(filename, file_format: Format, filepath: str):
@@ -46,28 +49,118 @@ def check_uploaded_files(upload_ids: List[str], file_format: Format):
     return cleaned_ids, errors
 
 
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
+def import_dataset(self, user_id, project_id, file_format: str, upload_ids: List[str], task: str, **kwargs):
+    """Import the uploaded files into a project.
+
+    With several files and a worker to run them, each file is imported by its own `import_file` subtask,
+    so that the files are parsed in parallel, and `merge_import_results` reports the errors of all of them
+    under the id of this task once they are done.
+    Label types are created with conflicts ignored, so the subtasks can create the same ones concurrently.
+
+    When run by a worker, every file is checkpointed after each committed batch, so that a retry resumes
+    where the failed attempt stopped, and the progress of the files is reported in the state of this task.
+    Files imported completely by a previous attempt have been moved out of the temporary uploads, so only
+    their errors are kept.
+    """
+    get_object_or_404(Project, pk=project_id)
+    import_id = self.request.id
+    try:
+        fmt = create_file_format(file_format)
+        upload_ids, errors = check_uploaded_files(upload_ids, fmt)
+    except FileImportException as e:
+        return {"error": [e.dict()]}
+
+    errors = [e.dict() for e in errors]
+    if import_id:
+        for checkpoint in ImportCheckpoint.objects.filter(task_id=import_id, done=True):
+            errors += checkpoint.errors
+        ImportCheckpoint.objects.bulk_create(
+            [ImportCheckpoint(task_id=import_id, upload_id=upload_id) for upload_id in upload_ids],
+            ignore_conflicts=True,
+        )
+    if len(upload_ids) > 1 and not (self.request.called_directly or self.request.is_eager):
+        subtasks = [
+            import_file.s(user_id, project_id, file_format, upload_id, task, import_id=import_id, **kwargs)
+            for upload_id in upload_ids
+        ]
+        return self.replace(chord(subtasks, merge_import_results.s(project_id, errors, import_id)))
+    results = [
+        import_file(user_id, project_id, file_format, upload_id, task, import_id=import_id, **kwargs)
+        for upload_id in upload_ids
+    ]
+    return merge_import_results(results, project_id, errors, import_id)
+
+
 @shared_task(autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
-def import_dataset(user_id, project_id, file_format: str, upload_ids: List[str], task: str, **kwargs):
+def import_file(
+    user_id, project_id, file_format: str, upload_id: str, task: str, import_id: Optional[str] = None, **kwargs
+):
     project = get_object_or_404(Project, pk=project_id)
     user = get_object_or_404(get_user_model(), pk=user_id)
     try:
         fmt = create_file_format(file_format)
-        upload_ids, errors = check_uploaded_files(upload_ids, fmt)
-        temporary_uploads = TemporaryUpload.objects.filter(upload_id__in=upload_ids)
+        temporary_uploads = TemporaryUpload.objects.filter(upload_id=upload_id)
         filenames = [
             FileName(full_path=tu.get_file_path(), generated_name=tu.file.name, upload_name=tu.upload_name)
             for tu in temporary_uploads
         ]
 
         dataset = load_dataset(task, fmt, filenames, project, **kwargs)
-        dataset.save(user, batch_size=settings.IMPORT_BATCH_SIZE)
+        if import_id:
+            errors = save_with_checkpoint(dataset, user, import_id, upload_id)
+        else:
+            dataset.save(user, batch_size=settings.IMPORT_BATCH_SIZE)
+            errors = [e.dict() for e in dataset.errors]
         upload_to_store(temporary_uploads)
-        errors.extend(dataset.errors)
-        return {"error": [e.dict() for e in errors]}
+        return {"error": errors}
     except FileImportException as e:
         return {"error": [e.dict()]}
 
 
+def save_with_checkpoint(dataset: Dataset, user, import_id: str, upload_id: str) -> List[Dict[str, Any]]:
+    """Save the dataset from the checkpoint of the file, updating it in the transaction of each batch.
+
+    The rows committed by a previous attempt are skipped. Their errors come from the checkpoint, while
+    the parse errors found again by this attempt are dropped.
+    """
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(task_id=import_id, upload_id=upload_id)
+    previous_errors = checkpoint.errors
+
+    def merge_errors() -> List[Dict[str, Any]]:
+        seen = {tuple(error.items()) for error in previous_errors}
+        errors = [error.dict() for error in dataset.errors]
+        return previous_errors + [error for error in errors if tuple(error.items()) not in seen]
+
+    def on_batch(rows: int, examples: int):
+        checkpoint.commit(rows, examples, merge_errors())
+        transaction.on_commit(lambda: report_progress(import_id))
+
+    dataset.save(user, batch_size=settings.IMPORT_BATCH_SIZE, skip=checkpoint.rows_parsed, on_batch=on_batch)
+    errors = merge_errors()
+    checkpoint.finish(errors)
+    report_progress(import_id)
+    return errors
+
+
+def report_progress(import_id: str):
+    progress = ImportCheckpoint.objects.progress(import_id)
+    import_dataset.update_state(task_id=import_id, state="PROGRESS", meta=progress)
+
+
+@shared_task
+def merge_import_results(
+    results: List[Dict[str, Any]], project_id, errors: List[Dict[str, Any]], import_id: Optional[str] = None
+):
+    # bulk inserts bypass the signals invalidating cached reports.
+    notify_annotation_change(project_id)
+    if import_id:
+        ImportCheckpoint.objects.filter(task_id=import_id).delete()
+    for result in results:
+        errors = errors + result["error"]
+    return {"error": errors}
+
+
 def upload_to_store(temporary_uploads):
     for tu in temporary_uploads:
         store_upload(tu.upload_id, destination_file_path=tu.file.name)
@@ -1,11 +1,14 @@
 import abc
-from typing import List, Type
+from typing import Callable, List, Optional, Type
 
+import pandas as pd
 from django.contrib.auth.models import User
+from django.db import transaction
 
 from .models import DummyLabelType
 from .pipeline.catalog import RELATION_EXTRACTION, Format
 from .pipeline.data import BaseData, BinaryData, TextData
+from .pipeline.dedup import KEEP
 from .pipeline.examples import Examples
 from .pipeline.exceptions import FileParseException
 from .pipeline.factories import create_parser
@@ -28,8 +31,31 @@ class Dataset(abc.ABC):
         self.reader = reader
         self.project = project
         self.kwargs = kwargs
-
-    def save(self, user: User, batch_size: int = 1000):
+        self.duplicates = kwargs.get("duplicates") or KEEP
+
+    def save(
+        self,
+        user: User,
+        batch_size: int = 1000,
+        skip: int = 0,
+        on_batch: Optional[Callable[[int, int], None]] = None,
+    ):
+        """Save the files batch by batch, each batch in its own transaction.
+
+        Args:
+            user: The user importing the files.
+            batch_size: The number of rows per batch.
+            skip: The number of rows to skip, e.g. those committed by a previous attempt.
+            on_batch: Called in the transaction of each batch with its number of rows and of inserted examples,
+                the duplicates skipped or merged not being counted.
+        """
+        for records in self.reader.batch(batch_size, skip=skip):
+            with transaction.atomic():
+                examples = self.save_batch(user, records)
+                if on_batch:
+                    on_batch(len(records), examples.inserted)
+
+    def save_batch(self, user: User, records: pd.DataFrame) -> Examples:
         raise NotImplementedError()
 
     @property
@@ -42,10 +68,10 @@ class PlainDataset(Dataset):
         super().__init__(reader, project, **kwargs)
         self.example_maker = ExampleMaker(project=project, data_class=TextData)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: pd.DataFrame) -> Examples:
+        examples = Examples(self.example_maker.make(records), self.duplicates)
+        examples.save()
+        return examples
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -71,19 +97,19 @@ class DatasetWithSingleLabelType(Dataset):
             column=kwargs.get("column_label") or DEFAULT_LABEL_COLUMN, label_class=self.label_class
         )
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: pd.DataFrame) -> Examples:
+        # create examples
+        examples = Examples(self.example_maker.make(records), self.duplicates)
+        examples.save()
 
-            # create label types
-            labels = self.labels_class(self.label_maker.make(records), self.types)
-            labels.clean(self.project)
-            labels.save_types(self.project)
+        # create label types
+        labels = self.labels_class(self.label_maker.make(records), self.types)
+        labels.clean(self.project)
+        labels.save_types(self.project)
 
-            # create Labels
-            labels.save(user, examples)
+        # create Labels
+        labels.save(user, examples)
+        return examples
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -93,12 +119,13 @@ class DatasetWithSingleLabelType(Dataset):
 class BinaryDataset(Dataset):
     def __init__(self, reader: Reader, project: Project, **kwargs):
         super().__init__(reader, project, **kwargs)
-        self.example_maker = BinaryExampleMaker(project=project, data_class=BinaryData)
+        paths = {filename.generated_name: filename.full_path for filename in reader.filenames}
+        self.example_maker = BinaryExampleMaker(project=project, data_class=BinaryData, paths=paths)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: pd.DataFrame) -> Examples:
+        examples = Examples(self.example_maker.make(records), self.duplicates)
+        examples.save()
+        return examples
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -140,24 +167,24 @@ class RelationExtractionDataset(Dataset):
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
         self.relation_maker = LabelMaker(column="relations", label_class=RelationLabel)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: pd.DataFrame) -> Examples:
+        # create examples
+        examples = Examples(self.example_maker.make(records), self.duplicates)
+        examples.save()
 
-            # create label types
-            spans = Spans(self.span_maker.make(records), self.span_types)
-            spans.clean(self.project)
-            spans.save_types(self.project)
+        # create label types
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
 
-            relations = Relations(self.relation_maker.make(records), self.relation_types)
-            relations.clean(self.project)
-            relations.save_types(self.project)
+        relations = Relations(self.relation_maker.make(records), self.relation_types)
+        relations.clean(self.project)
+        relations.save_types(self.project)
 
-            # create Labels
-            spans.save(user, examples)
-            relations.save(user, examples, spans=spans)
+        # create Labels
+        spans.save(user, examples)
+        relations.save(user, examples, spans=spans)
+        return examples
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -178,24 +205,24 @@ class CategoryAndSpanDataset(Dataset):
         self.category_maker = LabelMaker(column="cats", label_class=CategoryLabel)
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: pd.DataFrame) -> Examples:
+        # create examples
+        examples = Examples(self.example_maker.make(records), self.duplicates)
+        examples.save()
 
-            # create label types
-            categories = Categories(self.category_maker.make(records), self.category_types)
-            categories.clean(self.project)
-            categories.save_types(self.project)
+        # create label types
+        categories = Categories(self.category_maker.make(records), self.category_types)
+        categories.clean(self.project)
+        categories.save_types(self.project)
 
-            spans = Spans(self.span_maker.make(records), self.span_types)
-            spans.clean(self.project)
-            spans.save_types(self.project)
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
 
-            # create Labels
-            categories.save(user, examples)
-            spans.save(user, examples)
+        # create Labels
+        categories.save(user, examples)
+        spans.save(user, examples)
+        return examples
 
     @property
     def errors(self) -> List[FileParseException]:
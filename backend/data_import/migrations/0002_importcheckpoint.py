@@ -0,0 +1,31 @@
+# Generated by Django 4.1.7 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_import", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("task_id", models.CharField(max_length=191)),
+                ("upload_id", models.CharField(max_length=22)),
+                ("rows_parsed", models.PositiveIntegerField(default=0)),
+                ("rows_committed", models.PositiveIntegerField(default=0)),
+                ("errors", models.JSONField(default=list)),
+                ("error_count", models.PositiveIntegerField(default=0)),
+                ("done", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="importcheckpoint",
+            constraint=models.UniqueConstraint(fields=("task_id", "upload_id"), name="unique_import_checkpoint"),
+        ),
+    ]
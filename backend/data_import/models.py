@@ -1,5 +1,9 @@
+from typing import Any, Dict, List
 from unittest.mock import MagicMock
 
+from django.db import models
+from django.db.models import Count, Q, Sum
+
 from label_types.models import CategoryType
 
 
@@ -8,3 +12,50 @@ class DummyLabelType(CategoryType):
 
     class Meta:
         proxy = True
+
+
+class ImportCheckpointManager(models.Manager):
+    def progress(self, task_id: str) -> Dict[str, Any]:
+        """Sum up the progress of the files of an import task."""
+        progress = self.filter(task_id=task_id).aggregate(
+            rows_parsed=Sum("rows_parsed", default=0),
+            rows_committed=Sum("rows_committed", default=0),
+            errors=Sum("error_count", default=0),
+            files_done=Count("id", filter=Q(done=True)),
+            files_total=Count("id"),
+        )
+        progress["files"] = {"done": progress.pop("files_done"), "total": progress.pop("files_total")}
+        return progress
+
+
+class ImportCheckpoint(models.Model):
+    """The position of the last committed batch of an uploaded file, from which a retried import resumes.
+
+    `rows_parsed` counts the rows read from the file, and `rows_committed` the examples inserted from them,
+    without the duplicates skipped or merged.
+    """
+
+    objects = ImportCheckpointManager()
+
+    task_id = models.CharField(max_length=191)
+    upload_id = models.CharField(max_length=22)
+    rows_parsed = models.PositiveIntegerField(default=0)
+    rows_committed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+    error_count = models.PositiveIntegerField(default=0)
+    done = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def commit(self, rows: int, examples: int, errors: List[Dict[str, Any]]):
+        self.rows_parsed += rows
+        self.rows_committed += examples
+        self.errors = errors
+        self.error_count = len(errors)
+        self.save()
+
+    def finish(self, errors: List[Dict[str, Any]]):
+        self.done = True
+        self.commit(0, 0, errors)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["task_id", "upload_id"], name="unique_import_checkpoint")]
@@ -206,7 +206,11 @@ class AudioFile(Format):
         return mime in self.accept_types
 
 
-class ArgColumn(BaseModel):
+class ArgDuplicates(BaseModel):
+    duplicates: Literal["keep", "skip", "merge"] = "keep"
+
+
+class ArgColumn(ArgDuplicates):
     encoding: encodings = "utf_8"
     column_data: str = "text"
     column_label: str = "label"
@@ -217,17 +221,17 @@ class ArgDelimiter(ArgColumn):
     delimiter: Literal[",", "\t", ";", "|", " "] = ","
 
 
-class ArgEncoding(BaseModel):
+class ArgEncoding(ArgDuplicates):
     encoding: encodings = "utf_8"
 
 
-class ArgCoNLL(BaseModel):
+class ArgCoNLL(ArgDuplicates):
     encoding: encodings = "utf_8"
     scheme: Literal["IOB2", "IOE2", "IOBES", "BILOU"] = "IOB2"
     delimiter: Literal[" ", ""] = " "
 
 
-class ArgNone(BaseModel):
+class ArgNone(ArgDuplicates):
     pass
 
 
@@ -1,8 +1,11 @@
 import abc
 from typing import Any, Dict
 
+import numpy as np
+import pandas as pd
 from pydantic import UUID4, BaseModel, validator
 
+from .dedup import hash_text
 from examples.models import Example
 from projects.models import Project
 
@@ -23,6 +26,18 @@ class BaseData(BaseModel, abc.ABC):
     def __hash__(self):
         return hash(tuple(self.dict()))
 
+    @classmethod
+    def check_texts(cls, texts: pd.Series) -> np.ndarray:
+        """Validate a column of string texts at once, as the model would do for each of them.
+
+        Args:
+            texts: The texts, all of them strings.
+
+        Returns:
+            A boolean mask of the valid texts.
+        """
+        return np.ones(len(texts), dtype=bool)
+
     @abc.abstractmethod
     def create(self, project: Project) -> Example:
         raise NotImplementedError("Please implement this method in the subclass.")
@@ -38,6 +53,10 @@ class TextData(BaseData):
         else:
             raise ValueError("The empty text is not allowed.")
 
+    @classmethod
+    def check_texts(cls, texts: pd.Series) -> np.ndarray:
+        return texts.str.len().gt(0).to_numpy()
+
     def create(self, project: Project) -> Example:
         return Example(
             uuid=self.uuid,
@@ -46,6 +65,7 @@ class TextData(BaseData):
             upload_name=self.upload_name,
             text=self.text,
             meta=self.meta,
+            content_hash=hash_text(self.text),
         )
 
 
@@ -0,0 +1,67 @@
+import hashlib
+import unicodedata
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from examples.models import Example
+from projects.models import Project
+
+# What to do with the rows whose content is already in the project
+KEEP = "keep"
+SKIP = "skip"
+MERGE = "merge"
+
+
+def normalize_text(text: str) -> str:
+    """Normalize the unicode form and the whitespaces of a text, so that reformatted copies compare equal."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_duplicates(examples: List[Example]) -> Tuple[List[Example], Dict[UUID, Example]]:
+    """Split a batch of examples into the new ones and the duplicates.
+
+    The hashes of the batch are looked up in the project with a single query, once the row of
+    the project is locked: the imports running in parallel into a project then split their
+    batches one after the other, each seeing the examples the previous ones committed.
+    A duplicate is mapped to the example it duplicates, either an example of the project
+    or the first example of the batch with the same content.
+
+    Args:
+        examples: The examples of a project, with their content hash. Called in the transaction
+            inserting the new ones, which holds the lock until it commits.
+
+    Returns:
+        The new examples, and the original example of each duplicate by the UUID of the duplicate.
+    """
+    if not examples:
+        return examples, {}
+    project_id = examples[0].project_id
+    list(Project.objects.select_for_update().filter(pk=project_id).values_list("pk", flat=True))
+    hashes = {example.content_hash for example in examples if example.content_hash}
+    originals: Dict[str, Example] = {}
+    queryset = Example.objects.filter(project_id=project_id, content_hash__in=hashes)
+    for original in queryset.only("id", "uuid", "project_id", "content_hash").order_by("-id"):
+        originals[original.content_hash] = original  # the oldest one wins
+    new, duplicate_of = [], {}
+    for example in examples:
+        if not example.content_hash:
+            new.append(example)
+            continue
+        original = originals.setdefault(example.content_hash, example)
+        if original is example:
+            new.append(example)
+        else:
+            duplicate_of[example.uuid] = original
+    return new, duplicate_of
@@ -1,14 +1,22 @@
-from typing import Dict, List
+from typing import Dict, List, Set
 
 from pydantic import UUID4
 
+from .dedup import KEEP, MERGE, split_duplicates
+from .loaders import get_loader
 from examples.models import Example
 
 
 class Examples:
-    def __init__(self, examples: List[Example]):
+    def __init__(self, examples: List[Example], duplicates: str = KEEP):
         self.examples = examples
+        self.duplicates = duplicates
         self.uuid_to_example: Dict[UUID4, Example] = {}
+        self.merged_ids: Set[int] = set()
+        self.inserted = 0
+
+    def __len__(self) -> int:
+        return len(self.examples)
 
     def __getitem__(self, uuid: UUID4) -> Example:
         return self.uuid_to_example[uuid]
@@ -17,5 +25,15 @@ class Examples:
         return uuid in self.uuid_to_example
 
     def save(self):
-        examples = Example.objects.bulk_create(self.examples)
+        examples, duplicate_of = self.examples, {}
+        if self.duplicates != KEEP:
+            examples, duplicate_of = split_duplicates(self.examples)
+        examples = get_loader(Example).insert(Example, examples)
+        self.inserted = len(examples)
         self.uuid_to_example = {example.uuid: example for example in examples}
+        if self.duplicates == MERGE:
+            # the labels of a duplicate go to the example it duplicates.
+            for uuid, original in duplicate_of.items():
+                example = self.uuid_to_example.get(original.uuid, original)
+                self.uuid_to_example[uuid] = example
+                self.merged_ids.add(example.id)
@@ -1,10 +1,13 @@
 import abc
 import uuid
-from typing import Any, Optional
+from typing import Any, List, Optional
 
+import numpy as np
+import pandas as pd
 from pydantic import UUID4, BaseModel, NonNegativeInt, constr, root_validator
 
 from .label_types import LabelTypes
+from .readers import generate_uuids
 from examples.models import Example
 from label_types.models import CategoryType, LabelType, RelationType, SpanType
 from labels.models import Category as CategoryModel
@@ -15,6 +18,10 @@ from labels.models import TextLabel as TextLabelModel
 from projects.models import Project
 
 
+def is_str(values: pd.Series) -> np.ndarray:
+    return np.fromiter((type(value) is str for value in values), dtype=bool, count=len(values))
+
+
 class Label(BaseModel, abc.ABC):
     id: int = -1
     uuid: UUID4
@@ -32,6 +39,42 @@ class Label(BaseModel, abc.ABC):
     def parse(cls, example_uuid: UUID4, obj: Any):
         raise NotImplementedError()
 
+    @classmethod
+    def parse_column(cls, example_uuids: pd.Series, objs: pd.Series) -> List["Label"]:
+        """Parse a column of labels, skipping the invalid ones.
+
+        Subclasses validate the common shapes of labels with array operations and build the labels
+        without running the validators. Any other value is parsed one by one by `parse`.
+
+        Args:
+            example_uuids: The UUID of the example of each label.
+            objs: The labels to parse.
+
+        Returns:
+            The valid labels, in the order of the column.
+        """
+        fast = cls.find_fast(objs)
+        labels: List[Optional[Label]] = [None] * len(objs)
+        if fast.any():
+            for i, label in zip(np.flatnonzero(fast), cls.parse_fast(example_uuids[fast], objs[fast])):
+                labels[i] = label
+        for i in np.flatnonzero(~fast):
+            try:
+                labels[i] = cls.parse(example_uuids.iat[i], objs.iat[i])
+            except ValueError:
+                pass
+        return [label for label in labels if label is not None]
+
+    @classmethod
+    def find_fast(cls, objs: pd.Series) -> np.ndarray:
+        """Return a boolean mask of the labels `parse_fast` can handle."""
+        return np.zeros(len(objs), dtype=bool)
+
+    @classmethod
+    def parse_fast(cls, example_uuids: pd.Series, objs: pd.Series) -> List[Optional["Label"]]:
+        """Parse the labels selected by `find_fast`, with None for the invalid ones."""
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def create_type(self, project: Project) -> Optional[LabelType]:
         raise NotImplementedError()
@@ -54,6 +97,19 @@ class CategoryLabel(Label):
     def parse(cls, example_uuid: UUID4, obj: Any):
         return cls(example_uuid=example_uuid, label=obj)  # type: ignore
 
+    @classmethod
+    def find_fast(cls, objs: pd.Series) -> np.ndarray:
+        return is_str(objs)
+
+    @classmethod
+    def parse_fast(cls, example_uuids: pd.Series, objs: pd.Series) -> List[Optional[Label]]:
+        valid = objs.str.len().gt(0).to_numpy()
+        uuids = generate_uuids(len(objs))
+        return [
+            cls.model_construct(uuid=label_uuid, example_uuid=example_uuid, label=obj) if is_valid else None
+            for label_uuid, example_uuid, obj, is_valid in zip(uuids, example_uuids, objs, valid)
+        ]
+
     def create_type(self, project: Project) -> Optional[LabelType]:
         return CategoryType(text=self.label, project=project)
 
@@ -86,6 +142,45 @@ class SpanLabel(Label):
             return cls(example_uuid=example_uuid, **obj)
         raise ValueError("SpanLabel.parse()")
 
+    @classmethod
+    def find_fast(cls, objs: pd.Series) -> np.ndarray:
+        return np.fromiter((cls.unpack(obj) is not None for obj in objs), dtype=bool, count=len(objs))
+
+    @classmethod
+    def parse_fast(cls, example_uuids: pd.Series, objs: pd.Series) -> List[Optional[Label]]:
+        ids, starts, ends, names = zip(*[cls.unpack(obj) for obj in objs])
+        starts, ends = np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+        valid = (starts >= 0) & (starts < ends) & pd.Series(names, dtype=object).str.len().gt(0).to_numpy()
+        uuids = generate_uuids(len(objs))
+        return [
+            cls.model_construct(
+                id=label_id,
+                uuid=label_uuid,
+                example_uuid=example_uuid,
+                start_offset=start,
+                end_offset=end,
+                label=name,
+            )
+            if is_valid
+            else None
+            for label_id, label_uuid, example_uuid, start, end, name, is_valid in zip(
+                ids, uuids, example_uuids, starts.tolist(), ends.tolist(), names, valid
+            )
+        ]
+
+    @staticmethod
+    def unpack(obj: Any) -> Optional[tuple]:
+        """Return the (id, start_offset, end_offset, label) of a span with int offsets and a str label, or None."""
+        if isinstance(obj, (list, tuple)) and len(obj) == 3:
+            label_id, (start, end, name) = -1, obj
+        elif isinstance(obj, dict) and obj.keys() - {"id"} == {"start_offset", "end_offset", "label"}:
+            label_id, start, end, name = obj.get("id", -1), obj["start_offset"], obj["end_offset"], obj["label"]
+        else:
+            return None
+        if any(type(value) is not int for value in (label_id, start, end)) or type(name) is not str:
+            return None
+        return label_id, start, end, name
+
     def create_type(self, project: Project) -> Optional[LabelType]:
         return SpanType(text=self.label, project=project)
 
@@ -110,6 +205,19 @@ class TextLabel(Label):
     def parse(cls, example_uuid: UUID4, obj: Any):
         return cls(example_uuid=example_uuid, text=obj)  # type: ignore
 
+    @classmethod
+    def find_fast(cls, objs: pd.Series) -> np.ndarray:
+        return is_str(objs)
+
+    @classmethod
+    def parse_fast(cls, example_uuids: pd.Series, objs: pd.Series) -> List[Optional[Label]]:
+        valid = objs.str.len().gt(0).to_numpy()
+        uuids = generate_uuids(len(objs))
+        return [
+            cls.model_construct(uuid=label_uuid, example_uuid=example_uuid, text=obj) if is_valid else None
+            for label_uuid, example_uuid, obj, is_valid in zip(uuids, example_uuids, objs, valid)
+        ]
+
     def create_type(self, project: Project) -> Optional[LabelType]:
         return None
 
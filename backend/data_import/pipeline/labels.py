@@ -1,10 +1,13 @@
 import abc
 from itertools import groupby
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple, cast
+from uuid import UUID
 
 from .examples import Examples
-from .label import Label
+from .label import Label, RelationLabel
 from .label_types import LabelTypes
+from .loaders import get_loader
+from examples.celery_tasks import refresh_agreements_later
 from labels.models import Category as CategoryModel
 from labels.models import Label as LabelModel
 from labels.models import Relation as RelationModel
@@ -15,10 +18,14 @@ from projects.models import Project
 
 class Labels(abc.ABC):
     label_model = LabelModel
+    # the fields telling whether a label of a user on an example is already there, when merging examples.
+    identity_fields: Tuple[str, ...] = ()
 
     def __init__(self, labels: List[Label], types: LabelTypes):
         self.labels = labels
         self.types = types
+        # the saved label of each label, by the UUID of the label.
+        self.saved: Dict[UUID, LabelModel] = {}
 
     def __len__(self) -> int:
         return len(self.labels)
@@ -38,23 +45,75 @@ class Labels(abc.ABC):
             for label in self.labels
             if label.example_uuid in examples
         ]
-        self.label_model.objects.bulk_create(labels)
+        if examples.merged_ids:
+            labels = self.merge(labels, user, examples.merged_ids)
+        saved = get_loader(self.label_model).insert(self.label_model, labels)
+        self.saved.update((label.uuid, label) for label in saved)
+
+    def merge(self, labels: List[LabelModel], user, example_ids: Set[int]) -> List[LabelModel]:
+        """Drop the labels that the merged examples already have, using the existing ones in their place.
+
+        Args:
+            labels: The labels to save.
+            user: The user of the labels.
+            example_ids: The ids of the examples the duplicated examples are merged into.
+
+        Returns:
+            The labels to save.
+        """
+        if not self.identity_fields:
+            return labels
+        existing = {
+            self.identity(label): label
+            for label in self.label_model.objects.filter(example_id__in=example_ids, user=user)
+        }
+        new = []
+        for label in labels:
+            if label.example_id not in example_ids:
+                new.append(label)
+                continue
+            original = existing.setdefault(self.identity(label), label)
+            if original is label:
+                new.append(label)
+            else:
+                self.saved[label.uuid] = original
+        return new
+
+    def identity(self, label: LabelModel) -> tuple:
+        return tuple(getattr(label, field) for field in self.identity_fields)
 
 
 class Categories(Labels):
     label_model = CategoryModel
+    identity_fields: Tuple[str, ...] = ("example_id", "label_id")
 
     def clean(self, project: Project):
         exclusive = getattr(project, "single_class_classification", False)
         if exclusive:
+            # a merged example keeps its category.
+            self.identity_fields = ("example_id",)
             groups = groupby(self.labels, lambda label: label.example_uuid)
             self.labels = [next(group) for _, group in groups]
 
+    def save(self, user, examples: Examples, **kwargs):
+        super().save(user, examples, **kwargs)
+        # bulk inserts bypass the signals recomputing the agreements of the labeled examples.
+        labeled = {examples[label.example_uuid] for label in self.labels if label.example_uuid in examples}
+        example_ids: Dict[int, List[int]] = {}
+        for example in labeled:
+            example_ids.setdefault(example.project_id, []).append(example.id)
+        for project_id, ids in example_ids.items():
+            refresh_agreements_later(project_id, ids)
+
 
 class Spans(Labels):
     label_model = SpanModel
+    identity_fields = ("example_id", "label_id", "start_offset", "end_offset")
+    # the project the spans are cleaned for.
+    project: Optional[Project] = None
 
     def clean(self, project: Project):
+        self.project = project
         allow_overlapping = getattr(project, "allow_overlapping", False)
         if allow_overlapping:
             return
@@ -69,21 +128,46 @@ class Spans(Labels):
                     spans.append(label)
         self.labels = spans
 
+    def merge(self, labels: List[SpanModel], user, example_ids: Set[int]) -> List[SpanModel]:
+        labels = super().merge(labels, user, example_ids)
+        if self.project is None or getattr(self.project, "allow_overlapping", False):
+            return labels
+        # the spans merged into an example must not overlap the ones it already has.
+        merged = [label for label in labels if label.example_id in example_ids]
+        annotatable = set(map(id, SpanModel.objects.filter_annotatable_labels(merged, self.project)))
+        return [label for label in labels if label.example_id not in example_ids or id(label) in annotatable]
+
     @property
     def id_to_span(self) -> Dict[Tuple[int, str], SpanModel]:
-        uuids = [str(span.uuid) for span in self.labels]
-        spans = SpanModel.objects.filter(uuid__in=uuids)
-        uuid_to_span = {span.uuid: span for span in spans}
-        return {(span.id, str(span.example_uuid)): uuid_to_span[span.uuid] for span in self.labels}
+        # the saved spans have their ids unless the database cannot return them from a bulk insert.
+        uuid_to_span = {uuid: span for uuid, span in self.saved.items() if span.pk is not None}
+        uuids = [str(span.uuid) for span in self.labels if span.uuid not in uuid_to_span]
+        if uuids:
+            uuid_to_span.update((span.uuid, span) for span in SpanModel.objects.filter(uuid__in=uuids))
+        return {
+            (span.id, str(span.example_uuid)): uuid_to_span[span.uuid]
+            for span in self.labels
+            if span.uuid in uuid_to_span
+        }
 
 
 class Texts(Labels):
     label_model = TextLabelModel
+    identity_fields = ("example_id", "text")
 
 
 class Relations(Labels):
     label_model = RelationModel
+    identity_fields = ("example_id", "from_id_id", "to_id_id", "type_id")
 
     def save(self, user, examples: Examples, **kwargs):
         id_to_span = kwargs["spans"].id_to_span
+        # the relations of the spans dropped for overlapping others are dropped with them.
+        relations = cast(List[RelationLabel], self.labels)
+        self.labels = [
+            label
+            for label in relations
+            if (label.from_id, str(label.example_uuid)) in id_to_span
+            and (label.to_id, str(label.example_uuid)) in id_to_span
+        ]
         super().save(user, examples, id_to_span=id_to_span)
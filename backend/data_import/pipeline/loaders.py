@@ -0,0 +1,99 @@
+import datetime
+import io
+import json
+from typing import Any, List, Type
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Field, JSONField, Model
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def to_copy_value(value: Any) -> str:
+    """Format a database value as a field of the text format of PostgreSQL COPY."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def prepare_copy_value(field: Field, obj: Model) -> Any:
+    """Prepare the value of a field of a new object for COPY.
+
+    The values are prepared for the query, not for the database driver: the driver would wrap
+    JSON in an adapter quoting it as an SQL literal, while COPY expects the plain text.
+    """
+    value = field.pre_save(obj, add=True)
+    if isinstance(field, JSONField):
+        return None if value is None else json.dumps(value, cls=field.encoder)
+    return field.get_prep_value(value)
+
+
+class BulkLoader:
+    """Inserts the rows of a batch and sets their primary keys."""
+
+    def insert(self, model: Type[Model], objs: List[Model]) -> List[Model]:
+        raise NotImplementedError()
+
+
+class OrmLoader(BulkLoader):
+    def insert(self, model: Type[Model], objs: List[Model]) -> List[Model]:
+        return model.objects.bulk_create(objs)
+
+
+class CopyLoader(BulkLoader):
+    """Streams the batch into a staging table with COPY, then moves it to the table in one INSERT.
+
+    The primary keys are read back by UUID from the RETURNING clause of the INSERT,
+    so the rows can be referenced right away without selecting them again.
+    """
+
+    def __init__(self, using: str):
+        self.using = using
+
+    def insert(self, model: Type[Model], objs: List[Model]) -> List[Model]:
+        if not objs:
+            return objs
+        connection = connections[self.using]
+        quote_name = connection.ops.quote_name
+        opts = model._meta
+        fields = [field for field in opts.concrete_fields if field is not opts.pk]
+        columns = ", ".join(quote_name(field.column) for field in fields)
+        table = quote_name(opts.db_table)
+        staging = quote_name(f"{opts.db_table}_import")
+
+        data = io.StringIO()
+        for obj in objs:
+            values = [prepare_copy_value(field, obj) for field in fields]
+            data.write("\t".join(map(to_copy_value, values)) + "\n")
+        data.seek(0)
+
+        with transaction.atomic(using=self.using), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TEMPORARY TABLE {staging} AS SELECT {columns} FROM {table} WITH NO DATA")
+            cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN", data)
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                f"RETURNING {quote_name(opts.pk.column)}, {quote_name('uuid')}"
+            )
+            uuid_to_pk = {str(uuid): pk for pk, uuid in cursor.fetchall()}
+            cursor.execute(f"DROP TABLE {staging}")
+
+        for obj in objs:
+            obj.pk = uuid_to_pk[str(obj.uuid)]
+            obj._state.adding = False
+            obj._state.db = self.using
+        return objs
+
+
+def get_loader(model: Type[Model]) -> BulkLoader:
+    """Return the fastest loader for the database of the model, the ORM being the fallback."""
+    using = router.db_for_write(model)
+    copy_supported = connections[using].vendor == "postgresql" and not model._meta.parents
+    has_uuid = any(field.name == "uuid" and field.unique for field in model._meta.concrete_fields)
+    if settings.IMPORT_COPY_LOADER and copy_supported and has_uuid:
+        return CopyLoader(using)
+    return OrmLoader()
@@ -1,12 +1,15 @@
-from typing import List, Optional, Type
+from typing import Dict, List, Optional, Type
 
+import numpy as np
 import pandas as pd
 
 from .data import BaseData
+from .dedup import hash_file
 from .exceptions import FileParseException
-from .label import Label
+from .label import Label, is_str
 from .readers import (
     DEFAULT_TEXT_COLUMN,
+    FILE_NAME_COLUMN,
     LINE_NUMBER_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
@@ -37,17 +40,42 @@ class ExampleMaker:
         df_with_data_column = df.loc[:, ~df.columns.isin(self.exclude_columns)]
         df_with_data_column = df_with_data_column.dropna(subset=[self.column_data])
 
+        # String texts, the common case, are validated at once and the data built without the validators.
+        texts = df_with_data_column[self.column_data]
+        fast = is_str(texts)
+        valid = np.zeros(len(texts), dtype=bool)
+        valid[fast] = self.data_class.check_texts(texts[fast])
+        reserved = [LINE_NUMBER_COLUMN, UUID_COLUMN, FILE_NAME_COLUMN, UPLOAD_NAME_COLUMN, DEFAULT_TEXT_COLUMN]
+        meta_columns = df_with_data_column.columns.difference([*reserved, self.column_data], sort=False)
+        metas = df_with_data_column[meta_columns].to_dict(orient="records") if len(meta_columns) else [{}] * len(texts)
+
+        uuids = df_with_data_column[UUID_COLUMN].tolist()
+        filenames = df_with_data_column[FILE_NAME_COLUMN].tolist()
+        upload_names = df_with_data_column[UPLOAD_NAME_COLUMN].tolist()
+        if LINE_NUMBER_COLUMN in df_with_data_column.columns:
+            line_nums = df_with_data_column[LINE_NUMBER_COLUMN].tolist()
+        else:
+            line_nums = [0] * len(texts)
+
         examples = []
-        for row in df_with_data_column.to_dict(orient="records"):
-            line_num = row.pop(LINE_NUMBER_COLUMN, 0)
-            row[DEFAULT_TEXT_COLUMN] = row.pop(self.column_data)  # Rename column for parsing
+        for i, text in enumerate(texts.tolist()):
             try:
-                data = self.data_class.parse(**row)
+                if not fast[i]:
+                    row = df_with_data_column.iloc[[i]].to_dict(orient="records")[0]
+                    row.pop(LINE_NUMBER_COLUMN, 0)
+                    row[DEFAULT_TEXT_COLUMN] = row.pop(self.column_data)  # Rename column for parsing
+                    data = self.data_class.parse(**row)
+                elif valid[i]:
+                    data = self.data_class.model_construct(
+                        uuid=uuids[i], filename=filenames[i], upload_name=upload_names[i], text=text, meta=metas[i]
+                    )
+                else:
+                    raise ValueError("The empty text is not allowed.")
                 example = data.create(self.project)
                 examples.append(example)
             except ValueError:
-                message = f"Invalid data in line {line_num}"
-                error = FileParseException(row[UPLOAD_NAME_COLUMN], line_num, message)
+                message = f"Invalid data in line {line_nums[i]}"
+                error = FileParseException(upload_names[i], line_nums[i], message)
                 self._errors.append(error)
         return examples
 
@@ -73,11 +101,18 @@ class ExampleMaker:
 
 
 class BinaryExampleMaker(ExampleMaker):
+    def __init__(self, project: Project, data_class: Type[BaseData], paths: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(project, data_class, **kwargs)
+        self.paths = paths or {}
+
     def make(self, df: pd.DataFrame) -> List[Example]:
         examples = []
         for row in df.to_dict(orient="records"):
             data = self.data_class.parse(**row)
             example = data.create(self.project)
+            # the content of a binary example is the file, found by its generated name.
+            if data.filename in self.paths:
+                example.content_hash = hash_file(self.paths[data.filename])
             examples.append(example)
         return examples
 
@@ -95,14 +130,7 @@ class LabelMaker:
         df_label = df.explode(self.column)
         df_label = df_label[[UUID_COLUMN, self.column]]
         df_label.dropna(subset=[self.column], inplace=True)
-        labels = []
-        for row in df_label.to_dict(orient="records"):
-            try:
-                label = self.label_class.parse(row[UUID_COLUMN], row[self.column])
-                labels.append(label)
-            except ValueError:
-                pass
-        return labels
+        return self.label_class.parse_column(df_label[UUID_COLUMN], df_label[self.column])
 
     def check_column_existence(self, df: pd.DataFrame) -> bool:
         message = f"Column {self.column} not found in the file"
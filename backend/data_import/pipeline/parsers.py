@@ -1,10 +1,10 @@
+import codecs
 import csv
-import io
+import functools
 import json
 import os
-from typing import Any, Dict, Iterator, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import chardet
 import pyexcel
 import pyexcel.exceptions
 from chardet import UniversalDetector
@@ -19,42 +19,97 @@ from .readers import (
 )
 
 DEFAULT_ENCODING = "Auto"
+ENCODING_SAMPLE_SIZE = 64 * 1024
+ENCODING_SAMPLE_COUNT = 16
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+JSON_STREAMING_THRESHOLD = 64 * 1024 * 1024
+JSON_CHUNK_SIZE = 1024 * 1024
+
+
+def read_samples(filename: str, sample_size: int, sample_count: int) -> List[bytes]:
+    """Read windows spread evenly over a file, from its head to its tail, or the whole file if it is small."""
+    sample_count = max(sample_count, 2)
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        if size <= sample_size * sample_count:
+            return [f.read()]
+        step = (size - sample_size) // (sample_count - 1)
+        samples = []
+        for i in range(sample_count):
+            f.seek(i * step)
+            samples.append(f.read(sample_size))
+        return samples
+
+
+def is_utf8(sample: bytes, is_head: bool, is_tail: bool) -> bool:
+    """Check that a window of a file is valid UTF-8, ignoring the characters cut at its ends."""
+    if sample.isascii():
+        return True
+    if not is_head:
+        # skip the continuation bytes of a character starting before the window.
+        start = 0
+        while start < min(3, len(sample)) and 0x80 <= sample[start] <= 0xBF:
+            start += 1
+        sample = sample[start:]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=is_tail)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+@functools.lru_cache(maxsize=128)
+def _detect_encoding(filename: str, size: int, mtime_ns: int, sample_size: int, sample_count: int) -> str:
+    samples = read_samples(filename, sample_size, sample_count)
+    for bom, encoding in BOMS:
+        if samples[0].startswith(bom):
+            return encoding
+    last = len(samples) - 1
+    if all(is_utf8(sample, is_head=i == 0, is_tail=i == last) for i, sample in enumerate(samples)):
+        return "utf-8"
+
+    # Otherwise, call the Universal Encoding Detector on the samples.
+    # It will stop as soon as it is confident enough to report its results.
+    # See: https://chardet.readthedocs.io/en/latest/usage.html
+    detector = UniversalDetector()
+    for sample in samples:
+        detector.feed(sample)
+        if detector.done:
+            break
+    detector.close()
+    return detector.result["encoding"] or "utf-8"
 
 
-def detect_encoding(filename: str, buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> str:
+def detect_encoding(
+    filename: str, sample_size: int = ENCODING_SAMPLE_SIZE, sample_count: int = ENCODING_SAMPLE_COUNT
+) -> str:
     """Detects character encoding automatically.
 
+    The byte order marks are checked first, then whether the file is UTF-8. Large files are only
+    sampled, with windows spread over the whole file. If the samples are not UTF-8, chardet guesses
+    the encoding from them. The result is cached for the file until it changes, so that the parsers
+    and the retries of an import detect it once. As the rest of a large file is not checked, it may
+    still fail to decode; the reader then reports a parse error after the last row it read.
+
     If you want to know the supported encodings, please see the following document:
     https://chardet.readthedocs.io/en/latest/supported-encodings.html
 
     Args:
         filename: the filename for detecting the encoding.
-        buffer_size: the buffer size to read file contents incrementally.
+        sample_size: the size of each window read from the file.
+        sample_count: the number of windows read from a large file, at least 2.
 
     Returns:
         The character encoding.
     """
-    # For a small file.
-    if os.path.getsize(filename) < buffer_size:
-        detected = chardet.detect(open(filename, "rb").read())
-        return detected.get("encoding", "utf-8")
-
-    # For a large file, call the Universal Encoding Detector incrementally.
-    # It will stop as soon as it is confident enough to report its results.
-    # See: https://chardet.readthedocs.io/en/latest/usage.html
-    with open(filename, "rb") as f:
-        detector = UniversalDetector()
-        while True:
-            binary = f.read(buffer_size)
-            detector.feed(binary)
-            if binary == b"":
-                break
-            if detector.done:
-                break
-        if detector.done:
-            return detector.result["encoding"] or "utf-8"
-        else:
-            return "utf-8"
+    stat = os.stat(filename)
+    return _detect_encoding(filename, stat.st_size, stat.st_mtime_ns, sample_size, sample_count)
 
 
 def decide_encoding(filename: str, encoding: str) -> str:
@@ -163,23 +218,43 @@ class CSVParser(Parser):
 class JSONParser(Parser):
     """JSONParser is a parser to read a json file and return its rows.
 
+    The elements of the array are decoded one at a time, so that the rows have the line number
+    where they start and the rows before a syntax error are kept. A file up to the streaming
+    threshold is read at once, a larger one chunk by chunk, so that the memory use depends on
+    the size of the elements instead of the file.
+
     Attributes:
         encoding: The character encoding.
+        streaming_threshold: The file size in bytes above which the file is read chunk by chunk.
+        chunk_size: The number of characters read at once from a larger file.
     """
 
-    def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
+    def __init__(
+        self,
+        encoding: str = DEFAULT_ENCODING,
+        streaming_threshold: int = JSON_STREAMING_THRESHOLD,
+        chunk_size: int = JSON_CHUNK_SIZE,
+        **kwargs,
+    ):
         self.encoding = encoding
+        self.streaming_threshold = streaming_threshold
+        self.chunk_size = chunk_size
         self._errors: List[FileParseException] = []
 
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
+        size = os.path.getsize(filename)
+        # the number of characters is at most the number of bytes, so a small file is read in one chunk.
+        chunk_size = self.chunk_size if size > self.streaming_threshold else size + 1
         encoding = decide_encoding(filename, self.encoding)
         with open(filename, encoding=encoding) as f:
             try:
-                rows = json.load(f)
-                for row in rows:
-                    yield row
+                for line_num, row in JSONArrayDecoder(f, chunk_size):
+                    if isinstance(row, dict):
+                        yield {LINE_NUMBER_COLUMN: line_num, **row}
+                    else:
+                        yield row
             except json.decoder.JSONDecodeError as e:
-                error = FileParseException(filename, line_num=1, message=str(e))
+                error = FileParseException(filename, line_num=e.lineno, message=str(e))
                 self._errors.append(error)
 
     @property
@@ -187,6 +262,107 @@ class JSONParser(Parser):
         return self._errors
 
 
+class JSONArrayDecoder:
+    """JSONArrayDecoder decodes the elements of a JSON array from a file, one at a time.
+
+    Only the current chunk and the element being decoded are kept in memory. Syntax errors are raised
+    as `json.JSONDecodeError`, with the line, column and character offset in the whole file.
+
+    Attributes:
+        f: The file, opened in text mode.
+        chunk_size: The number of characters read at once.
+    """
+
+    whitespace = " \t\n\r"
+
+    def __init__(self, f, chunk_size: int = JSON_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # the position of the buffer in the file, and the line at `counted` in the buffer.
+        self.offset = 0
+        self.counted = 0
+        self.line_num = 1
+        self.line_start = 0
+
+    def __iter__(self) -> Iterator[Tuple[int, Any]]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+        else:
+            while True:
+                self.peek()
+                yield self.count_lines(self.pos), self.decode()
+                if self.expect(",]") == "]":
+                    break
+        if self.peek() != "":
+            self.fail("Extra data")
+
+    def read(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos >= self.chunk_size:
+            # drop the decoded part of the buffer.
+            self.count_lines(self.pos)
+            self.offset += self.pos
+            self.buffer = self.buffer[self.pos :]
+            self.counted -= self.pos
+            self.pos = 0
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer += chunk
+        return not self.eof
+
+    def peek(self) -> str:
+        """Skip the whitespaces and return the next character, or an empty string at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.whitespace:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.read():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            self.fail("Expecting " + " or ".join(f"'{c}'" for c in chars))
+        self.pos += 1
+        return char
+
+    def decode(self) -> Any:
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number at the end of the buffer may go on in the next chunk.
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    self.fail(e.msg, e.pos)
+            self.read()
+
+    def count_lines(self, pos: int) -> int:
+        """Return the line number at a position of the buffer, counting the lines from the last position."""
+        newlines = self.buffer.count("\n", self.counted, pos)
+        if newlines:
+            self.line_num += newlines
+            self.line_start = self.offset + self.buffer.rindex("\n", self.counted, pos) + 1
+        self.counted = pos
+        return self.line_num
+
+    def fail(self, message: str, pos: Optional[int] = None):
+        pos = self.pos if pos is None else pos
+        line_num = self.count_lines(pos)
+        offset = self.offset + pos
+        error = json.JSONDecodeError(message, "", 0)
+        error.pos, error.lineno, error.colno = offset, line_num, offset - self.line_start + 1
+        error.args = (f"{message}: line {line_num} column {error.colno} (char {offset})",)
+        raise error
+
+
 class JSONLParser(Parser):
     """JSONLParser is a parser to read a JSONL file and return its rows.
 
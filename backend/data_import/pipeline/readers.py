@@ -1,8 +1,9 @@
 import abc
 import collections.abc
 import dataclasses
+import os
 import uuid
-from typing import Any, Dict, Iterator, List
+from typing import Any, Dict, Iterator, List, Tuple
 
 import pandas as pd
 
@@ -16,6 +17,12 @@ UUID_COLUMN = "example_uuid"
 LINE_NUMBER_COLUMN = "#line_number"
 
 
+def generate_uuids(n: int) -> List[uuid.UUID]:
+    """Generate random UUIDs from a single read of the random source, instead of one per UUID."""
+    random = os.urandom(16 * n)
+    return [uuid.UUID(bytes=random[i : i + 16], version=4) for i in range(0, 16 * n, 16)]
+
+
 class BaseReader(collections.abc.Iterable):
     """Reader has a role to parse files and return a Record iterator."""
 
@@ -34,7 +41,7 @@ class BaseReader(collections.abc.Iterable):
         raise NotImplementedError("Please implement this method in the subclass.")
 
     @abc.abstractmethod
-    def batch(self, batch_size: int) -> Iterator[pd.DataFrame]:
+    def batch(self, batch_size: int, skip: int = 0) -> Iterator[pd.DataFrame]:
         raise NotImplementedError("Please implement this method in the subclass.")
 
 
@@ -63,10 +70,22 @@ class Reader(BaseReader):
     def __init__(self, filenames: List[FileName], parser: Parser):
         self.filenames = filenames
         self.parser = parser
+        self._errors: List[FileParseException] = []
+
+    def parse(self, filename: FileName) -> Iterator[Dict[Any, Any]]:
+        """Parse a file, stopping at the line which cannot be decoded, e.g. when its encoding was misdetected."""
+        line_num = 0
+        try:
+            for row in self.parser.parse(filename.full_path):
+                line_num = row.get(LINE_NUMBER_COLUMN, line_num)
+                yield row
+        except UnicodeDecodeError as e:
+            message = f"The file cannot be decoded as {e.encoding}: {e.reason}."
+            self._errors.append(FileParseException(filename.full_path, line_num + 1, message))
 
     def __iter__(self) -> Iterator[Dict[Any, Any]]:
         for filename in self.filenames:
-            rows = self.parser.parse(filename.full_path)
+            rows = self.parse(filename)
             for row in rows:
                 yield {
                     UUID_COLUMN: uuid.uuid4(),
@@ -75,16 +94,52 @@ class Reader(BaseReader):
                     **row,
                 }
 
-    def batch(self, batch_size: int) -> Iterator[pd.DataFrame]:
-        batch = []
-        for record in self:
-            batch.append(record)
-            if len(batch) == batch_size:
-                yield pd.DataFrame(batch)
-                batch = []
-        if batch:
-            yield pd.DataFrame(batch)
+    def batch(self, batch_size: int, skip: int = 0) -> Iterator[pd.DataFrame]:
+        rows: List[Dict[Any, Any]] = []
+        files: List[Tuple[FileName, int]] = []
+        for filename in self.filenames:
+            start = len(rows)
+            for row in self.parse(filename):
+                if skip:
+                    # the rows are parsed again, so that the line numbers and parse errors do not change.
+                    skip -= 1
+                    continue
+                rows.append(row)
+                if len(rows) == batch_size:
+                    files.append((filename, len(rows) - start))
+                    yield self.to_dataframe(rows, files)
+                    rows, files, start = [], [], 0
+            if len(rows) > start:
+                files.append((filename, len(rows) - start))
+        if rows:
+            yield self.to_dataframe(rows, files)
+
+    @staticmethod
+    def to_dataframe(rows: List[Dict[Any, Any]], files: List[Tuple[FileName, int]]) -> pd.DataFrame:
+        """Build the batch from the parsed rows, adding the file and UUID columns at once.
+
+        Args:
+            rows: The parsed rows.
+            files: The file of each run of consecutive rows, with the length of the run.
+
+        Returns:
+            The same DataFrame as built from the records of `__iter__`.
+        """
+        df = pd.DataFrame(rows)
+        columns = {
+            UUID_COLUMN: generate_uuids(len(rows)),
+            FILE_NAME_COLUMN: [filename.generated_name for filename, count in files for _ in range(count)],
+            UPLOAD_NAME_COLUMN: [filename.upload_name for filename, count in files for _ in range(count)],
+        }
+        for i, (column, values) in enumerate(columns.items()):
+            values = pd.Series(values, index=df.index, dtype=object)
+            if column in df.columns:
+                # the parsed value wins, as in the records of `__iter__`.
+                df[column] = df[column].where(df[column].notna(), values)
+            else:
+                df.insert(i, column, values)
+        return df
 
     @property
     def errors(self) -> List[FileParseException]:
-        return self.parser.errors
+        return self.parser.errors + self._errors
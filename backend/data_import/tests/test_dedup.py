@@ -0,0 +1,60 @@
+import importlib
+import tempfile
+import uuid
+
+from django.test import TestCase
+
+from data_import.pipeline.dedup import hash_file, hash_text, split_duplicates
+from examples.models import Example
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestHash(TestCase):
+    def test_ignores_whitespaces(self):
+        self.assertEqual(hash_text("  a\tb\n c "), hash_text("a b c"))
+
+    def test_normalizes_unicode(self):
+        self.assertEqual(hash_text("cafe\u0301"), hash_text("caf\u00e9"))
+
+    def test_distinguishes_texts(self):
+        self.assertNotEqual(hash_text("a b"), hash_text("ab"))
+
+    def test_hash_file(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b"content")
+            f.flush()
+            self.assertEqual(len(hash_file(f.name, chunk_size=2)), 64)
+
+    def test_backfill_hashes_as_imports_do(self):
+        migration = importlib.import_module("examples.migrations.0015_backfill_content_hash")
+        text = " cafe\u0301\tau lait "
+        self.assertEqual(migration.hash_text(text), hash_text(text))
+
+
+class TestSplitDuplicates(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION).item
+        self.original = Example.objects.create(project=self.project, text="a", content_hash=hash_text("a"))
+
+    def make_example(self, text):
+        return Example(uuid=uuid.uuid4(), project=self.project, text=text, content_hash=hash_text(text))
+
+    def test_finds_duplicates_in_project(self):
+        example = self.make_example(" a ")
+        new, duplicate_of = split_duplicates([example])
+        self.assertEqual(new, [])
+        self.assertEqual(duplicate_of[example.uuid].pk, self.original.pk)
+
+    def test_finds_duplicates_in_batch(self):
+        first, second = self.make_example("b"), self.make_example("b")
+        new, duplicate_of = split_duplicates([first, second])
+        self.assertEqual(new, [first])
+        self.assertIs(duplicate_of[second.uuid], first)
+
+    def test_ignores_other_projects(self):
+        project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION).item
+        example = Example(uuid=uuid.uuid4(), project=project, text="a", content_hash=hash_text("a"))
+        new, duplicate_of = split_duplicates([example])
+        self.assertEqual(new, [example])
+        self.assertEqual(duplicate_of, {})
@@ -1,6 +1,7 @@
 import uuid
 from unittest.mock import MagicMock
 
+import pandas as pd
 from django.test import TestCase
 from model_mommy import mommy
 
@@ -59,6 +60,14 @@ class TestCategoryLabel(TestLabel):
         category_model = category.create(self.user, self.example, types)
         self.assertIsInstance(category_model, CategoryModel)
 
+    def test_parse_column(self):
+        example_uuids = pd.Series([uuid.uuid4() for _ in range(4)])
+        objs = pd.Series(["A", "", None, "B"], dtype=object)
+        categories = CategoryLabel.parse_column(example_uuids, objs)
+        self.assertEqual([category.label for category in categories], ["A", "B"])
+        self.assertEqual([category.example_uuid for category in categories], example_uuids[[0, 3]].tolist())
+        self.assertEqual(len({category.uuid for category in categories}), 2)
+
 
 class TestSpanLabel(TestLabel):
     task = ProjectType.SEQUENCE_LABELING
@@ -108,6 +117,29 @@ class TestSpanLabel(TestLabel):
         span_model = span.create(self.user, self.example, types)
         self.assertIsInstance(span_model, SpanModel)
 
+    def test_parse_column(self):
+        objs = [
+            (0, 1, "A"),
+            (1, 0, "A"),
+            (-1, 1, "A"),
+            {"id": 5, "label": "B", "start_offset": 1, "end_offset": 2},
+            {"label": "A", "start_offset": 0},
+            ("0", 1, "C"),
+        ]
+        example_uuids = pd.Series([uuid.uuid4() for _ in objs])
+        spans = SpanLabel.parse_column(example_uuids, pd.Series(objs, dtype=object))
+        expected = []
+        for example_uuid, obj in zip(example_uuids, objs):
+            try:
+                expected.append(SpanLabel.parse(example_uuid, obj))
+            except ValueError:
+                pass
+        fields = ["id", "example_uuid", "label", "start_offset", "end_offset"]
+        self.assertEqual(
+            [[getattr(span, field) for field in fields] for span in spans],
+            [[getattr(span, field) for field in fields] for span in expected],
+        )
+
 
 class TestTextLabel(TestLabel):
     task = ProjectType.SEQ2SEQ
@@ -1,5 +1,5 @@
 import uuid
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from django.test import TestCase
 from model_mommy import mommy
@@ -30,9 +30,9 @@ class TestCategories(TestCase):
             CategoryLabel(example_uuid=example_uuid, label="A"),
             CategoryLabel(example_uuid=example_uuid, label="B"),
         ]
-        example = mommy.make("Example", project=self.project.item, uuid=example_uuid)
+        self.example = mommy.make("Example", project=self.project.item, uuid=example_uuid)
         self.examples = MagicMock()
-        self.examples.__getitem__.return_value = example
+        self.examples.__getitem__.return_value = self.example
         self.examples.__contains__.return_value = True
         self.categories = Categories(labels, self.types)
 
@@ -51,6 +51,13 @@ class TestCategories(TestCase):
         self.categories.save(self.user, self.examples)
         self.assertEqual(Category.objects.count(), 2)
 
+    @patch("examples.celery_tasks.refresh_agreements.delay")
+    def test_save_refreshes_agreements_once_committed(self, refresh_agreements):
+        self.categories.save_types(self.project.item)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.categories.save(self.user, self.examples)
+        refresh_agreements.assert_called_once_with(self.project.item.id, [self.example.id])
+
     def test_save_types(self):
         self.categories.save_types(self.project.item)
         self.assertEqual(CategoryType.objects.count(), 2)
@@ -67,9 +74,9 @@ class TestSpans(TestCase):
             SpanLabel(example_uuid=example_uuid, label="B", start_offset=0, end_offset=3),
             SpanLabel(example_uuid=example_uuid, label="B", start_offset=3, end_offset=4),
         ]
-        example = mommy.make("Example", project=self.project.item, uuid=example_uuid)
+        self.example = mommy.make("Example", project=self.project.item, uuid=example_uuid)
         self.examples = MagicMock()
-        self.examples.__getitem__.return_value = example
+        self.examples.__getitem__.return_value = self.example
         self.examples.__contains__.return_value = True
         self.spans = Spans(labels, self.types)
 
@@ -109,6 +116,17 @@ class TestSpans(TestCase):
         self.spans.save_types(self.project.item)
         self.assertEqual(SpanType.objects.count(), 2)
 
+    def test_merge_skips_spans_overlapping_existing_ones(self):
+        self.disable_overlapping()
+        span_type = mommy.make("SpanType", project=self.project.item, text="A")
+        mommy.make("Span", example=self.example, user=self.user, label=span_type, start_offset=2, end_offset=4)
+        self.examples.merged_ids = {self.example.id}
+        self.spans.clean(self.project.item)
+        self.spans.save_types(self.project.item)
+        self.spans.save(self.user, self.examples)
+        offsets = Span.objects.order_by("start_offset").values_list("start_offset", "end_offset")
+        self.assertQuerysetEqual(offsets, [(0, 1), (2, 4)])
+
 
 class TestTexts(TestCase):
     def setUp(self):
@@ -168,6 +186,12 @@ class TestRelations(TestCase):
         self.relations.save(self.user, self.examples, spans=self.spans)
         self.assertEqual(Relation.objects.count(), 1)
 
+    def test_save_skips_relations_of_dropped_spans(self):
+        self.spans.id_to_span.popitem()
+        self.relations.save_types(self.project.item)
+        self.relations.save(self.user, self.examples, spans=self.spans)
+        self.assertFalse(Relation.objects.exists())
+
     def test_save_types(self):
         self.relations.save_types(self.project.item)
         self.assertEqual(RelationType.objects.count(), 1)
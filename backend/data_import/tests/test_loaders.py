@@ -0,0 +1,76 @@
+import datetime
+import json
+import unittest
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+
+from data_import.pipeline.loaders import (
+    CopyLoader,
+    OrmLoader,
+    get_loader,
+    prepare_copy_value,
+    to_copy_value,
+)
+from examples.models import Example
+from projects.tests.utils import prepare_project
+
+
+class TestCopyValue(TestCase):
+    def test_null(self):
+        self.assertEqual(to_copy_value(None), "\\N")
+
+    def test_bool(self):
+        self.assertEqual(to_copy_value(True), "t")
+        self.assertEqual(to_copy_value(False), "f")
+
+    def test_datetime(self):
+        value = datetime.datetime(2023, 1, 2, 3, 4, 5, 6, tzinfo=datetime.timezone.utc)
+        self.assertEqual(to_copy_value(value), "2023-01-02T03:04:05.000006+00:00")
+
+    def test_escapes_special_characters(self):
+        self.assertEqual(to_copy_value("a\tb\nc\rd\\e"), "a\\tb\\nc\\rd\\\\e")
+
+    def test_other_values(self):
+        uid = uuid.uuid4()
+        self.assertEqual(to_copy_value(uid), str(uid))
+        self.assertEqual(to_copy_value(1), "1")
+
+
+class TestPrepareCopyValue(TestCase):
+    def test_json_is_written_as_text(self):
+        example = Example(meta={"a": "\u00e9", "b": "it's"})
+        value = prepare_copy_value(Example._meta.get_field("meta"), example)
+        self.assertEqual(json.loads(value), {"a": "\u00e9", "b": "it's"})
+
+    def test_foreign_key_is_written_as_id(self):
+        project = prepare_project()
+        example = Example(project=project.item)
+        self.assertEqual(prepare_copy_value(Example._meta.get_field("project"), example), project.item.id)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "COPY is only supported on PostgreSQL")
+class TestCopyLoader(TestCase):
+    def test_round_trip(self):
+        project = prepare_project()
+        meta = {"a": "\u00e9", "b": "it's", "c": "tab\tand\nnewline"}
+        examples = [Example(uuid=uuid.uuid4(), project=project.item, text=f"it's\t{i}\\", meta=meta) for i in range(3)]
+        saved = CopyLoader(connection.alias).insert(Example, examples)
+        stored = Example.objects.in_bulk([example.pk for example in saved])
+        for example in saved:
+            self.assertEqual(stored[example.pk].uuid, example.uuid)
+            self.assertEqual(stored[example.pk].text, example.text)
+            self.assertEqual(stored[example.pk].meta, meta)
+
+
+class TestGetLoader(TestCase):
+    def test_orm_fallback(self):
+        self.assertIsInstance(get_loader(Example), OrmLoader)
+
+    def test_orm_loader_sets_primary_keys(self):
+        project = prepare_project()
+        examples = [Example(uuid=uuid.uuid4(), project=project.item, text=str(i)) for i in range(3)]
+        saved = OrmLoader().insert(Example, examples)
+        self.assertEqual([example.uuid for example in saved], [example.uuid for example in examples])
+        self.assertTrue(all(example.pk for example in saved))
@@ -49,6 +49,19 @@ class TestExamplesMaker(TestCase):
         self.assertEqual(len(examples), 0)
         self.assertEqual(len(self.maker.errors), 1)
 
+    def test_make_examples_with_non_string_texts(self):
+        records = [
+            {**self.record, LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), "meta1": "a"},
+            {**self.record, LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), self.text_column: ""},
+            {**self.record, LINE_NUMBER_COLUMN: 3, UUID_COLUMN: uuid.uuid4(), self.text_column: 10},
+            {**self.record, LINE_NUMBER_COLUMN: 4, UUID_COLUMN: uuid.uuid4(), self.text_column: "text4"},
+        ]
+        examples = self.maker.make(pd.DataFrame(records))
+        self.assertEqual([example.text for example in examples], ["text1", "text4"])
+        self.assertEqual(examples[0].uuid, records[0][UUID_COLUMN])
+        self.assertEqual(examples[0].meta, {"meta1": "a"})
+        self.assertEqual([error.line_num for error in self.maker.errors], [2, 3])
+
 
 class TestLabelFormatter(TestCase):
     def setUp(self):
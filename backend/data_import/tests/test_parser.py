@@ -3,6 +3,9 @@ import os
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
+
+import chardet
 
 from data_import.pipeline import parsers
 from data_import.pipeline.readers import LINE_NUMBER_COLUMN
@@ -31,6 +34,43 @@ class TestParser(unittest.TestCase):
             next(it)
 
 
+class TestDetectEncoding(TestParser):
+    def detect(self, content: bytes, **kwargs):
+        with open(self.test_file, "wb") as f:
+            f.write(content)
+        return parsers.detect_encoding(self.test_file, **kwargs)
+
+    def test_utf8(self):
+        self.assertEqual(self.detect("Hello, World!\nこんにちは".encode()), "utf-8")
+
+    def test_utf8_with_windows_cutting_characters(self):
+        content = "こんにちは、世界。".encode() * 100
+        self.assertEqual(self.detect(content, sample_size=10, sample_count=7), "utf-8")
+
+    def test_samples_head_and_tail_at_least(self):
+        content = "Hello, World!\n".encode() * 100
+        self.assertEqual(self.detect(content, sample_size=10, sample_count=1), "utf-8")
+
+    def test_byte_order_marks(self):
+        content = "text,label\nこんにちは,A"
+        for encoding, expected in [("utf-8-sig", "utf-8-sig"), ("utf-16", "utf-16"), ("utf-32", "utf-32")]:
+            with self.subTest(encoding=encoding):
+                self.assertEqual(self.detect(content.encode(encoding)), expected)
+
+    def test_non_utf8(self):
+        content = "Olá, café e pão de açúcar.\n".encode("latin-1") * 20
+        self.assertEqual(self.detect(content), chardet.detect(content)["encoding"])
+
+    def test_caches_result_until_the_file_changes(self):
+        with patch("data_import.pipeline.parsers.read_samples", wraps=parsers.read_samples) as read_samples:
+            self.detect("Hello, World!".encode())
+            parsers.detect_encoding(self.test_file)
+            self.assertEqual(read_samples.call_count, 1)
+            os.utime(self.test_file, ns=(0, 0))
+            parsers.detect_encoding(self.test_file)
+            self.assertEqual(read_samples.call_count, 2)
+
+
 class TestPlainParser(TestParser):
     def test_read(self):
         content = "example"
@@ -82,6 +122,34 @@ class TestJSONParser(TestParser):
         expected = json.loads(content)
         self.assert_record(content, parser, expected)
 
+    def test_read_incrementally(self):
+        content = json.dumps([{"text": "line1", "labels": "Label1"}, {"text": "line2\n", "labels": [1.5]}], indent=2)
+        parser = parsers.JSONParser(streaming_threshold=0, chunk_size=3)
+        expected = json.loads(content)
+        self.assert_record(content, parser, expected)
+
+    def test_read_incrementally_keeps_line_numbers(self):
+        self.create_file('[\n  {"text": "line1"},\n  {"text": "line2"}\n]')
+        parser = parsers.JSONParser(streaming_threshold=0, chunk_size=4)
+        rows = list(parser.parse(self.test_file))
+        self.assertEqual([row[LINE_NUMBER_COLUMN] for row in rows], [2, 3])
+
+    def test_read_incrementally_reports_error_position(self):
+        self.create_file('[\n  {"text": "line1"},\n  {"text": }\n]')
+        parser = parsers.JSONParser(streaming_threshold=0, chunk_size=4)
+        rows = list(parser.parse(self.test_file))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(len(parser.errors), 1)
+        self.assertEqual(parser.errors[0].line_num, 3)
+        self.assertIn("line 3 column 12", parser.errors[0].message)
+
+    def test_small_file_keeps_rows_before_error(self):
+        self.create_file('[\n  {"text": "line1"},\n  {"text": }\n]')
+        parser = parsers.JSONParser()
+        rows = list(parser.parse(self.test_file))
+        self.assertEqual(rows, [{LINE_NUMBER_COLUMN: 2, "text": "line1"}])
+        self.assertEqual(parser.errors[0].line_num, 3)
+
 
 class TestJSONLParser(TestParser):
     def test_read(self):
@@ -1,13 +1,22 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 from pandas.testing import assert_frame_equal
 
+from data_import.pipeline.parsers import (
+    ENCODING_SAMPLE_COUNT,
+    ENCODING_SAMPLE_SIZE,
+    LineParser,
+)
 from data_import.pipeline.readers import (
     FILE_NAME_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
+    FileName,
     Reader,
 )
 
@@ -42,10 +51,40 @@ class TestReader(unittest.TestCase):
         reader = Reader(self.filenames, self.parser)
         self.assertEqual(list(reader), self.rows)
 
-    @patch("data_import.pipeline.readers.uuid.uuid4")
+    @patch("data_import.pipeline.readers.generate_uuids")
     def test_batch(self, mock):
-        mock.return_value = "uuid"
+        mock.side_effect = lambda n: ["uuid"] * n
         reader = Reader(self.filenames, self.parser)
         batch = next(reader.batch(2))
         expected_df = pd.DataFrame(self.rows)
         assert_frame_equal(batch, expected_df)
+
+    @patch("data_import.pipeline.readers.generate_uuids")
+    def test_batch_skips_rows(self, mock):
+        mock.side_effect = lambda n: ["uuid"] * n
+        reader = Reader(self.filenames, self.parser)
+        batches = list(reader.batch(2, skip=1))
+        self.assertEqual(len(batches), 1)
+        assert_frame_equal(batches[0], pd.DataFrame(self.rows[1:]))
+
+
+class TestReaderDecodeError(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+
+    def test_reports_bytes_missed_by_encoding_detection(self):
+        # the windows are spread every other window size, so the line in the middle of the first gap is not sampled.
+        line = b"txt\n"
+        lines = [line] * (ENCODING_SAMPLE_SIZE * (2 * ENCODING_SAMPLE_COUNT - 1) // len(line))
+        bad = ENCODING_SAMPLE_SIZE * 3 // 2 // len(line)
+        lines[bad] = "\u00e9t\u00e9\n".encode("latin-1")
+        path = os.path.join(self.test_dir, "file.txt")
+        with open(path, "wb") as f:
+            f.write(b"".join(lines))
+        reader = Reader([FileName(path, "file.txt", "file.txt")], LineParser())
+        rows = [row for batch in reader.batch(1000) for row in batch.to_dict("records")]
+        self.assertLessEqual(len(rows), bad)
+        self.assertEqual(len(reader.errors), 1)
+        self.assertEqual(reader.errors[0].line_num, len(rows) + 1)
+        self.assertIn("utf-8", reader.errors[0].message)
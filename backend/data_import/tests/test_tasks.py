@@ -1,16 +1,21 @@
+import contextlib
 import os
 import pathlib
 import shutil
+from unittest.mock import patch
 
+from celery.result import AsyncResult
 from django.core.files import File
 from django.test import TestCase, override_settings
 from django_drf_filepond.models import StoredUpload, TemporaryUpload
 from django_drf_filepond.utils import _get_file_id
 
 from data_import.celery_tasks import import_dataset
+from data_import.models import ImportCheckpoint
 from data_import.pipeline.catalog import RELATION_EXTRACTION
+from data_import.pipeline.examples import Examples
 from examples.models import Example
-from label_types.models import SpanType
+from label_types.models import CategoryType, SpanType
 from labels.models import Category, Span
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
@@ -329,3 +334,144 @@ class TestFileTypeChecking(TestImportData):
         response = self.import_dataset(filename, file_format, self.task)
         self.assertEqual(len(response["error"]), 1)
         self.assertIn("unexpected", response["error"][0]["message"])
+
+
+class TestImportMultipleFiles(TestImportData):
+    task = ProjectType.DOCUMENT_CLASSIFICATION
+
+    def setUp(self):
+        super().setUp()
+        self.upload_ids = [self.upload_id, _get_file_id()]
+
+    def tearDown(self):
+        for upload_id in self.upload_ids:
+            self.upload_id = upload_id
+            super().tearDown()
+
+    def create_uploads(self, filenames):
+        for upload_id, filename in zip(self.upload_ids, filenames):
+            TemporaryUpload.objects.create(
+                upload_id=upload_id,
+                file_id="1",
+                file=File(open(str(self.data_path / filename), mode="rb"), filename.split("/")[-1]),
+                upload_name=filename,
+                upload_type="F",
+            )
+
+    def import_files(self, **kwargs):
+        kwargs = {"column_label": "labels", **kwargs}
+        args = (self.user.id, self.project.item.id, "JSONL", self.upload_ids, self.task)
+        # run as in a worker, with the chord applied eagerly.
+        import_dataset.push_request(called_directly=False, is_eager=False)
+        try:
+            with patch.object(import_dataset, "replace", side_effect=lambda sig: sig.apply().get()) as replace:
+                response = import_dataset.run(*args, **kwargs)
+        finally:
+            import_dataset.pop_request()
+        self.assertEqual(replace.call_count, 1)
+        return response
+
+    def test_imports_files_in_subtasks(self):
+        self.create_uploads(["text_classification/example.jsonl", "text_classification/example.jsonl"])
+        response = self.import_files()
+        self.assertEqual(response["error"], [])
+        self.assertEqual(Example.objects.count(), 6)
+        self.assertEqual(CategoryType.objects.filter(project=self.project.item).count(), 2)
+
+    def test_merges_errors_of_subtasks(self):
+        self.create_uploads(["text_classification/example.jsonl", "text_classification/example.json"])
+        response = self.import_files()
+        self.assertEqual(Example.objects.count(), 3)
+        self.assertGreaterEqual(len(response["error"]), 1)
+        for error in response["error"]:
+            self.assertTrue(error["filename"].endswith("example.json"))
+
+    def test_skips_duplicates(self):
+        self.create_uploads(["text_classification/example.jsonl", "text_classification/example.jsonl"])
+        response = self.import_files(duplicates="skip")
+        self.assertEqual(response["error"], [])
+        self.assertEqual(Example.objects.count(), 3)
+        self.assertEqual(Category.objects.count(), 3)
+
+    def test_merges_labels_of_duplicates(self):
+        self.create_uploads(["text_classification/example.jsonl", "text_classification/example.jsonl"])
+        response = self.import_files(duplicates="merge")
+        self.assertEqual(response["error"], [])
+        self.assertEqual(Example.objects.count(), 3)
+        labels = Category.objects.filter(example__text="exampleB").values_list("label__text", flat=True)
+        self.assertEqual(sorted(labels), ["negative", "positive"])
+        self.assertEqual(Category.objects.count(), 3)
+
+
+@override_settings(IMPORT_BATCH_SIZE=1)
+class TestResumeImport(TestImportData):
+    task = ProjectType.DOCUMENT_CLASSIFICATION
+    import_id = "import-task-id"
+
+    def run_import(self, filename, **kwargs):
+        TemporaryUpload.objects.get_or_create(
+            upload_id=self.upload_id,
+            defaults={
+                "file_id": "1",
+                "file": File(open(str(self.data_path / filename), mode="rb"), filename.split("/")[-1]),
+                "upload_name": filename,
+                "upload_type": "F",
+            },
+        )
+        args = (self.user.id, self.project.item.id, "JSONL", [self.upload_id], self.task)
+        import_dataset.push_request(id=self.import_id, called_directly=False, is_eager=False)
+        try:
+            return import_dataset.run(*args, column_label="labels", **kwargs)
+        finally:
+            import_dataset.pop_request()
+
+    @contextlib.contextmanager
+    def fail_on_batch(self, n):
+        save = Examples.save
+        calls = []
+
+        def side_effect(examples):
+            calls.append(examples)
+            if len(calls) == n:
+                raise ConnectionError("transient failure")
+            return save(examples)
+
+        # the retry is left to the test, instead of being sent to the broker.
+        with patch.object(Examples, "save", autospec=True, side_effect=side_effect), patch.object(
+            import_dataset, "retry", side_effect=lambda exc, **kwargs: exc
+        ), self.assertRaises(ConnectionError):
+            yield
+
+    def test_retry_resumes_after_committed_batches(self):
+        filename = "text_classification/example.jsonl"
+        with self.captureOnCommitCallbacks(execute=True), self.fail_on_batch(3):
+            self.run_import(filename)
+        self.assertEqual(Example.objects.count(), 2)
+        checkpoint = ImportCheckpoint.objects.get(task_id=self.import_id)
+        self.assertEqual((checkpoint.rows_parsed, checkpoint.rows_committed), (2, 2))
+        progress = AsyncResult(self.import_id).info
+        self.assertEqual(progress["rows_committed"], 2)
+        self.assertEqual(progress["files"], {"done": 0, "total": 1})
+
+        response = self.run_import(filename)
+        self.assertEqual(response["error"], [])
+        self.assertEqual(sorted(Example.objects.values_list("text", flat=True)), ["exampleA", "exampleB", "exampleC"])
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_does_not_count_skipped_duplicates_as_committed(self):
+        filename = "text_classification/example.jsonl"
+        self.run_import(filename)
+        with self.fail_on_batch(3):
+            self.run_import(filename, duplicates="skip")
+        checkpoint = ImportCheckpoint.objects.get(task_id=self.import_id)
+        self.assertEqual((checkpoint.rows_parsed, checkpoint.rows_committed), (2, 0))
+
+    def test_keeps_errors_of_committed_batches(self):
+        filename = "text_classification/example.invalid.jsonl"
+        with self.fail_on_batch(3):
+            self.run_import(filename)
+        self.assertEqual(ImportCheckpoint.objects.get(task_id=self.import_id).error_count, 1)
+        response = self.run_import(filename)
+        self.assertEqual([error["line"] for error in response["error"]], [2, 4])
+        self.assertEqual(Example.objects.count(), 2)
@@ -4,6 +4,7 @@ from django.shortcuts import get_object_or_404
 
 from examples.assignment.strategies import StrategyName, create_assignment_strategy
 from examples.models import Assignment, Example
+from projects.events import publish
 from projects.models import Member, Project
 
 
@@ -31,3 +32,5 @@ def bulk_assign(project_id: int, strategy_name: StrategyName, member_ids: List[i
         for assignment in assignments
     ]
     Assignment.objects.bulk_create(assignments)
+    # the bulk insert sends no signals, and is too large for deltas anyway.
+    publish(project.id, {"type": "assignment", "op": "bulk"})
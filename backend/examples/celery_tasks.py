@@ -0,0 +1,26 @@
+import functools
+from typing import List
+
+from celery import shared_task
+
+from .models import ExampleAgreement
+from projects.report_cache import bump_annotation_version
+from projects.transactions import on_commit_batch
+
+
+@shared_task
+def refresh_agreements(project_id: int, example_ids: List[int]):
+    ExampleAgreement.objects.refresh(example_ids)
+    # cached reports read the agreement table, so they are outdated once it changes.
+    bump_annotation_version(project_id)
+
+
+def _schedule_refresh(project_id: int, example_ids: List[int]):
+    refresh_agreements.delay(project_id, sorted(set(example_ids)))
+
+
+def refresh_agreements_later(project_id: int, example_ids: List[int]):
+    """Recompute the agreements of examples in a task, once per project and transaction, after it commits."""
+    flush = functools.partial(_schedule_refresh, project_id)
+    for example_id in example_ids:
+        on_commit_batch(("agreements", project_id), example_id, flush)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...models import ExampleAgreement
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the label vote and agreement tables used by the disagreement analysis"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project_id", type=int, default=None, help="Rebuild only this project.")
+        parser.add_argument("--batch_size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        if options["project_id"]:
+            projects = projects.filter(pk=options["project_id"])
+        for project in projects:
+            ExampleAgreement.objects.rebuild(project, batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt agreements of project "{project.name}"'))
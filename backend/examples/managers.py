@@ -1,4 +1,9 @@
-from django.db.models import Count, Manager
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Exists, Manager, OuterRef, Q
+from django.utils import timezone
 
 
 class ExampleManager(Manager):
@@ -8,6 +13,10 @@ class ExampleManager(Manager):
         examples = self.in_bulk(uuids, field_name="uuid")
         return [examples[uid] for uid in uuids]
 
+    def touch(self, example_ids):
+        """Mark the examples as changed, e.g. when their annotations change, so that delta exports include them."""
+        return self.filter(pk__in=example_ids).update(updated_at=timezone.now())
+
 
 class ExampleStateManager(Manager):
     def count_done(self, examples, user=None):
@@ -31,6 +40,25 @@ class ExampleStateManager(Manager):
                 response["progress"].append({"user": member.username, "done": 0})
         return response
     
+    def confirmed_by_all(self, examples, users):
+        """Return the ids of the examples confirmed by every given user.
+
+        Args:
+            examples: example queryset.
+            users: user list.
+
+        Returns:
+            example id queryset, usable as a subquery.
+        """
+        users = set(users)
+        return (
+            self.filter(example_id__in=examples, confirmed_by__in=users)
+            .values("example_id")
+            .annotate(num_confirmed=Count("confirmed_by", distinct=True))
+            .filter(num_confirmed=len(users))
+            .values_list("example_id", flat=True)
+        )
+
     def reset_confirmation(self, project):
         self.filter(example__project=project).delete()
     
@@ -68,4 +96,93 @@ class ExampleStateManager(Manager):
         based on your annotation data structure.
         """
         # For now, we'll just compare the meta field as a simple example
-        return state1.example.meta == state2.example.meta
\ No newline at end of file
+        return state1.example.meta == state2.example.meta
+
+
+class ExampleAgreementManager(Manager):
+    def refresh(self, example_ids):
+        """Recompute the label votes and agreement summaries of the given examples.
+
+        Only the categories of annotators who confirmed an example are counted as votes,
+        and the agreement is the share of those annotators choosing the most voted label.
+
+        Args:
+            example_ids: example ids or queryset.
+        """
+        from .models import Example, ExampleState, LabelVote
+
+        Category = apps.get_model("labels", "Category")
+        examples = list(Example.objects.filter(id__in=example_ids).values_list("id", "project_id", "meta"))
+        ids = [example_id for example_id, _, _ in examples]
+        totals = dict(
+            ExampleState.objects.filter(example_id__in=ids)
+            .values("example_id")
+            .annotate(total=Count("confirmed_by", distinct=True))
+            .values_list("example_id", "total")
+        )
+        confirmed = ExampleState.objects.filter(example_id=OuterRef("example_id"), confirmed_by=OuterRef("user_id"))
+        votes = (
+            Category.objects.filter(example_id__in=ids)
+            .filter(Exists(confirmed))
+            .values("example_id", "label_id")
+            .annotate(count=Count("user", distinct=True))
+        )
+        max_votes = {}
+        label_votes = []
+        for vote in votes:
+            label_votes.append(LabelVote(example_id=vote["example_id"], label_id=vote["label_id"], count=vote["count"]))
+            max_votes[vote["example_id"]] = max(max_votes.get(vote["example_id"], 0), vote["count"])
+
+        agreements = []
+        for example_id, project_id, meta in examples:
+            total = totals.get(example_id, 0)
+            if isinstance(meta, dict) and "annotations" in meta:
+                # every annotator shares the annotations stored in meta.
+                max_agreement = 100.0
+            else:
+                max_agreement = round(max_votes.get(example_id, 0) / total * 100, 1) if total else 0.0
+            agreements.append(
+                self.model(
+                    example_id=example_id,
+                    project_id=project_id,
+                    total_annotators=total,
+                    max_agreement=max_agreement,
+                )
+            )
+
+        # the rows are upserted, so that refreshes of the same example running at once do not
+        # both insert them; the last one to commit wins.
+        labels_by_example = defaultdict(list)
+        for vote in label_votes:
+            labels_by_example[vote.example_id].append(vote.label_id)
+        stale = Q(example_id__in=[example_id for example_id in ids if example_id not in labels_by_example])
+        for example_id, label_ids in labels_by_example.items():
+            stale |= Q(example_id=example_id) & ~Q(label_id__in=label_ids)
+        with transaction.atomic():
+            LabelVote.objects.filter(stale).delete()
+            LabelVote.objects.bulk_create(
+                label_votes, update_conflicts=True, unique_fields=["example", "label"], update_fields=["count"]
+            )
+            self.bulk_create(
+                agreements,
+                update_conflicts=True,
+                unique_fields=["example"],
+                update_fields=["project", "total_annotators", "max_agreement", "updated_at"],
+            )
+
+    def rebuild(self, project, batch_size=1000):
+        """Recompute the agreement table of a whole project, e.g. after bulk writes."""
+        from .models import Example
+
+        ids = list(Example.objects.filter(project=project).order_by("id").values_list("id", flat=True))
+        for i in range(0, len(ids), batch_size):
+            self.refresh(ids[i : i + batch_size])
+
+    def disagreements(self, project, threshold):
+        """Examples annotated by several users where no label reaches the threshold (in percent)."""
+        return self.filter(
+            project=project,
+            total_annotators__gt=1,
+            max_agreement__gt=0,
+            max_agreement__lt=threshold,
+        )
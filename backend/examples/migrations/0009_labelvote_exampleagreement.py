@@ -0,0 +1,61 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_project_allow_member_to_create_label_type_and_more"),
+        ("label_types", "0007_delete_relationtypeold"),
+        ("examples", "0008_assignment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExampleAgreement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("total_annotators", models.IntegerField(default=0)),
+                ("max_agreement", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "example",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="agreement", to="examples.example"
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="agreements", to="projects.project"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="LabelVote",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "example",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="label_votes", to="examples.example"
+                    ),
+                ),
+                (
+                    "label",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="label_types.categorytype"),
+                ),
+            ],
+            options={
+                "unique_together": {("example", "label")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="exampleagreement",
+            index=models.Index(fields=["project", "max_agreement"], name="examples_ex_project_7a3f35_idx"),
+        ),
+    ]
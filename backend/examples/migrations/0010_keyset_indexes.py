@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0009_labelvote_exampleagreement"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(fields=["assignee", "id"], name="examples_as_assigne_9e2eab_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="example",
+            index=models.Index(fields=["project", "created_at", "id"], name="examples_ex_project_3ddcfb_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0010_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="example",
+            index=models.Index(fields=["project", "updated_at"], name="examples_ex_project_dedff8_idx"),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.7 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0011_example_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="example",
+            name="content_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="example",
+            index=models.Index(fields=["project", "content_hash"], name="examples_ex_project_76d262_idx"),
+        ),
+    ]
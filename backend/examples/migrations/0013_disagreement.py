@@ -0,0 +1,34 @@
+# Generated by Django 4.1.7 on 2026-10-18 16:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("examples", "0012_example_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Disagreement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("resolved", models.BooleanField(default=False)),
+                (
+                    "example",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="disagreements", to="examples.example"
+                    ),
+                ),
+                ("users", models.ManyToManyField(related_name="disagreements", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
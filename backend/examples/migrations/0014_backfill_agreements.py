@@ -0,0 +1,68 @@
+from django.db import migrations
+from django.db.models import Count, Exists, OuterRef
+
+BATCH_SIZE = 1000
+
+
+def backfill_agreements(apps, schema_editor):
+    """Compute the label votes and agreements of the examples annotated before they were kept."""
+    Example = apps.get_model("examples", "Example")
+    ExampleState = apps.get_model("examples", "ExampleState")
+    ExampleAgreement = apps.get_model("examples", "ExampleAgreement")
+    LabelVote = apps.get_model("examples", "LabelVote")
+    Category = apps.get_model("labels", "Category")
+
+    examples = Example.objects.filter(agreement__isnull=True).order_by("id")
+    last_id = 0
+    while True:
+        batch = list(examples.filter(id__gt=last_id).values_list("id", "project_id", "meta")[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        ids = [example_id for example_id, _, _ in batch]
+        totals = dict(
+            ExampleState.objects.filter(example_id__in=ids)
+            .values("example_id")
+            .annotate(total=Count("confirmed_by", distinct=True))
+            .values_list("example_id", "total")
+        )
+        confirmed = ExampleState.objects.filter(example_id=OuterRef("example_id"), confirmed_by=OuterRef("user_id"))
+        votes = (
+            Category.objects.filter(example_id__in=ids)
+            .filter(Exists(confirmed))
+            .values("example_id", "label_id")
+            .annotate(count=Count("user", distinct=True))
+        )
+        max_votes = {}
+        label_votes = []
+        for vote in votes:
+            label_votes.append(LabelVote(example_id=vote["example_id"], label_id=vote["label_id"], count=vote["count"]))
+            max_votes[vote["example_id"]] = max(max_votes.get(vote["example_id"], 0), vote["count"])
+        agreements = []
+        for example_id, project_id, meta in batch:
+            total = totals.get(example_id, 0)
+            if isinstance(meta, dict) and "annotations" in meta:
+                max_agreement = 100.0
+            else:
+                max_agreement = round(max_votes.get(example_id, 0) / total * 100, 1) if total else 0.0
+            agreements.append(
+                ExampleAgreement(
+                    example_id=example_id,
+                    project_id=project_id,
+                    total_annotators=total,
+                    max_agreement=max_agreement,
+                )
+            )
+        LabelVote.objects.filter(example_id__in=ids).delete()
+        LabelVote.objects.bulk_create(label_votes)
+        ExampleAgreement.objects.bulk_create(agreements)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0013_disagreement"),
+        ("labels", "0016_segmentation"),
+    ]
+
+    operations = [migrations.RunPython(code=backfill_agreements, reverse_code=migrations.RunPython.noop)]
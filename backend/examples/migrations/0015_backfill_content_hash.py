@@ -0,0 +1,39 @@
+import hashlib
+import unicodedata
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def hash_text(text):
+    # the hash of data_import.pipeline.dedup, kept here as it was when the examples were hashed.
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    """Hash the texts of the examples imported before the hashes were kept, so new imports find their duplicates.
+
+    The examples of files are not hashed, reading every stored file back would be too slow.
+    """
+    Example = apps.get_model("examples", "Example")
+    examples = Example.objects.filter(content_hash__isnull=True, text__isnull=False).order_by("id")
+    last_id = 0
+    while True:
+        batch = list(examples.filter(id__gt=last_id).only("id", "text")[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        for example in batch:
+            example.content_hash = hash_text(example.text)
+        Example.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0014_backfill_agreements"),
+    ]
+
+    operations = [migrations.RunPython(code=backfill_content_hash, reverse_code=migrations.RunPython.noop)]
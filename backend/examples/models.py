@@ -5,7 +5,7 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django_drf_filepond.models import DrfFilePondStoredStorage
 
-from .managers import ExampleManager, ExampleStateManager
+from .managers import ExampleAgreementManager, ExampleManager, ExampleStateManager
 from projects.models import Project
 
 
@@ -20,6 +20,7 @@ class Example(models.Model):
     annotations_approved_by = models.ForeignKey(to=User, on_delete=models.SET_NULL, null=True, blank=True)
     text = models.TextField(null=True, blank=True)
     score = models.FloatField(default=100)
+    content_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -36,6 +37,11 @@ class Example(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["project", "created_at", "id"]),
+            models.Index(fields=["project", "updated_at"]),
+            models.Index(fields=["project", "content_hash"]),
+        ]
 
 
 class Assignment(models.Model):
@@ -48,6 +54,7 @@ class Assignment(models.Model):
 
     class Meta:
         unique_together = (("example", "assignee"),)
+        indexes = [models.Index(fields=["assignee", "id"])]
 
     def clean(self):
         # assignee must be a member of the project
@@ -85,11 +92,37 @@ class Comment(models.Model):
     class Meta:
         ordering = ["created_at"]
 
+
 class Disagreement(models.Model):
     example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="disagreements")
     users = models.ManyToManyField(to=User, related_name="disagreements")
     created_at = models.DateTimeField(auto_now_add=True)
     resolved = models.BooleanField(default=False)
-    
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class ExampleAgreement(models.Model):
+    """Denormalized agreement summary of an example, kept in sync by signals."""
+
+    objects = ExampleAgreementManager()
+    example = models.OneToOneField(to=Example, on_delete=models.CASCADE, related_name="agreement")
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="agreements")
+    total_annotators = models.IntegerField(default=0)
+    max_agreement = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["project", "max_agreement"])]
+
+
+class LabelVote(models.Model):
+    """Number of confirming annotators who assigned a category to an example."""
+
+    example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="label_votes")
+    label = models.ForeignKey(to="label_types.CategoryType", on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+
     class Meta:
-        ordering = ["-created_at"] 
\ No newline at end of file
+        unique_together = (("example", "label"),)
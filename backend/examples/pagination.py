@@ -0,0 +1,121 @@
+import base64
+import datetime
+import json
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginates on the values of the ordering fields of the last row, instead of an offset.
+
+    The ordering of the queryset is completed with the primary key, so that rows are totally
+    ordered and fetching the next page is an index range scan whatever the depth.
+    The first page is requested with an empty `cursor` query parameter.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, page_size=None):
+        self.default_page_size = page_size or settings.REST_FRAMEWORK["PAGE_SIZE"]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*[f"-{field}" if desc else field for field, desc in self.ordering])
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.build_filter(position))
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([("next", self.get_next_link()), ("previous", None), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    @staticmethod
+    def get_ordering(queryset):
+        """Return the ordering of the queryset as (field, descending) pairs, ending with the primary key."""
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+        ordering = []
+        for field in order_by:
+            if not isinstance(field, str) or field == "?":
+                continue
+            ordering.append((field.lstrip("-"), field.startswith("-")))
+        if not any(field in ("pk", "id") for field, _ in ordering):
+            ordering.append(("id", False))
+        return ordering
+
+    def build_filter(self, position):
+        """Select the rows after the position, in lexicographic order of the ordering fields."""
+        after = Q()
+        for i, (field, desc) in enumerate(self.ordering):
+            lookup = "lt" if desc else "gt"
+            condition = Q(**{f"{field}__{lookup}": position[i]})
+            for j, (prev_field, _) in enumerate(self.ordering[:i]):
+                condition &= Q(**{prev_field: position[j]})
+            after |= condition
+        return after
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, obj):
+        position = [getattr(obj, field) for field, _ in self.ordering]
+        data = json.dumps(position, default=self.encode_value)
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def encode_value(value):
+        # keeps the microseconds, unlike DjangoJSONEncoder, so that positions are exact.
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        raise TypeError(f"Cannot use {type(value).__name__} in a cursor")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "offset")
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
@@ -1,3 +1,5 @@
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 
 from .models import Assignment, Comment, Disagreement, Example, ExampleState
@@ -73,6 +75,41 @@ class ExampleSerializer(serializers.ModelSerializer):
         read_only_fields = ["filename", "is_confirmed", "upload_name", "assignments", "has_disagreement"]
 
 
+class ExampleListSerializer(ExampleSerializer):
+    """Serializes examples annotated by `prepare_queryset`, without extra queries per row."""
+
+    comment_count = serializers.IntegerField(source="num_comments", read_only=True)
+
+    @staticmethod
+    def prepare_queryset(queryset, project, user):
+        comments = (
+            Comment.objects.filter(example=OuterRef("pk"))
+            .order_by()
+            .values("example")
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        states = ExampleState.objects.filter(example=OuterRef("pk"))
+        if not project.collaborative_annotation:
+            states = states.filter(confirmed_by_id=user.id)
+        disagreements = Disagreement.objects.filter(example=OuterRef("pk"), resolved=False)
+        return (
+            queryset.select_related("project", "annotations_approved_by")
+            .prefetch_related(Prefetch("assignments", queryset=Assignment.objects.select_related("assignee")))
+            .annotate(
+                num_comments=Coalesce(Subquery(comments, output_field=IntegerField()), 0),
+                confirmed=Exists(states),
+                disagreed=Exists(disagreements),
+            )
+        )
+
+    def get_is_confirmed(self, instance):
+        return instance.confirmed
+
+    def get_has_disagreement(self, instance):
+        return instance.disagreed
+
+
 class ExampleStateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExampleState
@@ -1,9 +1,22 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .celery_tasks import refresh_agreements_later
 from .models import ExampleState
+from projects.report_cache import get_project_id
 
 @receiver(post_save, sender=ExampleState)
 def check_for_disagreements(sender, instance, created, **kwargs):
     if created:
         # Check for disagreements whenever a new state is created
-        instance.example.states.check_for_disagreements(instance.example)
\ No newline at end of file
+        instance.example.states.check_for_disagreements(instance.example)
+
+
+@receiver(post_save, sender=ExampleState)
+@receiver(post_delete, sender=ExampleState)
+@receiver(post_save, sender="labels.Category")
+@receiver(post_delete, sender="labels.Category")
+def refresh_agreement(sender, instance, origin=None, **kwargs):
+    # Recomputed by a task once committed, so that neither the request nor cascading deletes wait for it.
+    project_id = get_project_id(instance, origin)
+    if project_id is not None:
+        refresh_agreements_later(project_id, [instance.example_id])
@@ -0,0 +1,159 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from .utils import make_doc, make_example_state
+from api.tests.utils import CRUDMixin
+from examples.celery_tasks import refresh_agreements
+from examples.models import ExampleAgreement
+from projects.models import Member, ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestDisagreementCompare(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.user1 = self.project.approver
+        self.user2 = self.project.annotator
+        self.positive = mommy.make("CategoryType", project=self.project.item, text="positive")
+        self.negative = mommy.make("CategoryType", project=self.project.item, text="negative")
+        self.agreed = make_doc(self.project.item)
+        self.conflicted = make_doc(self.project.item)
+        self.unshared = make_doc(self.project.item)
+        for example, label1, label2 in [
+            (self.agreed, self.positive, self.positive),
+            (self.conflicted, self.positive, self.negative),
+        ]:
+            make_example_state(example, self.user1)
+            make_example_state(example, self.user2)
+            mommy.make("Category", example=example, user=self.user1, label=label1)
+            mommy.make("Category", example=example, user=self.user2, label=label2)
+        make_example_state(self.unshared, self.user1)
+        member1 = Member.objects.get(project=self.project.item, user=self.user1)
+        member2 = Member.objects.get(project=self.project.item, user=self.user2)
+        self.url = reverse(viewname="disagreement_compare", args=[self.project.item.id])
+        self.url += f"?member1={member1.id}&member2={member2.id}"
+
+    def test_allows_approver_to_compare(self):
+        response = self.assert_fetch(self.project.approver, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_compared"], 2)
+        self.assertEqual(response.data["conflict_count"], 1)
+        conflicts = {item["example"]["id"]: item for item in response.data["conflicts"]}
+        self.assertFalse(conflicts[self.agreed.id]["hasConflict"])
+        self.assertTrue(conflicts[self.conflicted.id]["hasConflict"])
+        self.assertEqual(conflicts[self.conflicted.id]["member2"]["annotations"][0]["label"], "negative")
+
+    def test_denies_annotator_to_compare(self):
+        self.assert_fetch(self.project.annotator, status.HTTP_403_FORBIDDEN)
+
+    def test_paginates_conflicts(self):
+        self.url += "&limit=1&offset=1"
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_compared"], 2)
+        self.assertEqual(response.data["conflict_count"], 1)
+        self.assertEqual(len(response.data["conflicts"]), 1)
+        self.assertEqual(response.data["conflicts"][0]["example"]["id"], self.conflicted.id)
+
+    def test_counts_conflicts_outside_the_page(self):
+        self.url += "&limit=1"
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["conflict_count"], 1)
+        self.assertEqual(response.data["conflicts"][0]["example"]["id"], self.agreed.id)
+        self.assertFalse(response.data["conflicts"][0]["hasConflict"])
+
+    def test_does_not_count_examples_annotated_in_meta(self):
+        self.conflicted.meta = {"annotations": [{"label": "positive"}]}
+        self.conflicted.save()
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["conflict_count"], 0)
+
+    def test_rejects_negative_offset(self):
+        self.url += "&offset=-1"
+        self.assert_fetch(self.project.admin, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_depend_on_example_count(self):
+        self.client.force_login(self.project.admin)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url + "&limit=0")
+        for _ in range(5):
+            example = make_doc(self.project.item)
+            make_example_state(example, self.user1)
+            make_example_state(example, self.user2)
+            mommy.make("Category", example=example, user=self.user1, label=self.positive)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url + "&limit=0")
+        self.assertEqual(response.data["total_compared"], 7)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
+class TestAutoDisagreementAnalysis(CRUDMixin):
+    def setUp(self):
+        # the agreements are refreshed by a task once the labels are committed, run by the app of the task.
+        conf = refresh_agreements.app.conf
+        self.addCleanup(setattr, conf, "task_always_eager", conf.task_always_eager)
+        conf.task_always_eager = True
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.positive = mommy.make("CategoryType", project=self.project.item, text="positive")
+        self.negative = mommy.make("CategoryType", project=self.project.item, text="negative")
+        self.agreed = make_doc(self.project.item)
+        self.conflicted = make_doc(self.project.item)
+        with self.captureOnCommitCallbacks(execute=True):
+            for example, labels in [
+                (self.agreed, [self.positive, self.positive, self.negative]),
+                (self.conflicted, [self.positive, self.negative]),
+            ]:
+                for user, label in zip(self.project.members, labels):
+                    make_example_state(example, user)
+                    mommy.make("Category", example=example, user=user, label=label)
+        self.url = reverse(viewname="auto_disagreement_analysis", args=[self.project.item.id])
+
+    def test_allows_approver_to_analyze(self):
+        response = self.assert_fetch(self.project.approver, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_examples_analyzed"], 2)
+        self.assertEqual(response.data["examples_with_disagreements"], 1)
+        self.assertEqual(response.data["available_labels"], ["negative", "positive"])
+        disagreement = response.data["disagreements"][0]
+        self.assertEqual(disagreement["total_annotators"], 2)
+        self.assertEqual(disagreement["max_agreement"], 50.0)
+
+    def test_denies_annotator_to_analyze(self):
+        self.assert_fetch(self.project.annotator, status.HTTP_403_FORBIDDEN)
+
+    def test_votes_follow_label_deletion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conflicted.categories.filter(label=self.negative).delete()
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        labels = response.data["disagreements"][0]["label_percentages"]
+        self.assertEqual([stat["label"] for stat in labels], ["positive"])
+
+    def test_votes_follow_confirmation_reset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conflicted.states.filter(confirmed_by=self.project.approver).delete()
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_examples_analyzed"], 1)
+        self.assertEqual(response.data["examples_with_disagreements"], 0)
+
+    def test_votes_follow_confirmation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_example_state(self.conflicted, self.project.annotator)
+            mommy.make("Category", example=self.conflicted, user=self.project.annotator, label=self.negative)
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["examples_with_disagreements"], 0)
+
+    def test_rebuild_matches_incremental_updates(self):
+        ExampleAgreement.objects.all().delete()
+        ExampleAgreement.objects.rebuild(self.project.item)
+        agreement = ExampleAgreement.objects.get(example=self.agreed)
+        self.assertEqual(agreement.total_annotators, 3)
+        self.assertEqual(agreement.max_agreement, 66.7)
+
+    def test_refresh_updates_rows_in_place(self):
+        agreement = ExampleAgreement.objects.get(example=self.conflicted)
+        self.conflicted.categories.filter(label=self.negative).update(label=self.positive)
+        ExampleAgreement.objects.refresh([self.conflicted.id])
+        refreshed = ExampleAgreement.objects.get(example=self.conflicted)
+        self.assertEqual(refreshed.id, agreement.id)
+        self.assertEqual(refreshed.max_agreement, 100.0)
+        self.assertQuerysetEqual(self.conflicted.label_votes.values_list("label", "count"), [(self.positive.id, 2)])
@@ -1,8 +1,10 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.http import urlencode
 from rest_framework import status
 from rest_framework.reverse import reverse
 
-from .utils import make_assignment, make_doc, make_example_state
+from .utils import make_assignment, make_comment, make_doc, make_example_state
 from api.tests.utils import CRUDMixin
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
@@ -49,6 +51,25 @@ class TestExampleListAPI(CRUDMixin):
         response = self.assert_fetch(self.project.annotator, status.HTTP_200_OK)
         self.assertFalse(response.data["results"][0]["is_confirmed"])
 
+    def test_list_fields_are_computed_without_queries_per_example(self):
+        make_comment(self.example, self.project.admin)
+        self.client.force_login(self.project.annotator)
+        with CaptureQueriesContext(connection) as one_example:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["comment_count"], 1)
+        self.assertEqual(len(response.data["results"][0]["assignments"]), 3)
+        for _ in range(5):
+            example = make_doc(self.project.item)
+            make_comment(example, self.project.admin)
+            make_example_state(example, self.project.annotator)
+            for member in self.project.members:
+                make_assignment(self.project.item, example, member)
+        with CaptureQueriesContext(connection) as many_examples:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 6)
+        self.assertTrue(response.data["results"][-1]["is_confirmed"])
+        self.assertEqual(len(one_example.captured_queries), len(many_examples.captured_queries))
+
 
 class TestExampleListCollaborative(CRUDMixin):
     def setUp(self):
@@ -107,6 +128,45 @@ class TestExampleListFilter(CRUDMixin):
         self.assert_filter(data={"confirmed": "True"}, user=user, expected=0)
 
 
+class TestExampleListKeysetPagination(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION, random_order=True)
+        self.examples = [make_doc(self.project.item) for _ in range(5)]
+        for example in self.examples:
+            for member in self.project.members:
+                make_assignment(self.project.item, example, member)
+        self.url = reverse(viewname="example_list", args=[self.project.item.id])
+
+    def fetch_all(self, user):
+        self.client.force_login(user)
+        ids = []
+        url = f"{self.url}?cursor=&limit=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_pages_through_examples_in_creation_order(self):
+        ids = self.fetch_all(self.project.admin)
+        self.assertEqual(ids, [example.id for example in self.examples])
+
+    def test_pages_through_assignments_in_random_order(self):
+        ids = self.fetch_all(self.project.annotator)
+        self.assertCountEqual(ids, [example.id for example in self.examples])
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_rejects_invalid_cursor(self):
+        self.url += "?cursor=invalid"
+        self.assert_fetch(self.project.admin, status.HTTP_404_NOT_FOUND)
+
+    def test_keeps_limit_offset_pagination_by_default(self):
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 5)
+
+
 class TestExampleDetail(CRUDMixin):
     def setUp(self):
         self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
@@ -1,16 +1,18 @@
 from xml.dom import ValidationErr
+from collections import defaultdict
+
 from django.apps import apps
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
-from django.db.models import Q
-from examples.models import Example, ExampleState
+from django.db.models import Exists, OuterRef, Q
+from examples.models import Example, ExampleAgreement, ExampleState, LabelVote
 from projects.models import Member, Project
-from examples.serializers import ExampleSerializer
+from examples.serializers import ExampleListSerializer
 from projects.permissions import IsProjectAdmin, IsAnnotationApprover
+from projects.report_cache import cached_response
 
 
 class DisagreementCompare(APIView):
@@ -20,13 +22,24 @@ class DisagreementCompare(APIView):
         member1_id = request.query_params.get('member1')
         member2_id = request.query_params.get('member2')
         search_query = request.query_params.get('q', '')
-        print(member1_id, member2_id, search_query)
         
         if not member1_id or not member2_id:
             return Response(
                 {"error": "Both member1 and member2 parameters are required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+        try:
+            offset = int(request.query_params.get('offset', 0))
+            limit = request.query_params.get('limit')
+            limit = int(limit) if limit is not None else None
+            if offset < 0 or (limit is not None and limit < 0):
+                raise ValueError()
+        except ValueError:
+            return Response(
+                {"error": "limit and offset must be non-negative integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
             project = get_object_or_404(Project, pk=project_id)
@@ -41,44 +54,51 @@ class DisagreementCompare(APIView):
             
             user1 = member1.user
             user2 = member2.user
-            
-            user1_states = ExampleState.objects.filter(
-                confirmed_by=user1,
-                example__project=project
-            ).select_related('example')
-            
-            user2_states = ExampleState.objects.filter(
-                confirmed_by=user2,
-                example__project=project
-            ).select_related('example')
-            
-            common_examples = (
-                {state.example_id for state in user1_states} &
-                {state.example_id for state in user2_states}
-            )
-            
+
+            common_examples = ExampleState.objects.confirmed_by_all(project.examples.all(), [user1, user2])
             examples_queryset = Example.objects.filter(id__in=common_examples)
             if search_query:
                 examples_queryset = examples_queryset.filter(
                     Q(text__icontains=search_query) |
                     Q(meta__icontains=search_query)
                 )
+            examples_queryset = examples_queryset.order_by('created_at', 'id')
+            Category = apps.get_model('labels', 'Category')
 
-            conflicts = []
-            for example in examples_queryset:
-                state1 = user1_states.get(example=example)
-                state2 = user2_states.get(example=example)
-                
-                annotations1 = self._get_annotations(state1)
-                annotations2 = self._get_annotations(state2)
+            # Only the page is loaded and compared, the totals are counted by the database.
+            total_compared = examples_queryset.count()
+            conflict_count = examples_queryset.exclude(meta__has_key='annotations').filter(
+                self._labeled_only_by(Category, user1, user2) | self._labeled_only_by(Category, user2, user1)
+            ).count()
+            page_ids = examples_queryset[offset:offset + limit] if limit is not None else examples_queryset[offset:]
+            example_ids = list(page_ids.values_list('id', flat=True))
+            page_queryset = Example.objects.filter(id__in=example_ids)
+            meta_annotations = {
+                example_id: meta['annotations']
+                for example_id, meta in page_queryset.filter(meta__has_key='annotations').values_list('id', 'meta')
+            }
+            categories = Category.objects.group_by_example_and_user(page_queryset, [user1, user2])
+
+            page = []
+            for example_id in example_ids:
+                if example_id in meta_annotations:
+                    annotations1 = annotations2 = meta_annotations[example_id]
+                else:
+                    annotations1 = categories.get((example_id, user1.id), [])
+                    annotations2 = categories.get((example_id, user2.id), [])
+                has_conflict = self._has_conflict(annotations1, annotations2)
+                page.append((example_id, annotations1, annotations2, has_conflict))
+
+            page_examples = ExampleListSerializer.prepare_queryset(page_queryset, project, request.user).in_bulk()
 
-                serialized_example = ExampleSerializer(example, context={'request': request}).data
-                
+            conflicts = []
+            for example_id, annotations1, annotations2, has_conflict in page:
+                serialized_example = ExampleListSerializer(page_examples[example_id], context={'request': request}).data
                 conflicts.append({
                     "example": serialized_example,
                     "member1": {"annotations": annotations1},
                     "member2": {"annotations": annotations2},
-                    "hasConflict": annotations1 != annotations2
+                    "hasConflict": has_conflict
                 })
 
             return Response({
@@ -94,9 +114,9 @@ class DisagreementCompare(APIView):
                     "user_id": user2.id,
                     "username": user2.username,
                 },
-                "total_compared": len(common_examples),
+                "total_compared": total_compared,
                 "conflicts": conflicts,
-                "conflict_count": sum(1 for c in conflicts if c['hasConflict']),
+                "conflict_count": conflict_count,
             })
             
         except Exception as e:
@@ -105,25 +125,22 @@ class DisagreementCompare(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def _get_annotations(self, example_state):
-        """Extract annotations from example state"""
-        if 'annotations' in example_state.example.meta:
-            return example_state.example.meta['annotations']
-        
-        # Implementation for specific annotation types
-        annotations = []
-        Category = apps.get_model('labels', 'Category')
-        categories = Category.objects.filter(
-            example=example_state.example,
-            user=example_state.confirmed_by
+    @staticmethod
+    def _labeled_only_by(Category, user, other):
+        """Whether the example has a category of `user` that `other` did not choose, as in `_has_conflict`."""
+        chosen_by_other = Category.objects.filter(
+            example_id=OuterRef('example_id'), label_id=OuterRef('label_id'), user=other
         )
-        for cat in categories:
-            annotations.append({
-                'type': 'category',
-                'label': cat.label.text,
-                'label_id': cat.label.id,
-            })
-        return annotations
+        return Exists(Category.objects.filter(example_id=OuterRef('pk'), user=user).filter(~Exists(chosen_by_other)))
+
+    @staticmethod
+    def _has_conflict(annotations1, annotations2):
+        """Compare two annotation lists as sets of labels"""
+        labels1 = {a.get('label_id', a.get('label')) for a in annotations1 if isinstance(a, dict)}
+        labels2 = {a.get('label_id', a.get('label')) for a in annotations2 if isinstance(a, dict)}
+        if labels1 or labels2:
+            return labels1 != labels2
+        return annotations1 != annotations2
     
 class AutoDisagreementAnalysis(APIView):
     permission_classes = [IsAuthenticated & (IsProjectAdmin | IsAnnotationApprover)]
@@ -131,78 +148,13 @@ class AutoDisagreementAnalysis(APIView):
     def get(self, request, project_id):
         try:
             project = get_object_or_404(Project, pk=project_id)
-            threshold = 0.6  # 60% threshold - if any label reaches this, it's agreement
-            label_filter = request.query_params.get('label', '')
-            order_by = request.query_params.get('order_by', 'percentage')  # 'percentage' or 'label'
-            
-            # Get examples with at least 2 annotations
-            examples = Example.objects.filter(
-                project=project,
-                states__isnull=False
-            ).annotate(
-                num_annotations=Count('states')
-            ).filter(
-                num_annotations__gt=1
-            ).prefetch_related('states__confirmed_by')
-            
-            disagreements = []
-            all_labels = set()  # Collect all available labels
-            
-            for example in examples:
-                states = example.states.all()
-                
-                # Get all annotations for this example
-                all_annotations = []
-                for state in states:
-                    annotations = self._get_annotations_safe(state)
-                    all_annotations.extend(annotations)
-                
-                # Calculate label percentages
-                label_stats = self._calculate_label_percentages(all_annotations, states.count())
-                
-                # Collect all labels for filter dropdown
-                for stat in label_stats:
-                    all_labels.add(stat['label'])
-                
-                # NEW LOGIC: Check for disagreement
-                # Disagreement occurs when NO label reaches the threshold
-                has_agreement = any(stat['agreement_percentage'] >= threshold * 100 for stat in label_stats)
-                has_disagreement = not has_agreement and len(label_stats) > 0
-                
-                # Filter by label if specified
-                filtered_label_stats = label_stats
-                if label_filter:
-                    filtered_label_stats = [stat for stat in label_stats if stat['label'] == label_filter]
-                
-                # Only include examples with disagreements
-                if has_disagreement and len(filtered_label_stats) > 0:
-                    # Sort labels based on order_by parameter
-                    if order_by == 'percentage':
-                        filtered_label_stats.sort(key=lambda x: x['agreement_percentage'], reverse=True)
-                    else:  # order by label name
-                        filtered_label_stats.sort(key=lambda x: x['label'])
-                    
-                    disagreements.append({
-                        'example_text': example.text,
-                        'total_annotators': states.count(),
-                        'label_percentages': filtered_label_stats,
-                        'threshold_used': threshold,
-                        'max_agreement': max([stat['agreement_percentage'] for stat in label_stats]) if label_stats else 0
-                    })
-            
-            # Convert all_labels to sorted list for frontend dropdown
-            available_labels = sorted(list(all_labels))
-            
-            return Response({
-                'project_id': project.id,
-                'project_name': project.name,
-                'total_examples_analyzed': examples.count(),
-                'examples_with_disagreements': len(disagreements),
-                'threshold': threshold,
-                'disagreements': disagreements,
-                'available_labels': available_labels  # Add this for the dropdown
-            })
-            
+            return cached_response(
+                project.id,
+                'auto_disagreement_analysis',
+                request.query_params,
+                lambda: self.analyze(project, request.query_params)
+            )
+
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -211,71 +163,78 @@ class AutoDisagreementAnalysis(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def _calculate_label_percentages(self, all_annotations, total_annotators):
-        """Calculate agreement percentage for each label"""
-        label_counts = {}
-        
-        # Count how many times each label appears
-        for annotation in all_annotations:
-            if annotation.get('type') == 'category' and 'label' in annotation:
-                label = annotation['label']
-                label_counts[label] = label_counts.get(label, 0) + 1
-        
-        # Calculate percentages
-        label_stats = []
-        for label, count in label_counts.items():
-            agreement_percentage = (count / total_annotators) * 100
-            label_stats.append({
-                'label': label,
-                'annotator_count': count,
-                'total_annotators': total_annotators,
-                'agreement_percentage': round(agreement_percentage, 1)
-            })
-        
-        return label_stats
+    @staticmethod
+    def analyze(project, params):
+        threshold = 0.6  # 60% threshold - if any label reaches this, it's agreement
+        label_filter = params.get('label', '')
+        order_by = params.get('order_by', 'percentage')  # 'percentage' or 'label'
 
-    def _get_annotations_safe(self, example_state):
-        """Safe annotation extraction with error handling"""
-        try:
-            if hasattr(example_state.example, 'meta') and 'annotations' in example_state.example.meta:
-                return example_state.example.meta['annotations']
-            
-            # Fallback to category annotations
-            Category = apps.get_model('labels', 'Category')
-            if Category:
-                categories = Category.objects.filter(
-                    example=example_state.example,
-                    user=example_state.confirmed_by
-                )
-                return [{
-                    'type': 'category',
-                    'label': cat.label.text,
-                    'label_id': cat.label.id,
-                } for cat in categories]
-            
-            return []
-        except Exception:
-            return []
-    # Reuse these methods from DisagreementCompare
-    def _get_annotations(self, example_state):
-        """Extract annotations from example state"""
-        if 'annotations' in example_state.example.meta:
-            return example_state.example.meta['annotations']
-        
-        annotations = []
-        Category = apps.get_model('labels', 'Category')
-        categories = Category.objects.filter(
-            example=example_state.example,
-            user=example_state.confirmed_by
+        # Agreement summaries are maintained by signals, so disagreements are
+        # a range scan over the (project, max_agreement) index.
+        analyzed = ExampleAgreement.objects.filter(project=project, total_annotators__gt=1)
+        agreements = list(
+            ExampleAgreement.objects.disagreements(project, threshold * 100)
+            .select_related('example')
+            .order_by('example__created_at', 'example_id')
         )
-        for cat in categories:
-            annotations.append({
-                'type': 'category',
-                'label': cat.label.text,
-                'label_id': cat.label.id,
+        votes_by_example = defaultdict(list)
+        votes = LabelVote.objects.filter(
+            example_id__in=[agreement.example_id for agreement in agreements]
+        ).values_list('example_id', 'label__text', 'count')
+        for example_id, label, count in votes:
+            votes_by_example[example_id].append((label, count))
+
+        disagreements = []
+        for agreement in agreements:
+            total = agreement.total_annotators
+            label_stats = [
+                {
+                    'label': label,
+                    'annotator_count': count,
+                    'total_annotators': total,
+                    'agreement_percentage': round(count / total * 100, 1)
+                }
+                for label, count in votes_by_example[agreement.example_id]
+            ]
+
+            # Filter by label if specified
+            filtered_label_stats = label_stats
+            if label_filter:
+                filtered_label_stats = [stat for stat in label_stats if stat['label'] == label_filter]
+            if not filtered_label_stats:
+                continue
+
+            # Sort labels based on order_by parameter
+            if order_by == 'percentage':
+                filtered_label_stats.sort(key=lambda x: x['agreement_percentage'], reverse=True)
+            else:  # order by label name
+                filtered_label_stats.sort(key=lambda x: x['label'])
+
+            disagreements.append({
+                'example_text': agreement.example.text,
+                'total_annotators': total,
+                'label_percentages': filtered_label_stats,
+                'threshold_used': threshold,
+                'max_agreement': agreement.max_agreement
             })
-        return annotations
-    
+
+        # All labels voted on analyzed examples, for the frontend dropdown
+        available_labels = sorted(
+            LabelVote.objects.filter(example__agreement__in=analyzed)
+            .values_list('label__text', flat=True)
+            .distinct()
+        )
+
+        return {
+            'project_id': project.id,
+            'project_name': project.name,
+            'total_examples_analyzed': analyzed.count(),
+            'examples_with_disagreements': len(disagreements),
+            'threshold': threshold,
+            'disagreements': disagreements,
+            'available_labels': available_labels  # Add this for the dropdown
+        }
+
     def _annotations_equal(self, annotations1, annotations2):
         return annotations1 == annotations2
     
@@ -1,3 +1,4 @@
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status
@@ -6,7 +7,8 @@ from rest_framework.response import Response
 
 from examples.filters import ExampleFilter
 from examples.models import Example
-from examples.serializers import ExampleSerializer
+from examples.pagination import KeysetPagination
+from examples.serializers import ExampleListSerializer, ExampleSerializer
 from projects.models import Member, Project
 from projects.permissions import IsProjectAdmin, IsProjectStaffAndReadOnly
 
@@ -24,15 +26,29 @@ class ExampleList(generics.ListCreateAPIView):
     def project(self):
         return get_object_or_404(Project, pk=self.kwargs["project_id"])
 
+    @property
+    def paginator(self):
+        # keyset pagination is opt-in, by requesting the first page with an empty cursor.
+        if not hasattr(self, "_paginator") and KeysetPagination.cursor_query_param in self.request.query_params:
+            self._paginator = KeysetPagination()
+        return super().paginator
+
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return ExampleListSerializer
+        return self.serializer_class
+
     def get_queryset(self):
-        member = get_object_or_404(Member, project=self.project, user=self.request.user)
+        project = self.project
+        member = get_object_or_404(Member, project=project, user=self.request.user)
         if member.is_admin():
-            return self.model.objects.filter(project=self.project)
-
-        queryset = self.model.objects.filter(project=self.project, assignments__assignee=self.request.user)
-        if self.project.random_order:
-            queryset = queryset.order_by("assignments__id")
-        return queryset
+            queryset = self.model.objects.filter(project=project)
+        else:
+            queryset = self.model.objects.filter(project=project, assignments__assignee=self.request.user)
+            if project.random_order:
+                # the assignment joined by the filter above, so that the order is total per assignee.
+                queryset = queryset.annotate(assignment_id=F("assignments__id")).order_by("assignment_id")
+        return ExampleListSerializer.prepare_queryset(queryset, project, self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(project=self.project)
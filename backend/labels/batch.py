@@ -0,0 +1,278 @@
+"""Batches of label changes.
+
+A batch is a list of create, update and delete operations on the labels of any examples
+of a project. The operations are validated together, loading the labels they change and
+the objects they refer to with a single query per model, then applied in one transaction:
+the deletes first, then the updates and the creations, each with one query per label model.
+The changed labels are checked against each other and against the stored ones as a whole,
+so a batch deleting a span can create an overlapping one.
+"""
+import dataclasses
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Type
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .models import Category, Label
+from .serializers import (
+    BoundingBoxSerializer,
+    CategorySerializer,
+    RelationSerializer,
+    SegmentationSerializer,
+    SpanSerializer,
+    TextLabelSerializer,
+)
+from examples.celery_tasks import refresh_agreements_later
+from examples.models import Example
+from projects.events import publish_change
+from projects.models import Project
+from projects.report_cache import notify_annotation_change
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+# The label kinds of a batch, named as in the project event stream.
+LABEL_SERIALIZERS = {
+    "category": CategorySerializer,
+    "span": SpanSerializer,
+    "relation": RelationSerializer,
+    "textlabel": TextLabelSerializer,
+    "boundingbox": BoundingBoxSerializer,
+    "segmentation": SegmentationSerializer,
+}
+
+
+class LabelOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=[CREATE, UPDATE, DELETE])
+    type = serializers.ChoiceField(choices=list(LABEL_SERIALIZERS))
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs["op"] != CREATE and "id" not in attrs:
+            raise serializers.ValidationError({"id": ["This field is required."]})
+        return attrs
+
+
+@dataclasses.dataclass
+class Operation:
+    index: int
+    op: str
+    serializer_class: Type[serializers.ModelSerializer]
+    id: Optional[int] = None
+    data: dict = dataclasses.field(default_factory=dict)
+    # the stored label of an update or a delete, or the new one of a creation.
+    label: Optional[Label] = None
+    fields: List[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def model(self) -> Type[Label]:
+        return self.serializer_class.Meta.model
+
+    @property
+    def instance(self) -> Label:
+        """The label of a validated operation."""
+        assert self.label is not None
+        return self.label
+
+
+def scope(model: Type[models.Model], project: Project) -> models.QuerySet:
+    """The objects of a model that the labels of a project can refer to."""
+    if model is Example:
+        return Example.objects.filter(project=project)
+    if any(field.name == "project" for field in model._meta.fields):
+        return model.objects.filter(project=project)
+    return model.objects.filter(example__project=project)
+
+
+def announce_changes(project: Project, labels: Iterable[Label], created: bool):
+    """Do what saving the labels one by one would trigger, for labels written in bulk.
+
+    The examples are marked as changed, the reports invalidated, the deltas published to the
+    members and, for categories, the agreements of the examples recomputed once committed.
+    Like the signals, the invalidation and the recomputation are done once per transaction.
+    """
+    labels = list(labels)
+    if not labels:
+        return
+    example_ids = list({label.example_id for label in labels})
+    Example.objects.touch(example_ids)
+    notify_annotation_change(project.id)
+    for label in labels:
+        publish_change(project.id, label, created=created)
+    agreement_ids = [label.example_id for label in labels if isinstance(label, Category)]
+    refresh_agreements_later(project.id, agreement_ids)
+
+
+class LabelBatch:
+    """Validates the operations of a batch together, then applies them in one transaction."""
+
+    def __init__(self, project: Project, user, operations: List[dict]):
+        self.project = project
+        self.user = user
+        self.raw_operations = operations
+        self.operations: List[Operation] = []
+        self.errors: List[dict] = [{} for _ in operations]
+
+    @property
+    def can_edit_all(self) -> bool:
+        return self.project.collaborative_annotation or self.user.is_superuser
+
+    def is_valid(self) -> bool:
+        serializer = LabelOperationSerializer(data=self.raw_operations, many=True)
+        if not serializer.is_valid():
+            self.errors = serializer.errors
+            return False
+        self.operations = [
+            Operation(
+                index=i,
+                op=item["op"],
+                serializer_class=LABEL_SERIALIZERS[item["type"]],
+                id=item.get("id"),
+                data=item["data"],
+            )
+            for i, item in enumerate(serializer.validated_data)
+        ]
+        self.load_labels()
+        preloaded = self.preload()
+        for operation in self.operations:
+            if operation.op != DELETE and not self.errors[operation.index]:
+                self.build(operation, preloaded)
+        return not any(self.errors)
+
+    def load_labels(self):
+        """Load the labels to update or delete, with a query per model."""
+        ids: Dict[Type[Label], List[int]] = defaultdict(list)
+        for operation in self.operations:
+            if operation.op != CREATE:
+                ids[operation.model].append(operation.id)
+        stored = {model: scope(model, self.project).in_bulk(model_ids) for model, model_ids in ids.items()}
+        changed = set()
+        for operation in self.operations:
+            if operation.op == CREATE:
+                continue
+            label = stored[operation.model].get(operation.id)
+            key = (operation.model, operation.id)
+            if label is None:
+                self.errors[operation.index] = {"id": ["The label does not exist."]}
+            elif not self.can_edit_all and label.user_id != self.user.id:
+                self.errors[operation.index] = {"id": ["You can only change your own labels."]}
+            elif key in changed:
+                self.errors[operation.index] = {"id": ["The label is changed by another operation."]}
+            else:
+                changed.add(key)
+                operation.label = label
+
+    def preload(self) -> Dict[Type[models.Model], Dict[int, models.Model]]:
+        """Load the objects the operations refer to, with a query per model."""
+        ids: Dict[Type[models.Model], set] = defaultdict(set)
+        related_models = {
+            serializer_class: {
+                name: field.get_queryset().model
+                for name, field in serializer_class().fields.items()
+                if isinstance(field, serializers.PrimaryKeyRelatedField) and not field.read_only
+            }
+            for serializer_class in LABEL_SERIALIZERS.values()
+        }
+        for operation in self.operations:
+            if operation.op == DELETE:
+                continue
+            for name, model in related_models[operation.serializer_class].items():
+                value = operation.data.get(name)
+                if isinstance(value, str) and value.isdigit():
+                    value = int(value)
+                if isinstance(value, int) and not isinstance(value, bool):
+                    ids[model].add(value)
+        return {model: scope(model, self.project).in_bulk(model_ids) for model, model_ids in ids.items()}
+
+    def build(self, operation: Operation, preloaded):
+        context = {"preloaded": preloaded}
+        if operation.op == CREATE:
+            serializer = operation.serializer_class(data=operation.data, context=context)
+        else:
+            serializer = operation.serializer_class(operation.label, data=operation.data, partial=True, context=context)
+        if not serializer.is_valid():
+            self.errors[operation.index] = serializer.errors
+            return
+        data = serializer.validated_data
+        if operation.op == CREATE:
+            operation.label = operation.model(**data, user=self.user)
+        else:
+            if "example" in data and data["example"].id != operation.instance.example_id:
+                self.errors[operation.index] = {"example": ["The example of a label cannot be changed."]}
+                return
+            for name, value in data.items():
+                setattr(operation.label, name, value)
+            operation.fields = list(data)
+        # the related objects are checked already, the check constraints by the clean of the models,
+        # and the unique constraints by the database.
+        related = [field.name for field in operation.model._meta.fields if field.is_relation]
+        try:
+            operation.instance.full_clean(exclude=related, validate_unique=False, validate_constraints=False)
+        except DjangoValidationError as e:
+            self.errors[operation.index] = e.message_dict if hasattr(e, "error_dict") else {"detail": e.messages}
+
+    def apply(self) -> List[dict]:
+        """Apply the valid operations, returning the result of each one."""
+        try:
+            with transaction.atomic():
+                self.delete([operation for operation in self.operations if operation.op == DELETE])
+                by_model: Dict[Type[Label], List[Operation]] = defaultdict(list)
+                for operation in self.operations:
+                    if operation.op != DELETE:
+                        by_model[operation.model].append(operation)
+                for model, operations in by_model.items():
+                    self.save(model, operations)
+        except IntegrityError:
+            raise ValidationError({"detail": ["The labels violate a constraint."]})
+        return [self.result(operation) for operation in self.operations]
+
+    def delete(self, operations: List[Operation]):
+        ids: Dict[Type[Label], List[int]] = defaultdict(list)
+        for operation in operations:
+            ids[operation.model].append(operation.instance.id)
+        for model, model_ids in ids.items():
+            # the deletes send their signals, as cascading ones do.
+            model.objects.filter(id__in=model_ids).delete()
+
+    def save(self, model: Type[Label], operations: List[Operation]):
+        created = [operation.instance for operation in operations if operation.op == CREATE]
+        updated = [operation.instance for operation in operations if operation.op == UPDATE]
+        if created and model is Category and self.project.single_class_classification:
+            # a new category replaces the others of the example, as in the category list.
+            self.clear_categories(created, updated)
+        labels = [operation.instance for operation in operations]
+        annotatable = {id(label) for label in model.objects.filter_annotatable_labels(labels, self.project)}
+        rejected = [operation for operation in operations if id(operation.label) not in annotatable]
+        if rejected:
+            self.errors = [{} for _ in self.operations]
+            for operation in rejected:
+                self.errors[operation.index] = {"detail": ["The label conflicts with another label of the example."]}
+            raise ValidationError({"operations": self.errors})
+        if updated:
+            now = timezone.now()
+            fields = {field for operation in operations for field in operation.fields}
+            for label in updated:
+                label.updated_at = now
+            model.objects.bulk_update(updated, [*fields, "updated_at"])
+            announce_changes(self.project, updated, created=False)
+        if created:
+            model.objects.bulk_create(created)
+            announce_changes(self.project, created, created=True)
+
+    def clear_categories(self, created: List[Label], updated: List[Label]):
+        categories = Category.objects.filter(example_id__in={category.example_id for category in created})
+        if not self.project.collaborative_annotation:
+            categories = categories.filter(user=self.user)
+        categories.exclude(id__in=[category.id for category in updated]).delete()
+
+    def result(self, operation: Operation) -> dict:
+        if operation.op == DELETE:
+            return {"op": operation.op, "type": operation.model._meta.model_name, "id": operation.id}
+        data = operation.serializer_class(operation.label).data
+        return {"op": operation.op, "type": operation.model._meta.model_name, "id": operation.instance.id, "data": data}
@@ -1,4 +1,9 @@
-from django.db.models import Count, Manager
+import bisect
+from collections import defaultdict
+from typing import Dict, Hashable, List
+
+from django.db import connections
+from django.db.models import Count, F, Func, Manager
 
 
 class LabelManager(Manager):
@@ -41,11 +46,77 @@ class LabelManager(Manager):
     def can_annotate(self, label, project) -> bool:
         raise NotImplementedError("Please implement this method in the subclass")
 
+    def group_key(self, label, project) -> Hashable:
+        """The key of the labels a label is checked against, as in `get_labels`."""
+        if project.collaborative_annotation:
+            return label.example_id
+        return label.example_id, label.user_id
+
     def filter_annotatable_labels(self, labels, project):
-        return [label for label in labels if self.can_annotate(label, project)]
+        """Keep the labels that can be added, as if they were saved one after another.
+
+        The stored labels of all their examples are loaded in a single query, and each
+        label is checked in memory against them and the labels kept before it.
+
+        Args:
+            labels: The new or changed labels, on any number of examples.
+            project: The project of the examples.
+
+        Returns:
+            The labels that can be added, in order.
+        """
+        if not labels:
+            return []
+        stored = self.filter(example_id__in={label.example_id for label in labels})
+        if not project.collaborative_annotation:
+            stored = stored.filter(user_id__in={label.user_id for label in labels})
+        # a stored label being changed is checked with its new values only.
+        stored = stored.exclude(pk__in=[label.pk for label in labels if label.pk is not None])
+        candidates: Dict[Hashable, List] = defaultdict(list)
+        for label in labels:
+            candidates[self.group_key(label, project)].append(label)
+        existing: Dict[Hashable, List] = defaultdict(list)
+        for label in stored:
+            key = self.group_key(label, project)
+            if key in candidates:
+                existing[key].append(label)
+        annotatable = set()
+        for key, group in candidates.items():
+            annotatable.update(map(id, self.select_annotatable(group, existing[key], project)))
+        return [label for label in labels if id(label) in annotatable]
+
+    def select_annotatable(self, labels, existing, project) -> list:
+        """Keep the labels that can be added next to the existing ones of the same group, in order."""
+        return labels
 
 
 class CategoryManager(LabelManager):
+    def group_by_example_and_user(self, examples, users):
+        """Load the categories of the given users in a single query.
+
+        Args:
+            examples: example queryset.
+            users: user list.
+
+        Returns:
+            annotations keyed by (example id, user id).
+
+        Examples:
+            >>> self.group_by_example_and_user(examples, users)
+            {(1, 2): [{'type': 'category', 'label': 'positive', 'label_id': 3}]}
+        """
+        groups = defaultdict(list)
+        items = (
+            self.filter(example_id__in=examples, user__in=users)
+            .order_by("id")
+            .values("example_id", "user_id", "label_id", "label__text")
+        )
+        for item in items:
+            groups[(item["example_id"], item["user_id"])].append(
+                {"type": "category", "label": item["label__text"], "label_id": item["label_id"]}
+            )
+        return groups
+
     def can_annotate(self, label, project) -> bool:
         is_exclusive = project.single_class_classification
         categories = self.get_labels(label, project)
@@ -54,17 +125,64 @@ class CategoryManager(LabelManager):
         else:
             return not categories.filter(label=label.label).exists()
 
+    def select_annotatable(self, labels, existing, project) -> list:
+        if project.single_class_classification:
+            return [] if existing else labels[:1]
+        label_ids = {category.label_id for category in existing}
+        annotatable = []
+        for label in labels:
+            if label.label_id not in label_ids:
+                label_ids.add(label.label_id)
+                annotatable.append(label)
+        return annotatable
+
 
 class SpanManager(LabelManager):
+    def get_overlapping_spans(self, span, project):
+        """The other spans of the example, or of its user, that overlap the given one.
+
+        On PostgreSQL the offsets are compared as ranges, which the GiST index of the offsets
+        answers in logarithmic time. Elsewhere the lookup is a range scan of the composite
+        index on the example, the user and the offsets.
+        """
+        spans = self.get_labels(span, project).exclude(pk=span.pk)
+        if connections[self.db].vendor == "postgresql":
+            from django.contrib.postgres.fields import IntegerRangeField
+            from psycopg2.extras import NumericRange
+
+            offsets = Func(F("start_offset"), F("end_offset"), function="int4range", output_field=IntegerRangeField())
+            spans = spans.annotate(offsets=offsets)
+            return spans.filter(offsets__overlap=NumericRange(span.start_offset, span.end_offset))
+        return spans.filter(start_offset__lt=span.end_offset, end_offset__gt=span.start_offset)
+
     def can_annotate(self, label, project) -> bool:
         overlapping = getattr(project, "allow_overlapping", False)
-        spans = self.get_labels(label, project)
         if overlapping:
             return True
-        for span in spans:
-            if span.is_overlapping(label):
-                return False
-        return True
+        return not self.get_overlapping_spans(label, project).exists()
+
+    def select_annotatable(self, labels, existing, project) -> list:
+        if getattr(project, "allow_overlapping", False):
+            return labels
+        # the union of the taken ranges, as disjoint intervals sorted by start, hence by end too.
+        starts: List[int] = []
+        ends: List[int] = []
+        for span in sorted(existing, key=lambda span: span.start_offset):
+            if ends and span.start_offset < ends[-1]:
+                ends[-1] = max(ends[-1], span.end_offset)
+            else:
+                starts.append(span.start_offset)
+                ends.append(span.end_offset)
+        annotatable = []
+        for label in labels:
+            # only the last interval starting before the end of the label can overlap it.
+            i = bisect.bisect_left(starts, label.end_offset)
+            if i > 0 and ends[i - 1] > label.start_offset:
+                continue
+            starts.insert(i, label.start_offset)
+            ends.insert(i, label.end_offset)
+            annotatable.append(label)
+        return annotatable
 
 
 class TextLabelManager(LabelManager):
@@ -75,6 +193,15 @@ class TextLabelManager(LabelManager):
                 return False
         return True
 
+    def select_annotatable(self, labels, existing, project) -> list:
+        texts = {text.text for text in existing}
+        annotatable = []
+        for label in labels:
+            if label.text not in texts:
+                texts.add(label.text)
+                annotatable.append(label)
+        return annotatable
+
 
 class RelationManager(LabelManager):
     label_type_field = "type"
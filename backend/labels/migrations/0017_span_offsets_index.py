@@ -0,0 +1,50 @@
+# Generated by Django 4.1.7 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+# btree_gist lets the example and the user join the offset range in the GiST index.
+# Without the privilege to create it, the range is indexed alone.
+CREATE_GIST_INDEX = """
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS btree_gist;
+EXCEPTION WHEN insufficient_privilege THEN
+    RAISE NOTICE 'btree_gist is not available, the span offsets are indexed alone.';
+END $$;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'btree_gist') THEN
+        CREATE INDEX labels_span_offsets_gist ON labels_span
+        USING gist (example_id, user_id, int4range(start_offset, end_offset));
+    ELSE
+        CREATE INDEX labels_span_offsets_gist ON labels_span USING gist (int4range(start_offset, end_offset));
+    END IF;
+END $$;
+"""
+
+
+def create_gist_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_GIST_INDEX)
+
+
+def drop_gist_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS labels_span_offsets_gist")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("labels", "0016_segmentation"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="span",
+            index=models.Index(
+                fields=["example", "user", "start_offset", "end_offset"], name="labels_span_example_972330_idx"
+            ),
+        ),
+        migrations.RunPython(create_gist_index, drop_gist_index),
+    ]
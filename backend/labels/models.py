@@ -52,32 +52,24 @@ class Span(Label):
         return f"({text}, {self.start_offset}, {self.end_offset}, {self.label.text})"
 
     def validate_unique(self, exclude=None):
-        allow_overlapping = getattr(self.example.project, "allow_overlapping", False)
-        is_collaborative = self.example.project.collaborative_annotation
-        if allow_overlapping:
+        project = self.example.project
+        if getattr(project, "allow_overlapping", False):
             super().validate_unique(exclude=exclude)
             return
-
-        overlapping_span = (
-            Span.objects.exclude(id=self.id)
-            .filter(example=self.example)
-            .filter(
-                models.Q(start_offset__gte=self.start_offset, start_offset__lt=self.end_offset)
-                | models.Q(end_offset__gt=self.start_offset, end_offset__lte=self.end_offset)
-                | models.Q(start_offset__lte=self.start_offset, end_offset__gte=self.end_offset)
-            )
-        )
-        if is_collaborative:
-            if overlapping_span.exists():
-                raise ValidationError("This overlapping is not allowed in this project.")
-        else:
-            if overlapping_span.filter(user=self.user).exists():
-                raise ValidationError("This overlapping is not allowed in this project.")
+        if Span.objects.get_overlapping_spans(self, project).exists():
+            raise ValidationError("This overlapping is not allowed in this project.")
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         self.full_clean()
         super().save(force_insert, force_update, using, update_fields)
 
+    def clean(self):
+        if self.start_offset is not None and self.start_offset < 0:
+            raise ValidationError({"start_offset": "The start offset must not be negative."})
+        if self.start_offset is not None and self.end_offset is not None and self.start_offset >= self.end_offset:
+            raise ValidationError({"end_offset": "The end offset must be greater than the start offset."})
+        return super().clean()
+
     def is_overlapping(self, other: "Span"):
         return (
             (other.start_offset <= self.start_offset < other.end_offset)
@@ -91,6 +83,7 @@ class Span(Label):
             models.CheckConstraint(check=models.Q(end_offset__gte=0), name="endOffset >= 0"),
             models.CheckConstraint(check=models.Q(start_offset__lt=models.F("end_offset")), name="start < end"),
         ]
+        indexes = [models.Index(fields=["example", "user", "start_offset", "end_offset"])]
 
 
 class TextLabel(Label):
@@ -124,7 +117,7 @@ class Relation(Label):
         super().save(force_insert, force_update, using, update_fields)
 
     def clean(self):
-        same_example = self.from_id.example == self.to_id.example == self.example
+        same_example = self.from_id.example_id == self.to_id.example_id == self.example_id
         if not same_example:
             raise ValidationError("You need to label the same example.")
         return super().clean()
@@ -139,6 +132,12 @@ class BoundingBox(Label):
     label = models.ForeignKey(to=CategoryType, on_delete=models.CASCADE)
     example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="bboxes")
 
+    def clean(self):
+        negative = [name for name in ("x", "y", "width", "height") if (getattr(self, name) or 0) < 0]
+        if negative:
+            raise ValidationError({name: "The value must not be negative." for name in negative})
+        return super().clean()
+
     class Meta:
         constraints = [
             models.CheckConstraint(check=models.Q(x__gte=0), name="x >= 0"),
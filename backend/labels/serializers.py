@@ -5,9 +5,30 @@ from examples.models import Example
 from label_types.models import CategoryType, RelationType, SpanType
 
 
-class CategorySerializer(serializers.ModelSerializer):
-    label = serializers.PrimaryKeyRelatedField(queryset=CategoryType.objects.all())
-    example = serializers.PrimaryKeyRelatedField(queryset=Example.objects.all())
+class PreloadedRelatedField(serializers.PrimaryKeyRelatedField):
+    """A primary key field taking its objects from the ones loaded beforehand for a batch, if any."""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded")
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return preloaded[self.get_queryset().model][int(data)]
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class LabelSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedRelatedField
+
+
+class CategorySerializer(LabelSerializer):
+    label = PreloadedRelatedField(queryset=CategoryType.objects.all())
+    example = PreloadedRelatedField(queryset=Example.objects.all())
 
     class Meta:
         model = Category
@@ -23,9 +44,9 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class SpanSerializer(serializers.ModelSerializer):
-    label = serializers.PrimaryKeyRelatedField(queryset=SpanType.objects.all())
-    example = serializers.PrimaryKeyRelatedField(queryset=Example.objects.all())
+class SpanSerializer(LabelSerializer):
+    label = PreloadedRelatedField(queryset=SpanType.objects.all())
+    example = PreloadedRelatedField(queryset=Example.objects.all())
 
     class Meta:
         model = Span
@@ -43,8 +64,8 @@ class SpanSerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class TextLabelSerializer(serializers.ModelSerializer):
-    example = serializers.PrimaryKeyRelatedField(queryset=Example.objects.all())
+class TextLabelSerializer(LabelSerializer):
+    example = PreloadedRelatedField(queryset=Example.objects.all())
 
     class Meta:
         model = TextLabel
@@ -60,9 +81,9 @@ class TextLabelSerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class RelationSerializer(serializers.ModelSerializer):
-    example = serializers.PrimaryKeyRelatedField(queryset=Example.objects.all())
-    type = serializers.PrimaryKeyRelatedField(queryset=RelationType.objects.all())
+class RelationSerializer(LabelSerializer):
+    example = PreloadedRelatedField(queryset=Example.objects.all())
+    type = PreloadedRelatedField(queryset=RelationType.objects.all())
 
     class Meta:
         model = Relation
@@ -70,9 +91,9 @@ class RelationSerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class BoundingBoxSerializer(serializers.ModelSerializer):
-    example = serializers.PrimaryKeyRelatedField(queryset=Example.objects.all())
-    label = serializers.PrimaryKeyRelatedField(queryset=CategoryType.objects.all())
+class BoundingBoxSerializer(LabelSerializer):
+    example = PreloadedRelatedField(queryset=Example.objects.all())
+    label = PreloadedRelatedField(queryset=CategoryType.objects.all())
 
     class Meta:
         model = BoundingBox
@@ -93,9 +114,9 @@ class BoundingBoxSerializer(serializers.ModelSerializer):
         read_only_fields = ("user",)
 
 
-class SegmentationSerializer(serializers.ModelSerializer):
-    example = serializers.PrimaryKeyRelatedField(queryset=Example.objects.all())
-    label = serializers.PrimaryKeyRelatedField(queryset=CategoryType.objects.all())
+class SegmentationSerializer(LabelSerializer):
+    example = PreloadedRelatedField(queryset=Example.objects.all())
+    label = PreloadedRelatedField(queryset=CategoryType.objects.all())
 
     class Meta:
         model = Segmentation
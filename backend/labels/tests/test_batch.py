@@ -0,0 +1,196 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from examples.models import Example
+from labels.models import Category, Relation, Span, TextLabel
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+from users.tests.utils import make_user
+
+
+class TestLabelBatch(APITestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING, allow_overlapping=False)
+        self.user = self.project.admin
+        self.examples = mommy.make("Example", project=self.project.item, text="example text", _quantity=2)
+        self.span_type = mommy.make("SpanType", project=self.project.item)
+        self.relation_type = mommy.make("RelationType", project=self.project.item)
+        self.span = mommy.make(
+            "Span", example=self.examples[0], label=self.span_type, user=self.user, start_offset=0, end_offset=7
+        )
+        self.url = reverse(viewname="label_batch", args=[self.project.item.id])
+        self.client.force_login(self.user)
+
+    def span_data(self, example, start_offset, end_offset):
+        return {
+            "example": example.id,
+            "label": self.span_type.id,
+            "start_offset": start_offset,
+            "end_offset": end_offset,
+        }
+
+    def post(self, operations, expected=status.HTTP_200_OK):
+        response = self.client.post(self.url, {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, expected, response.data)
+        return response
+
+    def test_applies_operations_on_many_examples(self):
+        updated_at = {example.id: example.updated_at for example in Example.objects.all()}
+        operations = [
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[0], 8, 12)},
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[1], 0, 7)},
+            {"op": "update", "type": "span", "id": self.span.id, "data": {"end_offset": 6}},
+            {"op": "create", "type": "textlabel", "data": {"example": self.examples[1].id, "text": "foo"}},
+        ]
+        response = self.post(operations)
+        results = response.data["operations"]
+        self.assertEqual([result["op"] for result in results], ["create", "create", "update", "create"])
+        self.assertEqual(results[0]["data"]["start_offset"], 8)
+        self.assertEqual(results[2]["data"]["end_offset"], 6)
+        self.assertEqual(Span.objects.count(), 3)
+        self.assertEqual(Span.objects.get(id=self.span.id).end_offset, 6)
+        self.assertEqual(TextLabel.objects.get().user, self.user)
+        for example in Example.objects.all():
+            self.assertGreater(example.updated_at, updated_at[example.id])
+
+    def test_deletes_labels_before_creating_others(self):
+        operations = [
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[0], 3, 9)},
+            {"op": "delete", "type": "span", "id": self.span.id},
+        ]
+        response = self.post(operations)
+        self.assertEqual(response.data["operations"][1], {"op": "delete", "type": "span", "id": self.span.id})
+        self.assertQuerysetEqual(Span.objects.values_list("start_offset", flat=True), [3])
+
+    def test_creates_relations_between_spans(self):
+        other = mommy.make(
+            "Span", example=self.examples[0], label=self.span_type, user=self.user, start_offset=8, end_offset=12
+        )
+        data = {
+            "example": self.examples[0].id,
+            "from_id": self.span.id,
+            "to_id": other.id,
+            "type": self.relation_type.id,
+        }
+        self.post([{"op": "create", "type": "relation", "data": data}])
+        self.assertEqual(Relation.objects.get().to_id, other)
+
+    def test_rejects_relation_across_examples(self):
+        other = mommy.make(
+            "Span", example=self.examples[1], label=self.span_type, user=self.user, start_offset=8, end_offset=12
+        )
+        data = {
+            "example": self.examples[0].id,
+            "from_id": self.span.id,
+            "to_id": other.id,
+            "type": self.relation_type.id,
+        }
+        self.post([{"op": "create", "type": "relation", "data": data}], status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_whole_batch_on_conflict(self):
+        operations = [
+            {"op": "delete", "type": "span", "id": self.span.id},
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[1], 0, 5)},
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[1], 3, 9)},
+        ]
+        response = self.post(operations, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["operations"]
+        self.assertEqual([bool(error) for error in errors], [False, False, True])
+        self.assertQuerysetEqual(Span.objects.all(), [self.span])
+
+    def test_rejects_invalid_offsets(self):
+        operations = [
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[1], -1, 3)},
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[1], 5, 5)},
+            {"op": "update", "type": "span", "id": self.span.id, "data": {"end_offset": 0}},
+        ]
+        response = self.post(operations, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["operations"]
+        self.assertEqual([list(error) for error in errors], [["start_offset"], ["end_offset"], ["end_offset"]])
+        self.assertQuerysetEqual(Span.objects.values_list("end_offset", flat=True), [7])
+
+    def test_rejects_objects_of_another_project(self):
+        span_type = mommy.make("SpanType")
+        data = {**self.span_data(self.examples[0], 8, 12), "label": span_type.id}
+        response = self.post([{"op": "create", "type": "span", "data": data}], status.HTTP_400_BAD_REQUEST)
+        self.assertIn("label", response.data["operations"][0])
+        self.assertEqual(Span.objects.count(), 1)
+
+    def test_rejects_unknown_labels(self):
+        response = self.post([{"op": "delete", "type": "span", "id": 0}], status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", response.data["operations"][0])
+
+    def test_rejects_moving_label_to_another_example(self):
+        operation = {"op": "update", "type": "span", "id": self.span.id, "data": {"example": self.examples[1].id}}
+        self.post([operation], status.HTTP_400_BAD_REQUEST)
+
+    def test_denies_changing_labels_of_others(self):
+        self.client.force_login(self.project.annotator)
+        operations = [
+            {"op": "create", "type": "span", "data": self.span_data(self.examples[0], 0, 7)},
+            {"op": "delete", "type": "span", "id": self.span.id},
+        ]
+        response = self.post(operations, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", response.data["operations"][1])
+        self.assertQuerysetEqual(Span.objects.all(), [self.span])
+
+    def test_denies_non_member(self):
+        self.client.force_login(make_user())
+        self.post([{"op": "delete", "type": "span", "id": self.span.id}], status.HTTP_403_FORBIDDEN)
+
+    @override_settings(LABEL_BATCH_MAX_SIZE=1)
+    def test_limits_batch_size(self):
+        operations = [{"op": "delete", "type": "span", "id": self.span.id}] * 2
+        self.post(operations, status.HTTP_400_BAD_REQUEST)
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        def count_queries(example, n):
+            operations = [
+                {"op": "create", "type": "span", "data": self.span_data(example, 20 + i * 2, 21 + i * 2)}
+                for i in range(n)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                self.post(operations)
+            return len(context)
+
+        self.assertEqual(count_queries(self.examples[0], 2), count_queries(self.examples[1], 6))
+
+
+class TestCategoryBatch(APITestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, single_class_classification=True)
+        self.example = mommy.make("Example", project=self.project.item)
+        self.category_types = mommy.make("CategoryType", project=self.project.item, _quantity=2)
+        self.user = self.project.admin
+        self.category = mommy.make("Category", example=self.example, label=self.category_types[0], user=self.user)
+        self.url = reverse(viewname="label_batch", args=[self.project.item.id])
+        self.client.force_login(self.user)
+
+    def test_replaces_category_of_exclusive_project(self):
+        data = {"example": self.example.id, "label": self.category_types[1].id}
+        response = self.client.post(
+            self.url, {"operations": [{"op": "create", "type": "category", "data": data}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertQuerysetEqual(Category.objects.values_list("label", flat=True), [self.category_types[1].id])
+
+    @patch("examples.celery_tasks.refresh_agreements.delay")
+    @patch("projects.report_cache.bump_annotation_version")
+    def test_invalidates_reports_and_agreements_once(self, bump_annotation_version, refresh_agreements):
+        other = mommy.make("Example", project=self.project.item)
+        operations = [
+            {"op": "create", "type": "category", "data": {"example": example.id, "label": self.category_types[1].id}}
+            for example in [self.example, other]
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bump_annotation_version.assert_called_once_with(self.project.item.id)
+        refresh_agreements.assert_called_once_with(self.project.item.id, sorted([self.example.id, other.id]))
@@ -95,3 +95,31 @@ class TestCategory(TestCase):
         a = mommy.make("Category")
         with self.assertRaises(IntegrityError):
             Category(example=a.example, user=a.user, label=a.label).save()
+
+
+class TestFilterAnnotatableCategories(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION, single_class_classification=False)
+        self.examples = mommy.make("Example", project=self.project.item, _quantity=2)
+        self.label_types = mommy.make("CategoryType", project=self.project.item, _quantity=2)
+        self.user = self.project.admin
+
+    def make_categories(self):
+        mommy.make("Category", example=self.examples[0], label=self.label_types[0], user=self.user)
+        return [
+            Category(example=example, label=label_type, user=self.user)
+            for example in self.examples
+            for label_type in [*self.label_types, self.label_types[0]]
+        ]
+
+    def test_checks_categories_against_stored_and_kept_ones(self):
+        categories = self.make_categories()
+        with self.assertNumQueries(1):
+            annotatable = Category.objects.filter_annotatable_labels(categories, self.project.item)
+        self.assertEqual(annotatable, [categories[1], categories[3], categories[4]])
+
+    def test_keeps_one_category_per_example_if_exclusive(self):
+        self.project.item.single_class_classification = True
+        categories = self.make_categories()
+        annotatable = Category.objects.filter_annotatable_labels(categories, self.project.item)
+        self.assertEqual(annotatable, [categories[3]])
@@ -224,3 +224,83 @@ class TestLabelDistribution(TestCase):
         expected[self.user.username][label_a.text] = 1
         expected[self.user.username][label_b.text] = 1
         self.assertEqual(distribution, expected)
+
+
+class TestFilterAnnotatableSpans(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING, allow_overlapping=False)
+        self.examples = mommy.make("Example", project=self.project.item, _quantity=2)
+        self.label_type = mommy.make("SpanType", project=self.project.item)
+        self.user = self.project.admin
+
+    def make_span(self, example, start_offset, end_offset, user=None):
+        return Span(
+            example=example,
+            label=self.label_type,
+            user=user or self.user,
+            start_offset=start_offset,
+            end_offset=end_offset,
+        )
+
+    def test_checks_spans_against_stored_and_kept_ones(self):
+        self.make_span(self.examples[0], 5, 10).save()
+        self.make_span(self.examples[0], 12, 20).save()
+        spans = [
+            self.make_span(self.examples[0], 0, 5),
+            self.make_span(self.examples[0], 9, 11),
+            self.make_span(self.examples[0], 10, 12),
+            self.make_span(self.examples[0], 11, 13),
+            self.make_span(self.examples[0], 25, 30),
+            self.make_span(self.examples[0], 20, 26),
+            self.make_span(self.examples[1], 0, 5),
+            self.make_span(self.examples[1], 3, 8),
+        ]
+        with self.assertNumQueries(1):
+            annotatable = Span.objects.filter_annotatable_labels(spans, self.project.item)
+        self.assertEqual(annotatable, [spans[0], spans[2], spans[4], spans[6]])
+
+    def test_ignores_spans_of_another_user(self):
+        self.make_span(self.examples[0], 0, 5, user=self.project.approver).save()
+        span = self.make_span(self.examples[0], 0, 5)
+        self.assertEqual(Span.objects.filter_annotatable_labels([span], self.project.item), [span])
+
+    def test_agrees_with_overlap_of_spans(self):
+        stored = [self.make_span(self.examples[0], start, start + 3) for start in range(0, 40, 7)]
+        Span.objects.bulk_create(stored)
+        spans = [self.make_span(self.examples[0], start, start + size) for start in range(40) for size in (1, 4, 9)]
+        annotatable = Span.objects.filter_annotatable_labels(spans, self.project.item)
+        kept = list(stored)
+        expected = []
+        for span in spans:
+            if not any(span.is_overlapping(other) for other in kept):
+                kept.append(span)
+                expected.append(span)
+        self.assertEqual(annotatable, expected)
+
+
+class TestOverlappingSpans(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING, allow_overlapping=False)
+        self.example = mommy.make("Example", project=self.project.item)
+        self.user = self.project.admin
+        self.spans = [
+            mommy.make("Span", example=self.example, start_offset=start, end_offset=start + 5, user=self.user)
+            for start in range(0, 50, 5)
+        ]
+
+    def test_finds_overlapping_spans(self):
+        span = Span(example=self.example, user=self.user, start_offset=12, end_offset=21)
+        overlapping = Span.objects.get_overlapping_spans(span, self.project.item)
+        self.assertQuerysetEqual(overlapping.order_by("start_offset"), self.spans[2:5])
+
+    def test_excludes_the_span_itself(self):
+        span = self.spans[3]
+        span.end_offset = 22
+        overlapping = Span.objects.get_overlapping_spans(span, self.project.item)
+        self.assertQuerysetEqual(overlapping, [self.spans[4]])
+        span.end_offset = 20
+        span.save()
+
+    def test_ignores_spans_of_other_users(self):
+        span = Span(example=self.example, user=self.project.approver, start_offset=0, end_offset=50)
+        self.assertFalse(Span.objects.get_overlapping_spans(span, self.project.item).exists())
@@ -61,3 +61,14 @@ class TestCollaborativeTextLabeling(TestTextLabeling):
         mommy.make("TextLabel", example=self.example, user=self.another_user)
         can_annotate = TextLabel.objects.can_annotate(self.text_label, self.project.item)
         self.assertTrue(can_annotate)
+
+
+class TestFilterAnnotatableTextLabels(TestCase):
+    def test_checks_texts_against_stored_and_kept_ones(self):
+        project = prepare_project(ProjectType.SEQ2SEQ)
+        example = mommy.make("Example", project=project.item)
+        mommy.make("TextLabel", example=example, user=project.admin, text="foo")
+        texts = [TextLabel(example=example, user=project.admin, text=text) for text in ["foo", "bar", "bar", "baz"]]
+        with self.assertNumQueries(1):
+            annotatable = TextLabel.objects.filter_annotatable_labels(texts, project.item)
+        self.assertEqual(annotatable, [texts[1], texts[3]])
@@ -5,6 +5,7 @@ from .views import (
     BoundingBoxListAPI,
     CategoryDetailAPI,
     CategoryListAPI,
+    LabelBatchAPI,
     RelationDetail,
     RelationList,
     SegmentationDetailAPI,
@@ -16,6 +17,7 @@ from .views import (
 )
 
 urlpatterns = [
+    path(route="labels/batch", view=LabelBatchAPI.as_view(), name="label_batch"),
     path(route="examples/<int:example_id>/relations", view=RelationList.as_view(), name="relation_list"),
     path(
         route="examples/<int:example_id>/relations/<int:annotation_id>",
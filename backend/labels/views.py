@@ -1,12 +1,16 @@
 from functools import partial
 from typing import Type
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError as APIValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .batch import LabelBatch
 from .permissions import CanEditLabel
 from .serializers import (
     BoundingBoxSerializer,
@@ -141,3 +145,24 @@ class SegmentationListAPI(BaseListAPI):
 class SegmentationDetailAPI(BaseDetailAPI):
     queryset = Segmentation.objects.all()
     serializer_class = SegmentationSerializer
+
+
+class LabelBatchAPI(APIView):
+    """Applies a batch of label creations, updates and deletes on the examples of a project at once."""
+
+    permission_classes = [IsAuthenticated & IsProjectMember]
+    swagger_schema = None
+
+    def post(self, request, *args, **kwargs):
+        project = get_object_or_404(Project, pk=self.kwargs["project_id"])
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            raise APIValidationError({"operations": ["A non-empty list of operations is required."]})
+        if len(operations) > settings.LABEL_BATCH_MAX_SIZE:
+            raise APIValidationError(
+                {"operations": [f"A batch has at most {settings.LABEL_BATCH_MAX_SIZE} operations."]}
+            )
+        batch = LabelBatch(project, request.user, operations)
+        if not batch.is_valid():
+            raise APIValidationError({"operations": batch.errors})
+        return Response({"operations": batch.apply()}, status=status.HTTP_200_OK)
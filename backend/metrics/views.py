@@ -11,6 +11,7 @@ from label_types.models import CategoryType, LabelType, RelationType, SpanType
 from labels.models import Category, Label, Relation, Span
 from projects.models import Member, Project
 from projects.permissions import IsProjectAdmin, IsProjectStaffAndReadOnly
+from projects.report_cache import cached_response
 
 
 class ProgressAPI(APIView):
@@ -44,11 +45,15 @@ class LabelDistribution(abc.ABC, APIView):
     label_type = LabelType
 
     def get(self, request, *args, **kwargs):
-        labels = self.label_type.objects.filter(project=self.kwargs["project_id"])
-        examples = Example.objects.filter(project=self.kwargs["project_id"]).values("id")
-        members = Member.objects.filter(project=self.kwargs["project_id"])
-        data = self.model.objects.calc_label_distribution(examples, members, labels)
-        return Response(data=data, status=status.HTTP_200_OK)
+        project_id = self.kwargs["project_id"]
+        return cached_response(project_id, self.__class__.__name__, request.query_params, lambda: self.calc(project_id))
+
+    @classmethod
+    def calc(cls, project_id):
+        labels = cls.label_type.objects.filter(project=project_id)
+        examples = Example.objects.filter(project=project_id).values("id")
+        members = Member.objects.filter(project=project_id)
+        return cls.model.objects.calc_label_distribution(examples, members, labels)
 
 
 class CategoryTypeDistribution(LabelDistribution):
@@ -0,0 +1,43 @@
+import functools
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.http import QueryDict
+
+from .models import Project
+from .report_cache import get_or_compute
+
+logger = get_task_logger(__name__)
+
+
+def default_reports(project: Project):
+    """The report variants opened without any query parameter, keyed by cache name."""
+    from examples.views.disagreement import AutoDisagreementAnalysis
+    from metrics.views import (
+        CategoryTypeDistribution,
+        RelationTypeDistribution,
+        SpanTypeDistribution,
+    )
+    from projects.views.reporting import ReportingView
+
+    params = QueryDict()
+    reports = {
+        "reporting": lambda: ReportingView.build_report(project, params),
+        "auto_disagreement_analysis": lambda: AutoDisagreementAnalysis.analyze(project, params),
+    }
+    for view in [CategoryTypeDistribution, SpanTypeDistribution, RelationTypeDistribution]:
+        reports[view.__name__] = functools.partial(view.calc, project.id)
+    return params, reports
+
+
+@shared_task
+def refresh_reports(project_id):
+    try:
+        project = Project.objects.get(pk=project_id)
+    except Project.DoesNotExist:
+        return
+    params, reports = default_reports(project)
+    for name, compute in reports.items():
+        # The snapshot is only computed if the current version is not cached yet.
+        get_or_compute(project.id, name, params, compute, max_staleness=0)
+    logger.info(f"Refreshed reports of project {project_id}")
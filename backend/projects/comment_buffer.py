@@ -0,0 +1,250 @@
+"""Write buffer of the realtime discussion comments.
+
+The mutations a process receives for a discussion group are collected over a short window,
+then applied with one bulk insert, one bulk update and one delete, and broadcast to the
+group as a single batch. Creations carry the temporary id the client gave the comment,
+so that clients can swap their optimistic copy for the stored one.
+"""
+import asyncio
+import contextlib
+import dataclasses
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Discussion, DiscussionComment, Member
+from .serializers import DiscussionCommentSerializer
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Mutation:
+    action: str
+    member: Member
+    channel_name: str
+    id: Optional[int] = None
+    temp_id: Optional[int] = None
+    text: Optional[str] = None
+
+
+# a comment the client does not know the id of yet, by its author and temporary id.
+TempKey = Tuple[int, Optional[int]]
+
+
+class Window:
+    """The mutations of a window, coalesced by comment.
+
+    The comments are referenced by id, or by the temporary id of their author while the
+    client does not know their id yet, so a temporary id can only be used once per author.
+    The events follow the order of the mutations, each comment taking the place of its
+    creation, or else of its last change.
+    """
+
+    def __init__(self, existing: Dict[int, DiscussionComment]):
+        self.existing = existing
+        self.by_temp_id: Dict[TempKey, DiscussionComment] = {
+            (c.member_id, c.temp_id): c for c in existing.values() if c.temp_id is not None
+        }
+        self.created: Dict[TempKey, DiscussionComment] = {}
+        self.creations: Dict[int, Mutation] = {}
+        self.updated: Dict[int, DiscussionComment] = {}
+        self.deleted: Dict[int, DiscussionComment] = {}
+        # the event of each comment, by the identity of the comment, in the order of the mutations.
+        self.slots: Dict[int, Tuple[str, DiscussionComment]] = {}
+        self.errors: List[Tuple[Mutation, str]] = []
+
+    def add(self, mutation: Mutation):
+        if mutation.action == CREATE:
+            self.create(mutation)
+            return
+        comment = self.find(mutation)
+        if comment is None or comment.id in self.deleted:
+            self.errors.append((mutation, "The comment does not exist."))
+        elif comment.member_id != mutation.member.id:
+            self.errors.append((mutation, "You can only change your own comments."))
+        elif mutation.action == UPDATE:
+            self.update(comment, mutation.text)
+        else:
+            self.delete(comment)
+
+    def create(self, mutation: Mutation):
+        key = (mutation.member.id, mutation.temp_id)
+        if key in self.created or key in self.by_temp_id:
+            self.errors.append((mutation, "The temporary id is already used."))
+            return
+        comment = DiscussionComment(
+            member=mutation.member, text=mutation.text, temp_id=mutation.temp_id, is_synced=True
+        )
+        self.created[key] = comment
+        self.creations[id(comment)] = mutation
+        self.slots[id(comment)] = (CREATE, comment)
+
+    def find(self, mutation: Mutation) -> Optional[DiscussionComment]:
+        if mutation.id is not None:
+            return self.existing.get(mutation.id)
+        key = (mutation.member.id, mutation.temp_id)
+        return self.created.get(key) or self.by_temp_id.get(key)
+
+    def update(self, comment: DiscussionComment, text: Optional[str]):
+        comment.text = text
+        if comment.id is not None:
+            self.updated[comment.id] = comment
+            self.move(UPDATE, comment)
+
+    def delete(self, comment: DiscussionComment):
+        if comment.id is None:
+            del self.created[(comment.member_id, comment.temp_id)]
+        else:
+            self.updated.pop(comment.id, None)
+            self.deleted[comment.id] = comment
+        self.move(DELETE, comment)
+
+    def move(self, action: str, comment: DiscussionComment):
+        self.slots.pop(id(comment), None)
+        self.slots[id(comment)] = (action, comment)
+
+    def reject_creations(self, message: str):
+        for comment in self.created.values():
+            self.errors.append((self.creations[id(comment)], message))
+            del self.slots[id(comment)]
+        self.created = {}
+
+    def save(self, discussion: Optional[Discussion]):
+        """Store the coalesced changes, with a query per kind of change."""
+        if self.created:
+            for comment in self.created.values():
+                comment.discussion = discussion
+            comments = DiscussionComment.objects.bulk_create(self.created.values())
+            if any(comment.pk is None for comment in comments):
+                # the database cannot return the ids of a bulk insert.
+                stored = DiscussionComment.objects.filter(
+                    discussion=discussion, temp_id__in=[comment.temp_id for comment in comments]
+                ).order_by("id")
+                pks = {(comment.member_id, comment.temp_id): comment.pk for comment in stored}
+                for comment in comments:
+                    comment.pk = pks.get((comment.member_id, comment.temp_id))
+        if self.updated:
+            now = timezone.now()
+            for comment in self.updated.values():
+                comment.updated_at = now
+            DiscussionComment.objects.bulk_update(self.updated.values(), ["text", "updated_at"])
+        if self.deleted:
+            DiscussionComment.objects.filter(id__in=self.deleted).delete()
+
+    def events(self) -> List[dict]:
+        events = []
+        for action, comment in self.slots.values():
+            if action == DELETE:
+                # a comment dropped within the window has no id, the clients know it by its temporary id.
+                data = {"id": comment.id, "temp_id": comment.temp_id}
+            else:
+                data = DiscussionCommentSerializer(comment).data
+            # plain types only, for the channel layer.
+            events.append({"action": action, "data": dict(data)})
+        return events
+
+
+def load_comments(project_id: int, mutations: List[Mutation]) -> Dict[int, DiscussionComment]:
+    """Load the stored comments the mutations refer to, by id or by temporary id."""
+    ids = {m.id for m in mutations if m.action != CREATE and m.id is not None}
+    temp_ids = {m.temp_id for m in mutations if m.id is None and m.temp_id is not None}
+    if not ids and not temp_ids:
+        return {}
+    queryset = DiscussionComment.objects.filter(discussion__project_id=project_id)
+    queryset = queryset.filter(Q(id__in=ids) | Q(temp_id__in=temp_ids)).select_related("member__user")
+    return {comment.id: comment for comment in queryset}
+
+
+def apply_mutations(project_id: int, mutations: List[Mutation]) -> Tuple[List[dict], List[Tuple[Mutation, str]]]:
+    """Apply the mutations of a window in order, coalescing the ones on the same comment.
+
+    A comment created and changed within the window is inserted once with its last text,
+    and a comment created and deleted within the window is not inserted at all.
+
+    Args:
+        project_id: The project of the discussion.
+        mutations: The mutations, in the order they were received.
+
+    Returns:
+        The events to broadcast, and the rejected mutations with the reason.
+    """
+    window = Window(load_comments(project_id, mutations))
+    for mutation in mutations:
+        window.add(mutation)
+    discussion = None
+    if window.created:
+        discussion = Discussion.objects.filter(project_id=project_id, is_active=True).first()
+        if discussion is None:
+            window.reject_creations("There is no active discussion.")
+    with transaction.atomic():
+        window.save(discussion)
+    return window.events(), window.errors
+
+
+class CommentBuffer:
+    """Collects the comment mutations of a group and flushes them once per window."""
+
+    def __init__(self, group: str, project_id: int, channel_layer):
+        self.group = group
+        self.project_id = project_id
+        self.channel_layer = channel_layer
+        self.pending: List[Mutation] = []
+        self.flushing: Optional[asyncio.Task] = None
+        self.full = asyncio.Event()
+
+    def add(self, mutation: Mutation):
+        self.pending.append(mutation)
+        if len(self.pending) >= settings.DISCUSSION_BUFFER_MAX_SIZE:
+            self.full.set()
+        if self.flushing is None:
+            self.flushing = asyncio.get_running_loop().create_task(self.flush_later())
+
+    async def flush_later(self):
+        # the window ends after the interval, or as soon as the buffer is full.
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.full.wait(), settings.DISCUSSION_BUFFER_INTERVAL)
+        self.full.clear()
+        try:
+            await self.flush()
+        finally:
+            self.flushing = None
+            if self.pending:
+                self.flushing = asyncio.get_running_loop().create_task(self.flush_later())
+            else:
+                buffers.pop(self.group, None)
+
+    async def flush(self):
+        mutations, self.pending = self.pending, []
+        if not mutations:
+            return
+        try:
+            events, errors = await database_sync_to_async(apply_mutations)(self.project_id, mutations)
+        except Exception:
+            # the window is lost, the clients have to know their changes are not stored.
+            logger.exception("Failed to apply the comments of project %s", self.project_id)
+            events, errors = [], [(mutation, "The change could not be saved.") for mutation in mutations]
+        for mutation, message in errors:
+            await self.channel_layer.send(
+                mutation.channel_name, {"type": "send_error", "error": message, "temp_id": mutation.temp_id}
+            )
+        if events:
+            await self.channel_layer.group_send(self.group, {"type": "send_batch", "events": events})
+
+
+buffers: Dict[str, CommentBuffer] = {}
+
+
+def get_buffer(group: str, project_id: int, channel_layer) -> CommentBuffer:
+    if group not in buffers:
+        buffers[group] = CommentBuffer(group, project_id, channel_layer)
+    return buffers[group]
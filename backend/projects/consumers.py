@@ -1,91 +1,121 @@
-from channels.generic.websocket import AsyncJsonWebsocketConsumer
+import time
+from typing import Optional
+
 from channels.db import database_sync_to_async
-from django.contrib.auth.models import AnonymousUser
-from .models import DiscussionComment, Member
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .comment_buffer import CREATE, DELETE, UPDATE, Mutation, get_buffer
+from .events import group_name
+from .models import Member
+
+
+class ProjectMemberConsumer(AsyncJsonWebsocketConsumer):
+    """Websocket of a member, joined to a group of the project.
+
+    The member is resolved once, when the connection is opened, and the connection is
+    refused to anyone else.
+    """
+
+    member: Optional[Member] = None
+
+    def get_group_name(self) -> str:
+        raise NotImplementedError()
 
-class DiscussionConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
-        self.project_id = self.scope['url_route']['kwargs']['project_id']
-        self.user = self.scope['user']
-        self.comment_group = f'comments_{self.project_id}'
-        
-        if await self.verify_membership():
-            await self.accept()
-            await self.channel_layer.group_add(
-                self.comment_group,
-                self.channel_name
-            )
-        else:
+        self.project_id = self.scope["url_route"]["kwargs"]["project_id"]
+        self.group_name = self.get_group_name()
+        self.member = await self.get_member()
+        if self.member is None:
             await self.close()
+            return
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.member is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     @database_sync_to_async
-    def verify_membership(self):
-        if isinstance(self.user, AnonymousUser):
-            return False
-        return Member.objects.filter(
-            project_id=self.project_id,
-            user=self.user
-        ).exists()
-
-    async def receive_json(self, content):
-        action = content.get('action')
+    def get_member(self) -> Optional[Member]:
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            return None
+        members = Member.objects.select_related("user", "project")
+        return members.filter(project_id=self.project_id, user=user).first()
+
+
+class DiscussionConsumer(ProjectMemberConsumer):
+    """Realtime comments of the active discussion of a project.
+
+    Every message is checked against the member of the connection. The changes go through
+    the write buffer of the project group, which stores them in bulk and broadcasts them
+    as one batch per window.
+    """
+
+    def get_group_name(self) -> str:
+        return f"comments_{self.project_id}"
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get("action")
+        if action not in (CREATE, UPDATE, DELETE):
+            await self.send_json({"error": f"Unknown action: {action}"})
+            return
+        # the client sends the comment in "data", older ones next to the action.
+        data = content.get("data", content)
+        if not isinstance(data, dict):
+            data = {}
         try:
-            if action == 'create':
-                await self.handle_create(content)
-            elif action == 'update':
-                await self.handle_update(content)
-            elif action == 'delete':
-                await self.handle_delete(content)
-        except Exception as e:
-            await self.send_json({'error': str(e)})
-
-    async def handle_create(self, content):
-        comment = await self.create_comment(content)
-        await self.broadcast('create', comment)
-
-    async def handle_update(self, content):
-        comment = await self.update_comment(content)
-        await self.broadcast('update', comment)
-
-    async def handle_delete(self, content):
-        comment_id = await self.delete_comment(content)
-        await self.broadcast('delete', {'id': comment_id})
+            mutation = self.parse_mutation(action, data)
+        except (KeyError, TypeError, ValueError) as e:
+            await self.send_json({"error": f"Invalid message: {e}", "temp_id": data.get("temp_id")})
+            return
+        get_buffer(self.group_name, self.project_id, self.channel_layer).add(mutation)
 
-    @database_sync_to_async
-    def create_comment(self, data):
-        return DiscussionComment.objects.create(
-            discussion_id=data['discussion_id'],
-            member_id=data['member_id'],
-            text=data['text'],
-            temp_id=data.get('temp_id')
+    def parse_mutation(self, action: str, data: dict) -> Mutation:
+        comment_id = data.get("id")
+        temp_id = data.get("temp_id")
+        if action == CREATE:
+            # a temporary id identifies the comment until the client knows its id.
+            temp_id = temp_id or time.time_ns() // 1000
+        elif comment_id is None and temp_id is None:
+            raise KeyError("id")
+        text = str(data["text"]) if action != DELETE else None
+        # the messages are only received once the member is resolved.
+        assert self.member is not None
+        return Mutation(
+            action=action,
+            member=self.member,
+            channel_name=self.channel_name,
+            id=None if comment_id is None else int(comment_id),
+            temp_id=None if temp_id is None else int(temp_id),
+            text=text,
         )
 
-    @database_sync_to_async
-    def update_comment(self, data):
-        comment = DiscussionComment.objects.get(id=data['id'])
-        comment.text = data['text']
-        comment.save()
-        return comment
+    async def send_batch(self, event):
+        await self.send_json({"action": "batch", "data": event["events"]})
 
-    @database_sync_to_async
-    def delete_comment(self, data):
-        comment = DiscussionComment.objects.get(id=data['id'])
-        comment_id = comment.id
-        comment.delete()
-        return comment_id
-
-    async def broadcast(self, action, data):
-        await self.channel_layer.group_send(
-            self.comment_group,
-            {
-                'type': 'send_message',
-                'action': action,
-                'data': data
-            }
-        )
+    async def send_error(self, event):
+        await self.send_json({"error": event["error"], "temp_id": event["temp_id"]})
+
+
+class ProjectEventConsumer(ProjectMemberConsumer):
+    """Pushes the label, confirmation and assignment deltas of a project to its members.
+
+    Without collaborative annotation, the members only get the deltas of their own labels,
+    as the label endpoints show them nothing else.
+    """
+
+    def get_group_name(self) -> str:
+        return group_name(self.project_id)
+
+    def is_visible(self, delta: dict) -> bool:
+        # the events are only sent to the group once the member is resolved.
+        assert self.member is not None
+        if delta["type"] != "label" or self.member.project.collaborative_annotation:
+            return True
+        return delta["user"] == self.member.user_id
 
-    async def send_message(self, event):
-        await self.send_json({
-            'action': event['action'],
-            'data': event['data']
-        })
\ No newline at end of file
+    async def send_events(self, event):
+        events = [delta for delta in event["events"] if self.is_visible(delta)]
+        if events:
+            await self.send_json({"action": "events", "data": events})
@@ -0,0 +1,87 @@
+"""Realtime event stream of a project.
+
+Changes of labels, confirmations and assignments are published as compact deltas to the
+channel layer group of the project, from which `ProjectEventConsumer` pushes them to the
+members. The deltas of a transaction are sent together once it commits, so a rolled back
+change, even in a savepoint, is never published and a bulk delete is a single message.
+"""
+import functools
+import logging
+from typing import List, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db.models import Model, QuerySet
+
+from .models import Project
+from .transactions import on_commit_batch
+from examples.models import Example
+
+logger = logging.getLogger(__name__)
+
+# The fields of each label kind sent in its deltas, besides the id, example and user.
+LABEL_FIELDS = {
+    "category": ["label"],
+    "span": ["label", "start_offset", "end_offset"],
+    "relation": ["from_id", "to_id", "type"],
+    "textlabel": ["text"],
+    "boundingbox": ["label", "x", "y", "width", "height"],
+    "segmentation": ["label", "points"],
+}
+
+
+def group_name(project_id: int) -> str:
+    return f"project_{project_id}_events"
+
+
+def send_events(project_id: int, events: List[dict]):
+    # a batch too large to apply delta by delta tells the clients to reload instead.
+    if len(events) > settings.PROJECT_EVENTS_MAX_BATCH:
+        events = [{"type": "resync"}]
+    try:
+        async_to_sync(get_channel_layer().group_send)(group_name(project_id), {"type": "send_events", "events": events})
+    except Exception:
+        # the change is committed, only the push is lost.
+        logger.exception("Failed to publish the events of project %s", project_id)
+
+
+def publish(project_id: int, event: dict):
+    """Send an event to the members of a project once the current transaction commits."""
+    on_commit_batch(("events", project_id), event, functools.partial(send_events, project_id))
+
+
+def make_delta(instance: Model, op: str) -> Optional[dict]:
+    """Build the delta of a change, or None for the models without one."""
+    name = instance._meta.model_name
+    if name in LABEL_FIELDS:
+        delta = {"type": "label", "kind": name, "op": op, "id": instance.pk}
+        delta.update(example=instance.example_id, user=instance.user_id)
+        if op != "delete":
+            fields = [instance._meta.get_field(field) for field in LABEL_FIELDS[name]]
+            delta.update((field.name, getattr(instance, field.attname)) for field in fields)
+        return delta
+    if name == "examplestate":
+        op = "confirm" if op != "delete" else "unconfirm"
+        return {"type": "state", "op": op, "example": instance.example_id, "user": instance.confirmed_by_id}
+    if name == "assignment":
+        delta = {"type": "assignment", "op": op, "id": str(instance.pk)}
+        delta.update(example=instance.example_id, assignee=instance.assignee_id)
+        return delta
+    return None
+
+
+def is_deleted_with_example(origin) -> bool:
+    """Whether a delete cascades from an example or a project, which is not broken down into deltas."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, (Example, Project))
+
+
+def publish_change(project_id: int, instance: Model, created: Optional[bool], origin=None):
+    """Publish the delta of a saved instance, or of a deleted one when `created` is None."""
+    if created is None and is_deleted_with_example(origin):
+        return
+    op = "delete" if created is None else "create" if created else "update"
+    delta = make_delta(instance, op)
+    if delta is not None:
+        publish(project_id, delta)
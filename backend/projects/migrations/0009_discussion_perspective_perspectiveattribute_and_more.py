@@ -0,0 +1,238 @@
+# Generated by Django 4.1.7 on 2026-10-18 15:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("projects", "0008_project_allow_member_to_create_label_type_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Discussion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("title", models.CharField(default="Annotation Guidelines Discussion", max_length=255)),
+                ("description", models.TextField(default="Discuss annotation guidelines and resolve disagreements")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("pending_closure", models.BooleanField(default=False)),
+                (
+                    "participants",
+                    models.ManyToManyField(blank=True, related_name="discussion_participants", to="projects.member"),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Perspective",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("description", models.TextField(blank=True, help_text="Descrição geral da perspectiva.", null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="created_perspectives",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PerspectiveAttribute",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "name",
+                    models.CharField(help_text="Nome do atributo (ex.: idade, sexo, localização).", max_length=255),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("text", "Text"), ("number", "Number"), ("boolean", "Boolean"), ("list", "List")],
+                        default="text",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "perspective",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attributes",
+                        to="projects.perspective",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("perspective", "name", "type")},
+            },
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="locked",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name="PerspectiveAttributeListOption",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "value",
+                    models.CharField(help_text="Opção disponível para um atributo do tipo 'List'.", max_length=255),
+                ),
+                (
+                    "attribute",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="options",
+                        to="projects.perspectiveattribute",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GuidelineVoting",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("not_started", "Not Started"), ("voting", "Voting"), ("completed", "Completed")],
+                        default="not_started",
+                        max_length=20,
+                    ),
+                ),
+                ("guidelines_snapshot", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "current_discussion",
+                    models.ForeignKey(
+                        blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="projects.discussion"
+                    ),
+                ),
+                (
+                    "previous_voting",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="projects.guidelinevoting",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="voting_sessions",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DiscussionComment",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("temp_id", models.BigIntegerField(blank=True, null=True)),
+                ("is_synced", models.BooleanField(default=True)),
+                (
+                    "discussion",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="projects.discussion"),
+                ),
+                ("member", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="projects.member")),
+            ],
+        ),
+        migrations.AddField(
+            model_name="discussion",
+            name="project",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name="discussions", to="projects.project"
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="perspective",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="projects",
+                to="projects.perspective",
+            ),
+        ),
+        migrations.CreateModel(
+            name="MemberVote",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("agrees", models.BooleanField()),
+                ("voted_at", models.DateTimeField(auto_now_add=True)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="projects.member")),
+                (
+                    "voting_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="votes", to="projects.guidelinevoting"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("voting_session", "user")},
+            },
+        ),
+        migrations.CreateModel(
+            name="MemberAttributeDescription",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("description", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "attribute",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="projects.perspectiveattribute"),
+                ),
+                (
+                    "member",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attribute_descriptions",
+                        to="projects.member",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("member", "attribute")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="discussioncomment",
+            index=models.Index(fields=["temp_id"], name="projects_di_temp_id_b699bf_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="discussioncomment",
+            index=models.Index(fields=["is_synced"], name="projects_di_is_sync_baca85_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="discussion",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("project", "is_active"),
+                name="unique_active_discussion",
+            ),
+        ),
+    ]
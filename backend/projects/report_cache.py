@@ -0,0 +1,192 @@
+"""Versioned cache of project reports.
+
+Every project has an annotation version counter, bumped whenever labels, confirmations
+or anything else a report depends on is written. Reports are cached under a key made of
+the version and the query parameters, so a write invalidates every variant at once.
+The latest snapshot of each variant is kept as well, so that dashboards can be served
+a slightly stale report, flagged as such, while a background task recomputes it.
+
+The entries live in the `reports` cache, which must be shared by the web and task processes.
+"""
+import dataclasses
+import functools
+import hashlib
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import status
+from rest_framework.response import Response
+
+from .transactions import on_commit_batch
+
+
+def get_cache() -> BaseCache:
+    return caches["reports"]
+
+
+@dataclasses.dataclass
+class ReportSnapshot:
+    data: Any
+    version: int
+    computed_at: float
+    stale: bool = False
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.computed_at
+
+
+def _version_key(project_id: int) -> str:
+    return f"project_{project_id}_annotation_version"
+
+
+def _params_key(params) -> str:
+    items = sorted((key, tuple(params.getlist(key))) for key in params.keys())
+    return hashlib.md5(repr(items).encode()).hexdigest()
+
+
+def _snapshot_key(project_id: int, name: str, params, version: Optional[int] = None) -> str:
+    version_part = "latest" if version is None else version
+    return f"project_{project_id}_report_{name}_{version_part}_{_params_key(params)}"
+
+
+def reset_annotation_version(project_id: int):
+    # A unique initial value so that reused project ids never hit old entries.
+    get_cache().set(_version_key(project_id), time.time_ns(), timeout=None)
+
+
+def get_annotation_version(project_id: int) -> int:
+    cache = get_cache()
+    key = _version_key(project_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_annotation_version(project_id: int):
+    key = _version_key(project_id)
+    try:
+        get_cache().incr(key)
+    except ValueError:
+        reset_annotation_version(project_id)
+
+
+def schedule_refresh(project_id: int):
+    """Precompute the common reports once writes have settled, at most once per delay."""
+    from .celery_tasks import refresh_reports
+
+    delay = settings.REPORT_CACHE_REFRESH_DELAY
+    if get_cache().add(f"project_{project_id}_report_refresh_scheduled", True, timeout=delay):
+        refresh_reports.apply_async(args=(project_id,), countdown=delay)
+
+
+def _flush_annotation_changes(project_id: int, changes):
+    bump_annotation_version(project_id)
+    schedule_refresh(project_id)
+
+
+def notify_annotation_change(project_id: int):
+    """Invalidate the reports of a project once the current transaction commits, however many writes it has."""
+    on_commit_batch(("reports", project_id), None, functools.partial(_flush_annotation_changes, project_id))
+
+
+class _DeletedExamples(threading.local):
+    """The projects of the examples whose labels are being deleted, for the instance or queryset deleted."""
+
+    def __init__(self):
+        self.origin: Optional[weakref.ref] = None
+        self.projects: Dict[int, Optional[int]] = {}
+
+
+_deleted = _DeletedExamples()
+
+
+def get_example_project_id(example_id: int, origin=None) -> Optional[int]:
+    """Find the project of an example, reading it once per delete, e.g. for all the labels deleted with it."""
+    projects: Dict[int, Optional[int]] = {}
+    if origin is not None:
+        if _deleted.origin is None or _deleted.origin() is not origin:
+            _deleted.origin, _deleted.projects = weakref.ref(origin), {}
+        projects = _deleted.projects
+    if example_id not in projects:
+        from examples.models import Example
+
+        projects[example_id] = Example.objects.filter(pk=example_id).values_list("project_id", flat=True).first()
+    return projects[example_id]
+
+
+def get_project_id(instance, origin=None) -> Optional[int]:
+    """Find the project of a model instance a report depends on, given the origin of its delete if any."""
+    try:
+        if hasattr(instance, "project_id"):
+            return instance.project_id
+        if hasattr(instance, "example_id"):
+            if type(instance).example.is_cached(instance):
+                return instance.example.project_id
+            return get_example_project_id(instance.example_id, origin)
+        if hasattr(instance, "member_id"):
+            return instance.member.project_id
+    except ObjectDoesNotExist:
+        pass
+    return None
+
+
+def get_or_compute(
+    project_id: int, name: str, params, compute: Callable[[], Any], max_staleness=None
+) -> ReportSnapshot:
+    """Return the cached report for the current annotation version, computing it on a miss.
+
+    Args:
+        project_id: The project id.
+        name: The report name.
+        params: The query parameters the report depends on.
+        compute: A function computing the report data.
+        max_staleness: Serve the latest snapshot of an older version if it is younger than this
+            number of seconds. Defaults to `settings.REPORT_CACHE_MAX_STALENESS`.
+
+    Returns:
+        The report snapshot.
+    """
+    if max_staleness is None:
+        max_staleness = settings.REPORT_CACHE_MAX_STALENESS
+    cache = get_cache()
+    version = get_annotation_version(project_id)
+    snapshot = cache.get(_snapshot_key(project_id, name, params, version))
+    if snapshot is not None:
+        return snapshot
+
+    latest = cache.get(_snapshot_key(project_id, name, params))
+    if latest is not None and latest.age <= max_staleness:
+        schedule_refresh(project_id)
+        return dataclasses.replace(latest, stale=True)
+
+    snapshot = ReportSnapshot(data=compute(), version=version, computed_at=time.time())
+    timeout = settings.REPORT_CACHE_TIMEOUT
+    cache.set_many(
+        {
+            _snapshot_key(project_id, name, params, version): snapshot,
+            _snapshot_key(project_id, name, params): snapshot,
+        },
+        timeout=timeout,
+    )
+    return snapshot
+
+
+def cached_response(project_id: int, name: str, params, compute: Callable[[], Any]) -> Response:
+    """Build a response from a cached report, with its staleness in the headers."""
+    snapshot = get_or_compute(project_id, name, params, compute)
+    computed_at = datetime.fromtimestamp(snapshot.computed_at, tz=timezone.utc)
+    headers = {
+        "X-Report-Version": str(snapshot.version),
+        "X-Report-Computed-At": computed_at.isoformat(),
+        "X-Report-Stale": "true" if snapshot.stale else "false",
+    }
+    return Response(snapshot.data, status=status.HTTP_200_OK, headers=headers)
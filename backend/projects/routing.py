@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import DiscussionConsumer, ProjectEventConsumer
+
+websocket_urlpatterns = [
+    path("ws/discussion/<int:project_id>/", DiscussionConsumer.as_asgi()),
+    path("ws/events/<int:project_id>/", ProjectEventConsumer.as_asgi()),
+]
@@ -227,7 +227,7 @@ class DiscussionCommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DiscussionComment
-        fields = ['id', 'discussion', 'text', 'member', 'username', 'created_at', 'updated_at']
+        fields = ['id', 'discussion', 'text', 'member', 'username', 'created_at', 'updated_at', 'temp_id']
         read_only_fields = ['member', 'created_at', 'updated_at', 'discussion']
 
 class DiscussionSerializer(serializers.ModelSerializer):
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .events import publish_change
+from .models import Member, MemberAttributeDescription, Project
+from .report_cache import (
+    get_project_id,
+    notify_annotation_change,
+    reset_annotation_version,
+)
+
+# The models the cached reports are computed from.
+REPORT_SOURCES = [
+    "examples.Example",
+    "examples.ExampleState",
+    "examples.Assignment",
+    "labels.Category",
+    "labels.Span",
+    "labels.Relation",
+    "labels.TextLabel",
+    "labels.BoundingBox",
+    "labels.Segmentation",
+    "label_types.CategoryType",
+    "label_types.SpanType",
+    "label_types.RelationType",
+    Member,
+    MemberAttributeDescription,
+]
+
+
+@receiver(post_save)
+def init_annotation_version(sender, instance, created, **kwargs):
+    # Projects are polymorphic, so the sender is any of the subclasses.
+    if created and isinstance(instance, Project):
+        reset_annotation_version(instance.id)
+
+
+def invalidate_reports(sender, instance, signal, created=None, origin=None, **kwargs):
+    project_id = get_project_id(instance, origin)
+    if project_id is not None:
+        notify_annotation_change(project_id)
+        # the report sources are also what the project members follow in realtime.
+        publish_change(project_id, instance, created if signal is post_save else None, origin)
+
+
+for source in REPORT_SOURCES:
+    post_save.connect(invalidate_reports, sender=source)
+    post_delete.connect(invalidate_reports, sender=source)
@@ -0,0 +1,159 @@
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from config.asgi import application
+from projects.comment_buffer import CREATE, DELETE, UPDATE, CommentBuffer, Mutation, apply_mutations
+from projects.models import Discussion, DiscussionComment, Member, ProjectType
+from projects.tests.utils import prepare_project
+
+
+@override_settings(DISCUSSION_BUFFER_INTERVAL=0.05)
+class TestDiscussionConsumer(TransactionTestCase):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.discussion = Discussion.objects.create(project=self.project.item)
+        self.url = f"/ws/discussion/{self.project.item.id}/"
+
+    async def connect(self, user=None):
+        url = self.url
+        if user is not None:
+            token = await database_sync_to_async(lambda: Token.objects.get_or_create(user=user)[0])()
+            url = f"{url}?token={token.key}"
+        communicator = WebsocketCommunicator(application, url, headers=[(b"origin", b"http://localhost")])
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def test_rejects_anonymous_user(self):
+        communicator, connected = await self.connect()
+        self.assertFalse(connected)
+
+    async def test_rejects_non_member(self):
+        user = await database_sync_to_async(Member.objects.get)(user=self.project.annotator)
+        await database_sync_to_async(user.delete)()
+        communicator, connected = await self.connect(self.project.annotator)
+        self.assertFalse(connected)
+
+    async def test_broadcasts_one_batch_per_window(self):
+        author, connected = await self.connect(self.project.annotator)
+        self.assertTrue(connected)
+        reader, _ = await self.connect(self.project.approver)
+
+        await author.send_json_to({"action": "create", "data": {"text": "hello", "temp_id": 1}})
+        await author.send_json_to({"action": "create", "data": {"text": "world", "temp_id": 2}})
+        for communicator in [author, reader]:
+            message = await communicator.receive_json_from()
+            self.assertEqual(message["action"], "batch")
+            self.assertEqual([event["action"] for event in message["data"]], ["create", "create"])
+            comment = message["data"][0]["data"]
+            self.assertEqual((comment["text"], comment["temp_id"]), ("hello", 1))
+            self.assertEqual(comment["username"], self.project.annotator.username)
+            self.assertEqual(comment["discussion"], self.discussion.id)
+            self.assertIsNotNone(comment["id"])
+            self.assertTrue(await communicator.receive_nothing())
+        await author.disconnect()
+        await reader.disconnect()
+
+    async def test_cannot_change_comment_of_others(self):
+        member = await database_sync_to_async(Member.objects.get)(project=self.project.item, user=self.project.approver)
+        comment = await database_sync_to_async(DiscussionComment.objects.create)(
+            discussion=self.discussion, member=member, text="hello"
+        )
+        communicator, _ = await self.connect(self.project.annotator)
+        await communicator.send_json_to({"action": "delete", "data": {"id": comment.id}})
+        message = await communicator.receive_json_from()
+        self.assertIn("error", message)
+        self.assertTrue(await database_sync_to_async(DiscussionComment.objects.filter(id=comment.id).exists)())
+        await communicator.disconnect()
+
+
+class TestApplyMutations(TestCase):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.discussion = Discussion.objects.create(project=self.project.item)
+        self.member = Member.objects.select_related("user").get(project=self.project.item, user=self.project.annotator)
+
+    def mutation(self, action, **kwargs):
+        return Mutation(action=action, member=self.member, channel_name="channel", **kwargs)
+
+    def test_coalesces_changes_of_new_comments(self):
+        mutations = [
+            self.mutation(CREATE, temp_id=1, text="a"),
+            self.mutation(UPDATE, temp_id=1, text="b"),
+            self.mutation(CREATE, temp_id=2, text="c"),
+            self.mutation(DELETE, temp_id=2),
+        ]
+        events, errors = apply_mutations(self.project.item.id, mutations)
+        self.assertEqual(errors, [])
+        self.assertEqual(list(DiscussionComment.objects.values_list("text", "temp_id")), [("b", 1)])
+        self.assertEqual([(event["action"], event["data"]["temp_id"]) for event in events], [(CREATE, 1), (DELETE, 2)])
+
+    def test_writes_existing_comments_in_bulk(self):
+        comments = [
+            DiscussionComment.objects.create(discussion=self.discussion, member=self.member, text=str(i))
+            for i in range(3)
+        ]
+        mutations = [self.mutation(UPDATE, id=comment.id, text="x") for comment in comments[:2]]
+        mutations.append(self.mutation(DELETE, id=comments[2].id))
+        with self.assertNumQueries(5):  # select, then bulk update and delete in a savepoint
+            events, errors = apply_mutations(self.project.item.id, mutations)
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(DiscussionComment.objects.values_list("text", flat=True)), ["x", "x"])
+        self.assertEqual([event["action"] for event in events], [UPDATE, UPDATE, DELETE])
+
+    def test_rejects_missing_comments(self):
+        mutation = self.mutation(UPDATE, id=0, text="x")
+        events, errors = apply_mutations(self.project.item.id, [mutation])
+        self.assertEqual(events, [])
+        self.assertEqual(errors[0][0], mutation)
+
+    def test_keeps_order_of_mutations(self):
+        comment = DiscussionComment.objects.create(discussion=self.discussion, member=self.member, text="a")
+        mutations = [
+            self.mutation(DELETE, id=comment.id),
+            self.mutation(CREATE, temp_id=1, text="b"),
+            self.mutation(CREATE, temp_id=2, text="c"),
+            self.mutation(DELETE, temp_id=1),
+        ]
+        events, errors = apply_mutations(self.project.item.id, mutations)
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [(event["action"], event["data"]["id"], event["data"]["temp_id"]) for event in events],
+            [(DELETE, comment.id, None), (CREATE, events[1]["data"]["id"], 2), (DELETE, None, 1)],
+        )
+
+    def test_rejects_duplicate_temp_id(self):
+        DiscussionComment.objects.create(discussion=self.discussion, member=self.member, text="a", temp_id=1)
+        mutations = [
+            self.mutation(CREATE, temp_id=1, text="b"),
+            self.mutation(CREATE, temp_id=2, text="c"),
+            self.mutation(CREATE, temp_id=2, text="d"),
+        ]
+        events, errors = apply_mutations(self.project.item.id, mutations)
+        self.assertEqual([mutation for mutation, _ in errors], [mutations[0], mutations[2]])
+        self.assertEqual([event["data"]["text"] for event in events], ["c"])
+        self.assertEqual(sorted(DiscussionComment.objects.values_list("text", flat=True)), ["a", "c"])
+
+
+class TestCommentBuffer(TestCase):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.member = Member.objects.get(project=self.project.item, user=self.project.annotator)
+        self.channel_layer = AsyncMock()
+        self.buffer = CommentBuffer("group", self.project.item.id, self.channel_layer)
+
+    @patch("projects.comment_buffer.apply_mutations", side_effect=RuntimeError())
+    def test_reports_failed_window_to_every_sender(self, apply_mutations):
+        self.buffer.pending = [
+            Mutation(action=CREATE, member=self.member, channel_name=f"channel{i}", temp_id=i, text="hello")
+            for i in range(2)
+        ]
+        with self.assertLogs("projects.comment_buffer", "ERROR"):
+            async_to_sync(self.buffer.flush)()
+        sent = [(call.args[0], call.args[1]["temp_id"]) for call in self.channel_layer.send.call_args_list]
+        self.assertEqual(sent, [("channel0", 0), ("channel1", 1)])
+        self.channel_layer.group_send.assert_not_called()
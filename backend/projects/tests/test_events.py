@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from model_mommy import mommy
+from rest_framework.authtoken.models import Token
+
+from config.asgi import application
+from examples.models import Example
+from examples.tests.utils import make_doc, make_example_state
+from labels.models import Category
+from projects.events import send_events
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+@patch("projects.events.send_events")
+class TestPublishChanges(TestCase):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example = make_doc(self.project.item)
+        self.label_type = mommy.make("CategoryType", project=self.project.item)
+
+    def make_category(self, user):
+        return mommy.make("Category", example=self.example, label=self.label_type, user=user)
+
+    def test_publishes_label_deltas(self, send):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = self.make_category(self.project.annotator)
+        delta = {
+            "type": "label",
+            "kind": "category",
+            "op": "create",
+            "id": category.id,
+            "example": self.example.id,
+            "user": self.project.annotator.id,
+            "label": self.label_type.id,
+        }
+        send.assert_called_once_with(self.project.item.id, [delta])
+
+    def test_sends_the_deltas_of_a_transaction_at_once(self, send):
+        # without signals, so that only the deletions are published.
+        Category.objects.bulk_create(
+            [Category(example=self.example, label=self.label_type, user=user) for user in self.project.members]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(example=self.example).delete()
+        send.assert_called_once()
+        events = send.call_args[0][1]
+        self.assertEqual(
+            sorted((event["op"], event["user"]) for event in events),
+            [("delete", user.id) for user in self.project.members],
+        )
+
+    def test_drops_the_deltas_of_a_rolled_back_transaction(self, send):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                self.make_category(self.project.annotator)
+                raise ValueError()
+            make_example_state(self.example, self.project.annotator)
+        send.assert_called_once()
+        self.assertEqual(
+            send.call_args[0][1],
+            [{"type": "state", "op": "confirm", "example": self.example.id, "user": self.project.annotator.id}],
+        )
+
+    def test_drops_the_deltas_of_a_rolled_back_savepoint(self, send):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                make_example_state(self.example, self.project.annotator)
+                with self.assertRaises(ValueError), transaction.atomic():
+                    self.make_category(self.project.annotator)
+                    raise ValueError()
+        send.assert_called_once()
+        self.assertEqual([event["type"] for event in send.call_args[0][1]], ["state"])
+
+    def test_skips_labels_deleted_with_their_example(self, send):
+        Category.objects.create(example=self.example, label=self.label_type, user=self.project.annotator)
+        send.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            Example.objects.filter(id=self.example.id).delete()
+        send.assert_not_called()
+
+
+class TestSendEvents(TestCase):
+    @override_settings(PROJECT_EVENTS_MAX_BATCH=1)
+    @patch("projects.events.get_channel_layer")
+    def test_asks_to_reload_instead_of_large_batches(self, get_channel_layer):
+        layer = get_channel_layer.return_value
+
+        async def group_send(group, message):
+            self.assertEqual(message["events"], [{"type": "resync"}])
+
+        layer.group_send = group_send
+        send_events(1, [{"type": "label"}, {"type": "label"}])
+
+
+class TestProjectEventConsumer(TransactionTestCase):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example = make_doc(self.project.item)
+        self.label_type = mommy.make("CategoryType", project=self.project.item)
+
+    async def connect(self, user):
+        token = await database_sync_to_async(lambda: Token.objects.get_or_create(user=user)[0])()
+        url = f"/ws/events/{self.project.item.id}/?token={token.key}"
+        communicator = WebsocketCommunicator(application, url, headers=[(b"origin", b"http://localhost")])
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def label(self, user):
+        await database_sync_to_async(mommy.make)("Category", example=self.example, label=self.label_type, user=user)
+
+    async def test_pushes_own_labels_and_confirmations(self):
+        communicator = await self.connect(self.project.annotator)
+        await self.label(self.project.approver)
+        await self.label(self.project.annotator)
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["action"], "events")
+        self.assertEqual(
+            [(event["type"], event["user"]) for event in message["data"]], [("label", self.project.annotator.id)]
+        )
+
+        await database_sync_to_async(make_example_state)(self.example, self.project.approver)
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["data"][0]["type"], "state")
+        await communicator.disconnect()
+
+    async def test_pushes_labels_of_others_in_collaborative_projects(self):
+        self.project.item.collaborative_annotation = True
+        await database_sync_to_async(self.project.item.save)()
+        communicator = await self.connect(self.project.annotator)
+        await self.label(self.project.approver)
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["data"][0]["user"], self.project.approver.id)
+        await communicator.disconnect()
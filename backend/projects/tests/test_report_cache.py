@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.http import QueryDict
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from examples.models import Example
+from examples.tests.utils import make_doc, make_example_state
+from projects.celery_tasks import refresh_reports
+from projects.models import ProjectType
+from projects.report_cache import get_annotation_version, get_cache, get_or_compute
+from projects.tests.utils import prepare_project
+
+
+def fail():
+    raise AssertionError("The report should be served from the cache")
+
+
+class TestReportCache(CRUDMixin):
+    def setUp(self):
+        get_cache().clear()
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.label = mommy.make("CategoryType", project=self.project.item, text="positive")
+        self.example = make_doc(self.project.item)
+        for user in self.project.staffs:
+            make_example_state(self.example, user)
+        self.url = reverse(viewname="disagreement_reporting", args=[self.project.item.id])
+
+    def test_serves_repeated_views_from_cache(self):
+        first = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        second = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(first["X-Report-Computed-At"], second["X-Report-Computed-At"])
+        self.assertEqual(second["X-Report-Stale"], "false")
+
+    def test_label_write_bumps_annotation_version(self):
+        version = get_annotation_version(self.project.item.id)
+        self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            mommy.make("Category", example=self.example, user=self.project.approver, label=self.label)
+        self.assertGreater(get_annotation_version(self.project.item.id), version)
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["conflict_count"], 1)
+
+    @override_settings(REPORT_CACHE_MAX_STALENESS=60)
+    @patch("projects.report_cache.schedule_refresh")
+    def test_serves_stale_snapshot_within_max_staleness(self, schedule_refresh):
+        self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            mommy.make("Category", example=self.example, user=self.project.approver, label=self.label)
+        schedule_refresh.reset_mock()
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response["X-Report-Stale"], "true")
+        self.assertEqual(response.data["conflict_count"], 0)
+        schedule_refresh.assert_called_once_with(self.project.item.id)
+
+    def test_refresh_task_precomputes_default_reports(self):
+        refresh_reports(self.project.item.id)
+        snapshot = get_or_compute(self.project.item.id, "reporting", QueryDict(), fail)
+        self.assertEqual(snapshot.data["total_examples"], 1)
+        get_or_compute(self.project.item.id, "CategoryTypeDistribution", QueryDict(), fail)
+
+    def test_bumps_version_once_per_transaction(self):
+        version = get_annotation_version(self.project.item.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            mommy.make("Category", example=self.example, label=self.label, _quantity=3)
+        self.assertEqual(get_annotation_version(self.project.item.id), version + 1)
+
+    def test_reads_project_of_labels_once_per_delete(self):
+        mommy.make("Category", example=self.example, label=self.label, _quantity=3)
+        with CaptureQueriesContext(connection) as context:
+            Example.objects.filter(id=self.example.id).delete()
+        lookups = [query for query in context if query["sql"].startswith('SELECT "examples_example"."project_id"')]
+        self.assertEqual(len(lookups), 1)
@@ -0,0 +1,52 @@
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from examples.tests.utils import make_assignment, make_doc, make_example_state
+from projects.models import Member, ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestReportingAPI(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        positive = mommy.make("CategoryType", project=self.project.item, text="positive")
+        negative = mommy.make("CategoryType", project=self.project.item, text="negative")
+        self.agreed = make_doc(self.project.item)
+        self.conflicted = make_doc(self.project.item)
+        for example, labels in [(self.agreed, [positive, positive]), (self.conflicted, [positive, negative])]:
+            for user, label in zip(self.project.staffs, labels):
+                make_assignment(self.project.item, example, user)
+                make_example_state(example, user)
+                mommy.make("Category", example=example, user=user, label=label)
+        perspective = mommy.make("Perspective")
+        self.project.item.perspective = perspective
+        self.project.item.save()
+        attribute = mommy.make("PerspectiveAttribute", perspective=perspective, name="country", type="text")
+        for user in self.project.staffs:
+            member = Member.objects.get(project=self.project.item, user=user)
+            mommy.make("MemberAttributeDescription", member=member, attribute=attribute, description="PT")
+        self.url = reverse(viewname="disagreement_reporting", args=[self.project.item.id])
+
+    def test_allows_approver_to_get_report(self):
+        response = self.assert_fetch(self.project.approver, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_examples"], 2)
+        self.assertEqual(response.data["conflict_count"], 1)
+        self.assertEqual(response.data["total_members"], 3)
+        self.assertEqual(response.data["label_distributions"], [])
+
+    def test_denies_annotator_to_get_report(self):
+        self.assert_fetch(self.project.annotator, status.HTTP_403_FORBIDDEN)
+
+    def test_groups_examples_by_perspective_attribute(self):
+        self.url += "?attributes=country&descriptions=PT&view=disagreement"
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        distribution = response.data["label_distributions"][0]
+        self.assertEqual(distribution["total_members"], 2)
+        self.assertEqual(len(distribution["examples"]), 1)
+        example = distribution["examples"][0]
+        self.assertEqual(example["example_id"], self.conflicted.id)
+        self.assertEqual(example["total"], 2)
+        self.assertEqual(example["agreement_rate"], 50.0)
+        self.assertFalse(example["is_agreement"])
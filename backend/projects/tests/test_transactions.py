@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.test import TestCase
+
+from projects.transactions import on_commit_batch
+
+
+class TestOnCommitBatch(TestCase):
+    def setUp(self):
+        self.flushed = []
+
+    def add(self, item, key="key"):
+        on_commit_batch(key, item, self.flushed.append)
+
+    def test_flushes_items_once_committed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add(1)
+            self.add(2)
+            self.add(3, key="other")
+            self.assertEqual(self.flushed, [])
+        self.assertEqual(self.flushed, [[1, 2], [3]])
+
+    def test_drops_items_of_rolled_back_savepoint(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add(1)
+            try:
+                with transaction.atomic():
+                    self.add(2)
+                    raise ValueError()
+            except ValueError:
+                pass
+            self.add(3)
+        self.assertEqual(self.flushed, [[1, 3]])
+
+    def test_flushes_last_batch_when_savepoint_ends_it(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add(1)
+            try:
+                with transaction.atomic():
+                    self.add(2)
+                    raise ValueError()
+            except ValueError:
+                pass
+        self.assertEqual(self.flushed, [[1]])
+
+    def test_starts_a_new_batch_after_rollback(self):
+        try:
+            with transaction.atomic():
+                on_commit_batch("key", 1, lambda items: self.fail("flushed a rolled back batch"))
+                raise ValueError()
+        except ValueError:
+            pass
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add(2)
+        self.assertEqual(self.flushed, [[2]])
@@ -0,0 +1,82 @@
+"""Work deferred to the commit of the current transaction, done once per batch of changes.
+
+The signals of a write, such as the report invalidation or the realtime deltas, add an item
+to a batch named by a key instead of acting at once. Each item is registered with its own
+commit hook, so the items added in a savepoint which is rolled back are dropped with it,
+and the last hook to run hands all the committed items of the batch to its flush function.
+Outside a transaction, the hook runs at once and the batch holds a single item.
+
+The hooks discarded by a rollback are only referenced by the connection, so they are gone
+once it drops them: a batch keeps weak references to its hooks to tell which ones are
+still to run.
+"""
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, List
+
+from django.db import transaction
+
+
+class _Hook:
+    """A commit hook adding its item to the committed items of a batch."""
+
+    __slots__ = ("batch", "item", "__weakref__")
+
+    def __init__(self, batch: "_Batch", item: Any):
+        self.batch = batch
+        self.item = item
+
+    def __call__(self):
+        self.batch.commit(self)
+
+
+class _Batch:
+    def __init__(self, key: Hashable, flush: Callable[[List[Any]], None]):
+        self.key = key
+        self.flush = flush
+        self.hooks: List[weakref.ref] = []
+        self.committed: List[Any] = []
+
+    def add(self, item: Any):
+        hook = _Hook(self, item)
+        self.hooks.append(weakref.ref(hook))
+        transaction.on_commit(hook)
+
+    def is_pending(self) -> bool:
+        return any(ref() is not None for ref in self.hooks)
+
+    def commit(self, hook: _Hook):
+        self.committed.append(hook.item)
+        # the hooks run in order, so the ones still alive after this one are the pending ones.
+        while self.hooks and self.hooks[-1]() is None:
+            self.hooks.pop()
+        if self.hooks and self.hooks[-1]() is not hook:
+            return
+        items, self.committed, self.hooks = self.committed, [], []
+        if _local.batches.get(self.key) is self:
+            del _local.batches[self.key]
+        self.flush(items)
+
+
+class _Batches(threading.local):
+    def __init__(self):
+        self.batches: Dict[Hashable, _Batch] = {}
+
+
+_local = _Batches()
+
+
+def on_commit_batch(key: Hashable, item: Any, flush: Callable[[List[Any]], None]):
+    """Add an item to the batch of a key, flushed once the current transaction commits.
+
+    Args:
+        key: The name of the batch, e.g. a kind of work and a project id.
+        item: The item to add, dropped if the savepoint or transaction it is added in is rolled back.
+        flush: A function receiving the committed items of the batch, in the order they were added.
+            The first function given for a key is kept until the batch is flushed.
+    """
+    batch = _local.batches.get(key)
+    # a batch whose hooks were all rolled back is left behind, with the flush of that transaction.
+    if batch is None or not batch.is_pending():
+        batch = _local.batches[key] = _Batch(key, flush)
+    batch.add(item)
@@ -37,6 +37,10 @@ export class DiscussionApplicationService {
       case 'delete':
         this.emit('comment-deleted', data.id)
         break
+      case 'batch':
+        // the changes of a window, in the order they were stored.
+        data.forEach((event: { action: string, data: any }) => this.handleSocketMessage(event.action, event.data))
+        break
     }
   }
 
@@ -9,6 +9,7 @@ if [[ -z "${ADMIN_EMAIL}" ]]; then echo "Missing ADMIN_EMAIL environment variabl
 set -o nounset
 
 python /doccano/backend/manage.py migrate
+python /doccano/backend/manage.py createcachetable
 if [ -n "$ADMIN_USERNAME" ]; then
     python /doccano/backend/manage.py create_admin --noinput --username="$ADMIN_USERNAME" --email="$ADMIN_EMAIL" --password="$ADMIN_PASSWORD"
 fi
@@ -22,6 +22,7 @@ fi
 echo "Initializing database"
 python manage.py wait_for_db
 python manage.py migrate
+python manage.py createcachetable
 python manage.py create_roles
 
 echo "Creating admin"
@@ -35,13 +36,18 @@ if [[ -n "${ADMIN_USERNAME}" ]] && [[ -n "${ADMIN_PASSWORD}" ]] && [[ -n "${ADMI
 fi
 
 echo "Starting django"
+# the websocket groups are shared between the workers and Celery through CHANNEL_LAYER_REDIS_URL.
+if [[ -z "${CHANNEL_LAYER_REDIS_URL:-}" ]]; then
+  echo "CHANNEL_LAYER_REDIS_URL is not set, the websockets only receive the changes made by their own worker" >&2
+fi
 gunicorn \
   --bind="0.0.0.0:${PORT:-8000}" \
   --workers="${WORKERS:-1}" \
   --timeout=300 \
   --capture-output \
   --log-level info \
-  config.wsgi &
+  --worker-class uvicorn.workers.UvicornWorker \
+  config.asgi:application &
 gunicorn_pid="$!"
 
 echo "Starting celery"